@@ -2,42 +2,122 @@
 Clerk JWT verification module.
 Verifies session tokens using Clerk's JWKS endpoint.
 """
-from typing import Optional
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
 from fastapi import HTTPException, Request
 import httpx
 from jose import jwt, JWTError, jwk
 from jose.exceptions import JWKError
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 
+logger = logging.getLogger(__name__)
+
+
 class ClerkAuth:
-    """Handles Clerk JWT verification using JWKS."""
+    """
+    Handles Clerk JWT verification using JWKS.
+    
+    Public keys are constructed once and kept by kid. The set is refreshed
+    after JWKS_CACHE_TTL_SECONDS, or early when a token names an unknown kid
+    (key rotation). Concurrent refreshes share one in-flight fetch.
+    """
     
     def __init__(self):
-        self._jwks_cache: Optional[dict] = None
+        self._keys: Dict[str, Any] = {}
+        self._fetched_at = 0.0
+        self._refresh: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._rotation_hooks: List[Callable[[], None]] = []
     
-    async def get_jwks(self) -> dict:
-        """Fetch JWKS from Clerk. Cached after first fetch."""
-        if self._jwks_cache:
-            return self._jwks_cache
-        
+    def _http_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=httpx.Timeout(10.0))
+        return self._client
+    
+    def on_rotation(self, hook: Callable[[], None]) -> None:
+        """Register a callback run whenever the set of signing keys changes."""
+        self._rotation_hooks.append(hook)
+    
+    async def _fetch_keys(self) -> None:
         clerk_issuer = settings.CLERK_ISSUER
         if not clerk_issuer:
             raise HTTPException(500, "CLERK_ISSUER not configured")
         
         jwks_url = f"{clerk_issuer}/.well-known/jwks.json"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(jwks_url)
-            if response.status_code != 200:
-                raise HTTPException(500, "Failed to fetch Clerk JWKS")
-            self._jwks_cache = response.json()
+        try:
+            response = await self._http_client().get(jwks_url)
+        except httpx.HTTPError:
+            raise HTTPException(500, "Failed to fetch Clerk JWKS")
+        if response.status_code != 200:
+            raise HTTPException(500, "Failed to fetch Clerk JWKS")
+        
+        keys = {}
+        for key in response.json().get("keys", []):
+            kid = key.get("kid")
+            if not kid:
+                continue
+            try:
+                keys[kid] = jwk.construct(key, algorithm=key.get("alg", "RS256"))
+            except JWKError as e:
+                logger.warning("Skipping unusable JWKS key %s: %s", kid, e)
+        
+        rotated = set(keys) != set(self._keys)
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        if rotated:
+            for hook in self._rotation_hooks:
+                hook()
+    
+    async def refresh_keys(self) -> None:
+        """Fetch the JWKS, joining a fetch that is already in flight."""
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._fetch_keys())
+        # Shielded so one caller's cancellation doesn't abort the shared fetch
+        await asyncio.shield(self._refresh)
+    
+    async def prefetch(self) -> None:
+        """Warm the key cache at startup; failures are retried on first use."""
+        if not settings.CLERK_ISSUER:
+            return
+        try:
+            await self.refresh_keys()
+        except HTTPException as e:
+            logger.warning("JWKS prefetch failed: %s", e.detail)
+    
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def get_key(self, kid: str) -> Any:
+        """Constructed public key for `kid`, refreshing the JWKS if stale or unknown."""
+        age = time.monotonic() - self._fetched_at
+        stale = not self._keys or age > settings.JWKS_CACHE_TTL_SECONDS
+        # An unknown kid may be a rotated key; rate limited so bogus kids can't force fetches
+        unknown = kid not in self._keys and age > settings.JWKS_MIN_REFRESH_SECONDS
+        if stale or unknown:
+            try:
+                await self.refresh_keys()
+            except HTTPException:
+                if not self._keys:
+                    raise
+                # Keep serving the previous keys if Clerk is briefly unreachable
+                logger.warning("JWKS refresh failed; using cached keys")
         
-        return self._jwks_cache
+        key = self._keys.get(kid)
+        if key is None:
+            raise HTTPException(401, "Signing key not found")
+        return key
     
-    def get_signing_key(self, token: str, jwks: dict) -> str:
-        """Extract the correct signing key from JWKS for the token."""
+    async def verify_token(self, token: str) -> dict:
+        """Verify Clerk JWT and return payload with user_id."""
         try:
             unverified_header = jwt.get_unverified_header(token)
         except JWTError:
@@ -47,26 +127,17 @@ class ClerkAuth:
         if not kid:
             raise HTTPException(401, "Token missing key ID")
         
-        for key in jwks.get("keys", []):
-            if key.get("kid") == kid:
-                return key
-        
-        raise HTTPException(401, "Signing key not found")
-    
-    async def verify_token(self, token: str) -> dict:
-        """Verify Clerk JWT and return payload with user_id."""
-        jwks = await self.get_jwks()
-        signing_key = self.get_signing_key(token, jwks)
+        public_key = await self.get_key(kid)
         
         try:
-            # Convert JWK to PEM for verification
-            public_key = jwk.construct(signing_key)
-            
             payload = jwt.decode(
                 token,
                 public_key,
                 algorithms=["RS256"],
-                options={"verify_aud": False},  # Clerk doesn't always set aud
+                options={
+                    "verify_aud": False,  # Clerk doesn't always set aud
+                    "leeway": settings.AUTH_CLOCK_SKEW_SECONDS,
+                },
             )
             
             return payload
@@ -80,6 +151,15 @@ class ClerkAuth:
 # Global instance
 clerk_auth = ClerkAuth()
 
+# sha256(token) -> user_id for tokens that already passed verification.
+# Entries expire with the token (plus the allowed skew) and are dropped
+# whenever the signing keys change.
+verified_tokens = TTLCache(
+    maxsize=settings.AUTH_TOKEN_CACHE_SIZE,
+    ttl=settings.JWKS_CACHE_TTL_SECONDS,
+)
+clerk_auth.on_rotation(verified_tokens.clear)
+
 
 async def verify_clerk_session(request: Request) -> str:
     """
@@ -99,12 +179,25 @@ async def verify_clerk_session(request: Request) -> str:
     if not token:
         raise HTTPException(401, "Empty token")
     
+    # Repeat tokens skip signature verification
+    token_key = hashlib.sha256(token.encode("utf-8")).digest()
+    user_id = verified_tokens.get(token_key)
+    if user_id is not None:
+        return user_id
+    
     payload = await clerk_auth.verify_token(token)
     
     user_id = payload.get("sub")
     if not user_id:
         raise HTTPException(401, "Token missing user ID")
     
+    # Cached only while verification would still accept the token
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        ttl = exp + settings.AUTH_CLOCK_SKEW_SECONDS - time.time()
+        if ttl > 0:
+            verified_tokens.set(token_key, user_id, ttl=ttl)
+    
     return user_id
 
 
@@ -0,0 +1,140 @@
+"""
+Caches: a small in-process TTL/LRU cache, and ETags plus response caching
+keyed by per-user data versions.
+
+Data versions live in the database (users.data_version) and are bumped in
+the same transaction as the change, so every API process computes the same
+ETag for the same data and a write through one process invalidates the
+others. The response cache itself is per process.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from fastapi import Request, Response
+from sqlalchemy import column, event, select, table, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+
+class TTLCache:
+    """LRU-bounded mapping whose entries expire `ttl` seconds after being set."""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value; `ttl` overrides the cache-wide lifetime for this entry."""
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Lightweight handle on the users table, so this module doesn't import the models
+users = table("users", column("id"), column("data_version"))
+
+response_cache = TTLCache(
+    maxsize=settings.RESPONSE_CACHE_SIZE,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+)
+
+
+def mark_user_changed(db: AsyncSession, user_id: str) -> None:
+    """
+    Bump the user's data version whenever this session commits, so a
+    long-lived session (e.g. a search run committing progress) invalidates
+    cached responses with each commit.
+    """
+    db.info.setdefault("changed_users", set()).add(user_id)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_changed_users(session: Session) -> None:
+    # In the committing transaction, so the new version becomes visible to
+    # other processes together with the data it describes
+    changed = session.info.get("changed_users")
+    if changed:
+        session.execute(
+            update(users)
+            .where(users.c.id.in_(sorted(changed)))
+            .values(data_version=users.c.data_version + 1)
+        )
+
+
+async def cached_response(
+    request: Request,
+    db: AsyncSession,
+    user_id: str,
+    build: Callable[[], Awaitable[Response]],
+    vary: str = "",
+) -> Response:
+    """
+    Serve a per-user GET from the response cache, or 304 when the client's
+    ETag is current. `vary` adds inputs that are not user data (e.g. whether
+    an API key is active). `build` runs only on a miss.
+    
+    ETags also roll over every RESPONSE_CACHE_TTL_SECONDS, so inputs that
+    are not versioned (such as the current time) go stale on a 304 no
+    longer than they would in the response cache.
+    """
+    version = await db.scalar(select(users.c.data_version).where(users.c.id == user_id))
+    if version is None:
+        # No users row to version the data by
+        return await build()
+    
+    window = int(time.time() // settings.RESPONSE_CACHE_TTL_SECONDS)
+    key = (user_id, request.url.path, str(request.query_params), vary, version, window)
+    digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=12).hexdigest()
+    etag = f'W/"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    
+    cached = response_cache.get(key)
+    if cached is None:
+        response = await build()
+        if response.status_code != 200:
+            return response
+        cached = (response.body, response.media_type)
+        response_cache.set(key, cached)
+    
+    body, media_type = cached
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,162 @@
+"""
+Transparent zstd compression for large text columns.
+Frames record the id of the dictionary they were compressed with, so a
+retrained dictionary never requires rewriting existing rows. Decoding never
+touches the database: a frame whose dictionary this process hasn't loaded
+yet (e.g. one trained since the last refresh) raises UnknownDictionary and
+records the id, for load_missing_dictionaries() to fetch.
+"""
+import base64
+from typing import Any, Dict, Optional, Set, Tuple
+import zstandard as zstd
+from sqlalchemy import JSON, LargeBinary
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.types import TypeDecorator
+
+from app.core.config import settings
+
+
+# First bytes of every zstd frame. Valid UTF-8 text can never start with them.
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Prefix for compressed strings embedded in JSON documents
+JSON_MARKER = "zstd:"
+
+
+class UnknownDictionary(ValueError):
+    """A frame was compressed with a dictionary that is not loaded."""
+    
+    def __init__(self, dict_id: int):
+        super().__init__(f"zstd dictionary {dict_id} is not loaded")
+        self.dict_id = dict_id
+
+
+class CompressionCodec:
+    """Compresses text with the active trained dictionary (or none)."""
+    
+    def __init__(self, level: int = 3, min_size: int = 128):
+        self.level = level
+        self.min_size = min_size
+        self._compressor = zstd.ZstdCompressor(level=level)
+        self._active_dict_id = 0
+        self._decompressors: Dict[int, zstd.ZstdDecompressor] = {0: zstd.ZstdDecompressor()}
+        # Ids decoding has asked for but that are not loaded
+        self.missing: Set[int] = set()
+    
+    @property
+    def active_dict_id(self) -> int:
+        return self._active_dict_id
+    
+    def has_dictionary(self, dict_id: int) -> bool:
+        return dict_id in self._decompressors
+    
+    def add_dictionary(self, data: bytes, activate: bool = False) -> int:
+        """Register a dictionary for decompression, optionally compressing with it."""
+        dictionary = zstd.ZstdCompressionDict(data)
+        dict_id = dictionary.dict_id()
+        if dict_id not in self._decompressors:
+            self._decompressors[dict_id] = zstd.ZstdDecompressor(dict_data=dictionary)
+        self.missing.discard(dict_id)
+        if activate and dict_id != self._active_dict_id:
+            self._compressor = zstd.ZstdCompressor(level=self.level, dict_data=dictionary)
+            self._active_dict_id = dict_id
+        return dict_id
+    
+    def compress(self, text: str) -> bytes:
+        """Compress text. Short values are stored as plain UTF-8."""
+        raw = text.encode("utf-8")
+        if len(raw) < self.min_size:
+            return raw
+        return self._compressor.compress(raw)
+    
+    def decompress(self, data: bytes) -> str:
+        """Inverse of compress(); plain UTF-8 passes through."""
+        if not data.startswith(ZSTD_MAGIC):
+            return data.decode("utf-8")
+        dict_id = zstd.get_frame_parameters(data).dict_id
+        decompressor = self._decompressors.get(dict_id)
+        if decompressor is None:
+            self.missing.add(dict_id)
+            raise UnknownDictionary(dict_id)
+        return decompressor.decompress(data).decode("utf-8")
+    
+    def compress_to_str(self, text: str) -> str:
+        """Compress into a JSON-safe string, only when that is actually smaller."""
+        compressed = self.compress(text)
+        if not compressed.startswith(ZSTD_MAGIC):
+            return text
+        encoded = JSON_MARKER + base64.b64encode(compressed).decode("ascii")
+        return encoded if len(encoded) < len(text) else text
+    
+    def decompress_str(self, value: str) -> str:
+        if not value.startswith(JSON_MARKER):
+            return value
+        return self.decompress(base64.b64decode(value[len(JSON_MARKER):]))
+
+
+def train_dictionary(samples: list, dict_size: Optional[int] = None) -> Tuple[int, bytes]:
+    """Train a zstd dictionary from text samples. Returns (dict_id, bytes)."""
+    encoded = [s.encode("utf-8") for s in samples if s]
+    dictionary = zstd.train_dictionary(
+        dict_size or settings.COMPRESSION_DICT_SIZE,
+        encoded,
+        level=settings.COMPRESSION_LEVEL,
+    )
+    return dictionary.dict_id(), dictionary.as_bytes()
+
+
+# Global codec instance
+codec = CompressionCodec(level=settings.COMPRESSION_LEVEL)
+
+
+class CompressedText(TypeDecorator):
+    """Text column stored as zstd-compressed bytes."""
+    
+    impl = LargeBinary
+    cache_ok = True
+    
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        return codec.compress(value)
+    
+    def process_result_value(self, value: Any, dialect) -> Optional[str]:
+        if value is None:
+            return None
+        if isinstance(value, str):
+            # Rows written before the column was compressed (SQLite keeps TEXT)
+            return value
+        return codec.decompress(bytes(value))
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON (JSONB on PostgreSQL) column whose long string fields are stored compressed."""
+    
+    impl = JSON
+    cache_ok = True
+    
+    def __init__(self, fields: Tuple[str, ...] = ()):
+        super().__init__()
+        self.fields = tuple(fields)
+    
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(JSON())
+    
+    def process_bind_param(self, value: Any, dialect) -> Any:
+        if not isinstance(value, dict):
+            return value
+        value = dict(value)
+        for field in self.fields:
+            if isinstance(value.get(field), str):
+                value[field] = codec.compress_to_str(value[field])
+        return value
+    
+    def process_result_value(self, value: Any, dialect) -> Any:
+        if not isinstance(value, dict):
+            return value
+        for field in self.fields:
+            if isinstance(value.get(field), str):
+                value[field] = codec.decompress_str(value[field])
+        return value
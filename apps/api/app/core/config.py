@@ -13,12 +13,72 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./data/jobscout.db"
     
+    @field_validator("DATABASE_URL", mode="before")
+    @classmethod
+    def normalize_database_url(cls, v):
+        """Force async drivers for bare sqlite:// and postgres:// URLs."""
+        if not isinstance(v, str):
+            return v
+        v = v.strip()
+        if v.startswith("postgres://"):
+            return "postgresql+asyncpg://" + v[len("postgres://"):]
+        if v.startswith("postgresql://"):
+            return "postgresql+asyncpg://" + v[len("postgresql://"):]
+        if v.startswith("sqlite://"):
+            return "sqlite+aiosqlite://" + v[len("sqlite://"):]
+        return v
+    
+    # Connection pool (ignored for SQLite)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_ECHO: bool = False
+    
+    # Level for the application's own loggers (uvicorn configures its own)
+    LOG_LEVEL: str = "INFO"
+    
     # Encryption
     ENCRYPTION_KEY: str = ""
     
+    # Decrypted resumes kept in memory only (never written to disk)
+    RESUME_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    RESUME_CACHE_TTL_SECONDS: int = 900
+    
+    # Resume parsing runs in a process pool, each task capped in time and memory
+    RESUME_PARSE_WORKERS: int = 2
+    RESUME_PARSE_TIMEOUT_SECONDS: float = 20.0
+    RESUME_PARSE_MAX_MEMORY_MB: int = 512
+    # Workers are replaced after this many parses to return memory to the OS
+    RESUME_PARSE_MAX_TASKS_PER_CHILD: int = 50
+    # PDF pages read at most, and pages per extraction task: longer PDFs are
+    # extracted in parallel, page ranges spread over the pool
+    RESUME_PDF_MAX_PAGES: int = 30
+    RESUME_PDF_PAGES_PER_TASK: int = 4
+    
+    # Uploads: size limit, and above UPLOAD_SPOOL_MEMORY_BYTES files reach
+    # parser workers as a temporary file instead of in-memory bytes
+    RESUME_UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_SPOOL_MEMORY_BYTES: int = 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024
+    # Parse results by content hash, and parsed uploads awaiting verification
+    PARSED_RESUME_CACHE_SIZE: int = 256
+    PARSED_RESUME_CACHE_TTL_SECONDS: int = 3600
+    PENDING_RESUME_CACHE_SIZE: int = 1000
+    PENDING_RESUME_TTL_SECONDS: int = 3600
+    # Bulk ingestion (zip upload or app.services.bulk_ingest CLI)
+    BULK_INGEST_MAX_FILES: int = 1000
+    BULK_INGEST_MAX_BYTES: int = 256 * 1024 * 1024
+    
     # Clerk
     CLERK_SECRET_KEY: str = ""
     CLERK_ISSUER: str = ""  # e.g., https://your-app.clerk.accounts.dev
+    JWKS_CACHE_TTL_SECONDS: int = 3600
+    # Minimum gap between refreshes triggered by an unknown kid
+    JWKS_MIN_REFRESH_SECONDS: int = 30
+    # Tolerated clock difference for exp/nbf, also applied to cached tokens
+    AUTH_CLOCK_SKEW_SECONDS: int = 30
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
     
     # CORS
     CORS_ORIGINS: Any = ["http://localhost:3000"]
@@ -44,6 +104,60 @@ class Settings(BaseSettings):
     # OpenAI Key TTL (hours)
     OPENAI_KEY_TTL_HOURS: int = 24
     
+    # Session key store: "memory" (single process) or "socket" (shared sidecar
+    # for multi-worker deployments, see app.core.key_sidecar)
+    KEY_STORE_BACKEND: str = "memory"
+    KEY_STORE_SOCKET: str = "/tmp/jobscout-keys.sock"
+    # Fernet key shared by the worker processes only, generated at launch.
+    # The sidecar holds ciphertext and never sees this secret.
+    KEY_STORE_SECRET: str = ""
+    KEY_STORE_TIMEOUT_SECONDS: float = 1.0
+    KEY_STORE_SWEEP_SECONDS: int = 300
+    
+    # zstd compression of job descriptions and scoring explanations
+    COMPRESSION_LEVEL: int = 6
+    COMPRESSION_DICT_SIZE: int = 112640
+    COMPRESSION_DICT_SAMPLE_SIZE: int = 5000
+    # New dictionaries are used for writes only after every worker has loaded them
+    COMPRESSION_DICT_REFRESH_MINUTES: int = 5
+    
+    # Retention sweeper (Setting.auto_purge_days)
+    RETENTION_SWEEP_INTERVAL_HOURS: int = 6
+    RETENTION_USER_BATCH_SIZE: int = 100
+    RETENTION_DELETE_CHUNK_SIZE: int = 500
+    RETENTION_VACUUM_PAGES: int = 2000
+    RETENTION_POSTING_GRACE_HOURS: int = 24
+    
+    # Per-user response cache for polled GET endpoints
+    RESPONSE_CACHE_SIZE: int = 1024
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    
+    # Per-user rate limits: burst size and sustained requests per minute
+    RATE_LIMIT_SEARCH_BURST: int = 3
+    RATE_LIMIT_SEARCH_PER_MINUTE: float = 1.0
+    RATE_LIMIT_UPLOAD_BURST: int = 5
+    RATE_LIMIT_UPLOAD_PER_MINUTE: float = 5.0
+    RATE_LIMIT_EXPORT_BURST: int = 3
+    RATE_LIMIT_EXPORT_PER_MINUTE: float = 2.0
+    # Concurrent searches / uploads / exports per user
+    RATE_LIMIT_MAX_CONCURRENT_PER_USER: int = 2
+    RATE_LIMIT_CONCURRENCY_RETRY_SECONDS: int = 10
+    
+    # Background search queue
+    SEARCH_WORKERS: int = 2
+    SEARCH_QUEUE_SIZE: int = 100
+    # Server-Sent Events: per-subscriber buffer and keep-alive interval
+    SEARCH_EVENT_BUFFER_SIZE: int = 256
+    SEARCH_EVENT_KEEPALIVE_SECONDS: int = 15
+    # Each process heartbeats the runs it owns; active runs whose heartbeat
+    # is older than SEARCH_RUN_STALE_SECONDS belonged to a dead process
+    SEARCH_RUN_HEARTBEAT_SECONDS: int = 30
+    SEARCH_RUN_STALE_SECONDS: int = 120
+    
+    # Near-duplicate postings (MinHash estimate of shingle Jaccard similarity)
+    DEDUP_ENABLED: bool = True
+    DEDUP_SIMILARITY_THRESHOLD: float = 0.8
+    
     # JobSpy
     JOBSPY_PROXY_URL: str = ""
     JOBSPY_MAX_RETRIES: int = 3
@@ -0,0 +1,110 @@
+"""
+Unix-socket sidecar that holds session keys for multi-worker deployments.
+
+Run one per host alongside the API workers:
+
+    python -m app.core.key_sidecar
+
+and start the workers with KEY_STORE_BACKEND=socket and a KEY_STORE_SECRET
+generated for that launch. Workers encrypt keys before sending them, so
+this process only ever holds ciphertext, and only in memory. Expired
+entries are swept every KEY_STORE_SWEEP_SECONDS.
+"""
+import asyncio
+import json
+import logging
+import os
+import stat
+from typing import Optional
+
+from app.core.config import settings
+from app.core.security import MemoryKeyBackend
+
+
+logger = logging.getLogger(__name__)
+
+
+async def handle_request(backend: MemoryKeyBackend, request: dict) -> dict:
+    """Apply one protocol request to the store."""
+    op = request.get("op")
+    if op == "put":
+        await backend.put(request["user"], request["value"], float(request["expires_at"]))
+        return {"ok": True}
+    if op == "get":
+        return {"ok": True, "value": await backend.get(request["user"])}
+    if op == "delete":
+        await backend.delete(request["user"])
+        return {"ok": True}
+    if op == "touch":
+        return {"ok": True, "value": await backend.touch(request["user"], float(request["expires_at"]))}
+    if op == "sweep":
+        return {"ok": True, "value": await backend.sweep()}
+    return {"ok": False, "error": f"Unknown op: {op}"}
+
+
+async def handle_connection(
+    backend: MemoryKeyBackend,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+):
+    """Serve newline-delimited JSON requests until the worker disconnects."""
+    try:
+        while line := await reader.readline():
+            try:
+                response = await handle_request(backend, json.loads(line))
+            except (ValueError, KeyError, TypeError) as e:
+                response = {"ok": False, "error": f"Bad request: {e}"}
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def sweep_forever(backend: MemoryKeyBackend, interval: int):
+    """Periodically drop expired keys."""
+    while True:
+        await asyncio.sleep(interval)
+        removed = await backend.sweep()
+        if removed:
+            logger.info("Key sidecar swept %d expired keys", removed)
+
+
+async def serve(path: Optional[str] = None, sweep_seconds: Optional[int] = None):
+    """Listen on the Unix socket, readable by the owning user only."""
+    path = path or settings.KEY_STORE_SOCKET
+    backend = MemoryKeyBackend()
+    
+    if os.path.exists(path):
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            raise RuntimeError(f"{path} exists and is not a socket")
+        os.unlink(path)
+    
+    old_umask = os.umask(0o177)
+    try:
+        server = await asyncio.start_unix_server(
+            lambda r, w: handle_connection(backend, r, w), path=path
+        )
+    finally:
+        os.umask(old_umask)
+    
+    sweeper = asyncio.create_task(
+        sweep_forever(backend, sweep_seconds or settings.KEY_STORE_SWEEP_SECONDS)
+    )
+    logger.info("Key sidecar listening on %s", path)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        sweeper.cancel()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=settings.LOG_LEVEL)
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
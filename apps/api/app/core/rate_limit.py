@@ -0,0 +1,184 @@
+"""
+Per-user rate limiting for expensive endpoints: a token bucket per
+(user, endpoint class) plus a cap on concurrent work per user. Limits are
+in-process, like the rest of the per-user runtime state: with several API
+workers each keeps its own buckets and slots, so the effective limits are
+multiplied by the number of workers.
+"""
+import time
+from collections import defaultdict
+from math import ceil
+from typing import AsyncIterator, Dict, Tuple
+from fastapi import Depends, HTTPException
+
+from app.core.auth import get_current_user_id
+from app.core.config import settings
+
+
+# Endpoint class -> (burst capacity, tokens refilled per minute)
+RATE_LIMITS: Dict[str, Tuple[int, float]] = {
+    "search": (settings.RATE_LIMIT_SEARCH_BURST, settings.RATE_LIMIT_SEARCH_PER_MINUTE),
+    "upload": (settings.RATE_LIMIT_UPLOAD_BURST, settings.RATE_LIMIT_UPLOAD_PER_MINUTE),
+    "export": (settings.RATE_LIMIT_EXPORT_BURST, settings.RATE_LIMIT_EXPORT_PER_MINUTE),
+}
+
+# Prune idle buckets once this many are tracked
+MAX_TRACKED_BUCKETS = 10000
+
+
+class RateLimitExceeded(HTTPException):
+    """429 with a Retry-After header (whole seconds)."""
+    
+    def __init__(self, detail: str, retry_after: float):
+        super().__init__(
+            status_code=429,
+            detail=detail,
+            headers={"Retry-After": str(max(1, ceil(retry_after)))},
+        )
+
+
+class RateLimiter:
+    """Token buckets keyed by (user_id, endpoint class)."""
+    
+    def __init__(self, limits: Dict[str, Tuple[int, float]]):
+        self.limits = limits
+        self._buckets: Dict[Tuple[str, str], Tuple[float, float]] = {}  # -> (tokens, updated_at)
+        self.allowed: Dict[str, int] = defaultdict(int)
+        self.limited: Dict[str, int] = defaultdict(int)
+    
+    def acquire(self, user_id: str, name: str) -> float:
+        """Take a token. Returns 0 on success, else seconds until one is available."""
+        capacity, per_minute = self.limits[name]
+        rate = per_minute / 60.0
+        now = time.monotonic()
+        
+        tokens, updated_at = self._buckets.get((user_id, name), (float(capacity), now))
+        tokens = min(float(capacity), tokens + (now - updated_at) * rate)
+        
+        if tokens < 1.0:
+            self._buckets[(user_id, name)] = (tokens, now)
+            self.limited[name] += 1
+            return (1.0 - tokens) / rate if rate > 0 else 60.0
+        
+        self._buckets[(user_id, name)] = (tokens - 1.0, now)
+        self.allowed[name] += 1
+        if len(self._buckets) > MAX_TRACKED_BUCKETS:
+            self._prune(now)
+        return 0.0
+    
+    def _prune(self, now: float) -> None:
+        # Buckets that have refilled completely carry no state worth keeping
+        for key, (tokens, updated_at) in list(self._buckets.items()):
+            capacity, per_minute = self.limits[key[1]]
+            if tokens + (now - updated_at) * per_minute / 60.0 >= capacity:
+                del self._buckets[key]
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            name: {"allowed": self.allowed[name], "limited": self.limited[name]}
+            for name in self.limits
+        }
+
+
+class ConcurrencyLimiter:
+    """Caps how many operations of a class one user can have in flight."""
+    
+    def __init__(self, max_per_user: int):
+        self.max_per_user = max_per_user
+        self._active: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.rejected: Dict[str, int] = defaultdict(int)
+    
+    def try_acquire(self, user_id: str, name: str) -> bool:
+        if self._active[(user_id, name)] >= self.max_per_user:
+            self.rejected[name] += 1
+            return False
+        self._active[(user_id, name)] += 1
+        return True
+    
+    def release(self, user_id: str, name: str) -> None:
+        key = (user_id, name)
+        self._active[key] -= 1
+        if self._active[key] <= 0:
+            del self._active[key]
+    
+    def hold_stream(self, user_id: str, name: str, stream: AsyncIterator) -> "HeldStream":
+        """Keep an acquired slot until a streaming body finishes or is abandoned."""
+        return HeldStream(self, user_id, name, stream)
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        in_flight: Dict[str, int] = defaultdict(int)
+        for (_, name), active in self._active.items():
+            in_flight[name] += active
+        return {
+            name: {"in_flight": in_flight[name], "rejected": self.rejected[name]}
+            for name in RATE_LIMITS
+        }
+
+
+class HeldStream:
+    """
+    Async iterable that releases a concurrency slot when iteration ends.
+    Also releases on garbage collection, for responses whose client left
+    before streaming started.
+    """
+    
+    def __init__(self, limiter: ConcurrencyLimiter, user_id: str, name: str, stream: AsyncIterator):
+        self._limiter = limiter
+        self._user_id = user_id
+        self._name = name
+        self._stream = stream
+        self._released = False
+    
+    def __aiter__(self) -> AsyncIterator:
+        return self._iterate()
+    
+    async def _iterate(self) -> AsyncIterator:
+        try:
+            async for chunk in self._stream:
+                yield chunk
+        finally:
+            self._release()
+    
+    def _release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._limiter.release(self._user_id, self._name)
+    
+    def __del__(self):
+        self._release()
+
+
+rate_limiter = RateLimiter(RATE_LIMITS)
+concurrency_limiter = ConcurrencyLimiter(max_per_user=settings.RATE_LIMIT_MAX_CONCURRENT_PER_USER)
+
+
+def acquire_slot(user_id: str, name: str) -> None:
+    """Take a concurrency slot or raise 429. The caller must release it."""
+    if not concurrency_limiter.try_acquire(user_id, name):
+        raise RateLimitExceeded(
+            f"Too many {name} operations in progress. Wait for one to finish.",
+            settings.RATE_LIMIT_CONCURRENCY_RETRY_SECONDS,
+        )
+
+
+def rate_limit(name: str):
+    """Dependency that spends one of the user's `name` tokens or raises 429."""
+    async def dependency(user_id: str = Depends(get_current_user_id)) -> str:
+        retry_after = rate_limiter.acquire(user_id, name)
+        if retry_after:
+            raise RateLimitExceeded(f"Rate limit exceeded for {name}. Try again later.", retry_after)
+        return user_id
+    
+    return dependency
+
+
+def limit_concurrency(name: str):
+    """Dependency holding a concurrency slot for the rest of the request."""
+    async def dependency(user_id: str = Depends(get_current_user_id)):
+        acquire_slot(user_id, name)
+        try:
+            yield user_id
+        finally:
+            concurrency_limiter.release(user_id, name)
+    
+    return dependency
@@ -0,0 +1,55 @@
+"""
+Fast response path: orjson rendering and batch validation with cached
+TypeAdapters. Handlers that return these responses bypass FastAPI's
+response_model pass, which would otherwise validate the payload again;
+response_model stays on the route for the OpenAPI schema.
+"""
+from functools import lru_cache
+from math import ceil
+from typing import Any, Iterable, List, Type
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (native datetime, UUID and dataclass support)."""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+def dump_many(schema: Type[BaseModel], rows: Iterable[Any]) -> List[dict]:
+    """
+    Validate rows (ORM objects, mappings or dicts) against `schema` in one
+    call. Datetimes are left as objects for orjson to encode.
+    """
+    adapter = _list_adapter(schema)
+    return adapter.dump_python(adapter.validate_python(list(rows), from_attributes=True))
+
+
+def dump_one(schema: Type[BaseModel], row: Any) -> dict:
+    return dump_many(schema, [row])[0]
+
+
+def api_response(data: Any = None) -> ORJSONResponse:
+    """ApiResponse envelope rendered with orjson."""
+    return ORJSONResponse({"success": True, "data": data, "error": None})
+
+
+def paginated_response(data: List[Any], total: int, page: int, page_size: int) -> ORJSONResponse:
+    """PaginatedResponse envelope rendered with orjson."""
+    return ORJSONResponse({
+        "success": True,
+        "data": data,
+        "error": None,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": ceil(total / page_size) if total > 0 else 0,
+    })
@@ -1,57 +1,255 @@
 """
-Security utilities: encryption and session-only key storage.
+Security utilities: encryption, session-only key storage and the
+in-memory decrypted resume cache.
 """
-from datetime import datetime, timedelta
-from typing import Optional
-from cryptography.fernet import Fernet
+import asyncio
+import hashlib
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+from cryptography.fernet import Fernet, InvalidToken
+from fastapi import HTTPException
 import json
 
 from app.core.config import settings
 
 
+logger = logging.getLogger(__name__)
+
+
+class KeyStoreUnavailable(HTTPException):
+    """503 when the shared key store cannot be reached."""
+    
+    def __init__(self, reason: str):
+        super().__init__(
+            status_code=503,
+            detail="Key storage is temporarily unavailable. Try again shortly.",
+        )
+        self.reason = reason
+    
+    def __str__(self) -> str:
+        return self.reason
+
+
+class KeyStoreBackend(ABC):
+    """
+    Storage for session keys. Implementations must keep keys in memory only:
+    never on disk, never in the database.
+    """
+    
+    @abstractmethod
+    async def put(self, user_id: str, value: str, expires_at: float) -> None:
+        ...
+    
+    @abstractmethod
+    async def get(self, user_id: str) -> Optional[str]:
+        ...
+    
+    @abstractmethod
+    async def delete(self, user_id: str) -> None:
+        ...
+    
+    @abstractmethod
+    async def touch(self, user_id: str, expires_at: float) -> bool:
+        ...
+    
+    @abstractmethod
+    async def sweep(self) -> int:
+        ...
+    
+    async def close(self) -> None:
+        pass
+
+
+class MemoryKeyBackend(KeyStoreBackend):
+    """Per-process dict. Only correct with a single API worker."""
+    
+    def __init__(self):
+        self._keys: Dict[str, Tuple[str, float]] = {}
+    
+    async def put(self, user_id: str, value: str, expires_at: float) -> None:
+        self._keys[user_id] = (value, expires_at)
+    
+    async def get(self, user_id: str) -> Optional[str]:
+        entry = self._keys.get(user_id)
+        if entry is None:
+            return None
+        if entry[1] <= time.time():
+            del self._keys[user_id]
+            return None
+        return entry[0]
+    
+    async def delete(self, user_id: str) -> None:
+        self._keys.pop(user_id, None)
+    
+    async def touch(self, user_id: str, expires_at: float) -> bool:
+        value = await self.get(user_id)
+        if value is None:
+            return False
+        self._keys[user_id] = (value, expires_at)
+        return True
+    
+    async def sweep(self) -> int:
+        """Drop expired entries. Returns how many were removed."""
+        now = time.time()
+        expired = [user_id for user_id, (_, expires_at) in self._keys.items() if expires_at <= now]
+        for user_id in expired:
+            del self._keys[user_id]
+        return len(expired)
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class SocketKeyBackend(KeyStoreBackend):
+    """
+    Client for the key sidecar (app.core.key_sidecar) over a local Unix
+    socket, shared by every worker on the host. Keys are encrypted with
+    KEY_STORE_SECRET before they leave the worker, so the sidecar holds
+    only ciphertext it cannot read.
+    """
+    
+    def __init__(self, path: str, secret: str, timeout: float):
+        if not secret:
+            raise ValueError("KEY_STORE_SECRET is required for the socket key store")
+        self.path = path
+        self.timeout = timeout
+        self._fernet = Fernet(secret.encode())
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock: Optional[asyncio.Lock] = None
+    
+    async def _call(self, request: dict) -> dict:
+        """Send one request, reconnecting once if the connection went away."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._writer is None:
+                        self._reader, self._writer = await asyncio.wait_for(
+                            asyncio.open_unix_connection(self.path), self.timeout
+                        )
+                    self._writer.write(json.dumps(request).encode() + b"\n")
+                    await self._writer.drain()
+                    line = await asyncio.wait_for(self._reader.readline(), self.timeout)
+                    if not line:
+                        raise ConnectionError("connection closed")
+                    response = json.loads(line)
+                    break
+                except (OSError, asyncio.TimeoutError, ConnectionError) as e:
+                    self._disconnect()
+                    if attempt:
+                        raise KeyStoreUnavailable(f"Key store sidecar unreachable: {e}") from e
+        if not response.get("ok"):
+            raise KeyStoreUnavailable(response.get("error", "Key store request failed"))
+        return response
+    
+    def _disconnect(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+    
+    async def put(self, user_id: str, value: str, expires_at: float) -> None:
+        # The user id is sealed in with the key so ciphertexts cannot be swapped
+        token = self._fernet.encrypt(f"{user_id}\0{value}".encode()).decode()
+        await self._call({"op": "put", "user": user_id, "value": token, "expires_at": expires_at})
+    
+    async def get(self, user_id: str) -> Optional[str]:
+        token = (await self._call({"op": "get", "user": user_id})).get("value")
+        if token is None:
+            return None
+        try:
+            owner, _, value = self._fernet.decrypt(token.encode()).decode().partition("\0")
+        except InvalidToken:
+            # Written under a previous launch's secret
+            return None
+        return value if owner == user_id else None
+    
+    async def delete(self, user_id: str) -> None:
+        await self._call({"op": "delete", "user": user_id})
+    
+    async def touch(self, user_id: str, expires_at: float) -> bool:
+        response = await self._call({"op": "touch", "user": user_id, "expires_at": expires_at})
+        return bool(response.get("value"))
+    
+    async def sweep(self) -> int:
+        return (await self._call({"op": "sweep"})).get("value", 0)
+    
+    async def close(self) -> None:
+        self._disconnect()
+
+
 class SessionKeyStore:
     """
-    In-memory key store with TTL. Keys are NEVER persisted to disk or database.
+    Key store with TTL. Keys are NEVER persisted to disk or database.
     This is intentional for security - keys are lost on server restart.
     """
     
-    def __init__(self, ttl_hours: int = 24):
-        self._keys: dict[str, tuple[str, datetime]] = {}
+    def __init__(self, backend: KeyStoreBackend, ttl_hours: int = 24):
+        self.backend = backend
         self.ttl = timedelta(hours=ttl_hours)
     
-    def store(self, user_id: str, key: str) -> None:
-        """Store an OpenAI key for a user with timestamp."""
-        self._keys[user_id] = (key, datetime.utcnow())
+    def _expires_at(self) -> float:
+        return time.time() + self.ttl.total_seconds()
+    
+    async def store(self, user_id: str, key: str) -> None:
+        """
+        Store an OpenAI key for a user, starting its TTL. Like clear() and
+        refresh(), raises KeyStoreUnavailable (a 503) if the sidecar is down.
+        """
+        await self.backend.put(user_id, key, self._expires_at())
     
-    def get(self, user_id: str) -> Optional[str]:
+    async def get(self, user_id: str) -> Optional[str]:
         """Get a stored key if it exists and hasn't expired."""
-        if user_id not in self._keys:
+        try:
+            return await self.backend.get(user_id)
+        except KeyStoreUnavailable as e:
+            logger.warning("Session key lookup failed: %s", e)
             return None
-        key, stored_at = self._keys[user_id]
-        if datetime.utcnow() - stored_at > self.ttl:
-            del self._keys[user_id]
-            return None
-        return key
     
-    def clear(self, user_id: str) -> None:
+    async def clear(self, user_id: str) -> None:
         """Remove a user's key from the store."""
-        self._keys.pop(user_id, None)
+        await self.backend.delete(user_id)
     
-    def has_key(self, user_id: str) -> bool:
+    async def has_key(self, user_id: str) -> bool:
         """Check if a valid key exists for the user."""
-        return self.get(user_id) is not None
+        return await self.get(user_id) is not None
     
-    def refresh(self, user_id: str) -> bool:
+    async def refresh(self, user_id: str) -> bool:
         """Refresh the TTL for a user's key. Returns False if no key exists."""
-        if user_id not in self._keys:
-            return False
-        key, _ = self._keys[user_id]
-        self._keys[user_id] = (key, datetime.utcnow())
-        return True
+        return await self.backend.touch(user_id, self._expires_at())
+    
+    async def sweep(self) -> int:
+        """Remove expired keys without waiting for them to be read."""
+        try:
+            return await self.backend.sweep()
+        except KeyStoreUnavailable as e:
+            logger.warning("Session key sweep failed: %s", e)
+            return 0
+    
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+def create_key_backend() -> KeyStoreBackend:
+    """Key store backend selected by KEY_STORE_BACKEND."""
+    if settings.KEY_STORE_BACKEND == "socket":
+        return SocketKeyBackend(
+            settings.KEY_STORE_SOCKET,
+            settings.KEY_STORE_SECRET,
+            settings.KEY_STORE_TIMEOUT_SECONDS,
+        )
+    if settings.KEY_STORE_BACKEND != "memory":
+        raise ValueError(f"Unknown KEY_STORE_BACKEND: {settings.KEY_STORE_BACKEND}")
+    return MemoryKeyBackend()
 
 
 # Global instance
-key_store = SessionKeyStore(ttl_hours=settings.OPENAI_KEY_TTL_HOURS)
+key_store = SessionKeyStore(create_key_backend(), ttl_hours=settings.OPENAI_KEY_TTL_HOURS)
 
 
 class DataEncryptor:
@@ -75,9 +273,71 @@ class DataEncryptor:
     
     def decrypt(self, encrypted_data: str) -> dict:
         """Decrypt a string back to a dictionary."""
-        decrypted = self._fernet.decrypt(encrypted_data.encode())
-        return json.loads(decrypted.decode())
+        return json.loads(self.decrypt_raw(encrypted_data))
+    
+    def decrypt_raw(self, encrypted_data: str) -> bytes:
+        """Decrypt a string to the plaintext JSON bytes."""
+        return self._fernet.decrypt(encrypted_data.encode())
 
 
 # Global encryptor instance
 encryptor = DataEncryptor()
+
+
+class ResumeCache:
+    """
+    Memory-only LRU of decrypted resumes, keyed by (profile_id, ciphertext
+    hash) so a rewritten resume can never be served stale. Bounded by total
+    plaintext size and a TTL. Returned dicts are shared: callers must not
+    mutate them.
+    """
+    
+    def __init__(self, encryptor: DataEncryptor, max_bytes: int, ttl_seconds: int):
+        self._encryptor = encryptor
+        self.max_bytes = max_bytes
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[Tuple[int, bytes], Tuple[float, int, dict]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def decrypt(self, profile_id: int, encrypted_data: str) -> dict:
+        """Decrypted resume for a profile, from cache when the ciphertext is unchanged."""
+        key = (profile_id, hashlib.sha256(encrypted_data.encode()).digest())
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+        
+        self.misses += 1
+        plaintext = self._encryptor.decrypt_raw(encrypted_data)
+        data = json.loads(plaintext)
+        
+        self._remove(key)
+        if len(plaintext) <= self.max_bytes:
+            self._entries[key] = (time.monotonic() + self.ttl, len(plaintext), data)
+            self._bytes += len(plaintext)
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+        return data
+    
+    def invalidate(self, profile_id: int) -> None:
+        """Drop every cached version of a profile's resume."""
+        for key in [k for k in self._entries if k[0] == profile_id]:
+            self._remove(key)
+    
+    def _remove(self, key: Tuple[int, bytes]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+    
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+resume_cache = ResumeCache(
+    encryptor,
+    max_bytes=settings.RESUME_CACHE_MAX_BYTES,
+    ttl_seconds=settings.RESUME_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,259 @@
+"""
+Size-bounded, streamed file uploads.
+
+Upload routes parse their multipart body here instead of through a File()
+parameter so the limit applies while the body is still arriving: a
+Content-Length over the limit is refused before anything is read, and a
+body that grows past it is cut off mid-stream. The file itself is spooled
+in memory up to UPLOAD_SPOOL_MEMORY_BYTES, then to a named temporary file
+that parser workers open by path, deleted when the upload is closed.
+"""
+import hashlib
+import io
+import tempfile
+from contextlib import asynccontextmanager
+from typing import IO, AsyncIterator, List, Optional, Tuple, Union
+
+from fastapi import HTTPException, Request
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.datastructures import Headers, UploadFile
+
+from app.core.config import settings
+
+
+# Room for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD = 16 * 1024
+
+# OpenAPI schema for routes that take a single "file" part
+FILE_UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                },
+            },
+        },
+    },
+}
+
+
+class UploadTooLarge(HTTPException):
+    """413 for uploads over the configured size."""
+    
+    def __init__(self, max_bytes: int):
+        super().__init__(
+            status_code=413,
+            detail=f"File too large. Maximum size is {max_bytes // (1024 * 1024)}MB",
+        )
+
+
+def _limited_request(request: Request, max_bytes: int) -> Request:
+    """Request whose body stream fails as soon as it exceeds max_bytes."""
+    limit = max_bytes + MULTIPART_OVERHEAD
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > limit:
+        raise UploadTooLarge(max_bytes)
+    
+    received = 0
+    receive = request.receive
+    
+    async def limited_receive():
+        nonlocal received
+        message = await receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > limit:
+                raise UploadTooLarge(max_bytes)
+        return message
+    
+    return Request(request.scope, limited_receive)
+
+
+class NamedSpooledFile(io.IOBase):
+    """
+    Binary file held in memory up to max_size, then moved to a named
+    temporary file other processes can open by `name`, deleted on close.
+    """
+    
+    def __init__(self, max_size: int):
+        super().__init__()
+        self.max_size = max_size
+        self.name: Optional[str] = None
+        self._file: IO[bytes] = io.BytesIO()
+    
+    def readable(self) -> bool:
+        return True
+    
+    def writable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+    
+    def write(self, data: bytes) -> int:
+        written = self._file.write(data)
+        if self.name is None and self._file.tell() > self.max_size:
+            self._rollover()
+        return written
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._file.seek(offset, whence)
+    
+    def tell(self) -> int:
+        return self._file.tell()
+    
+    def close(self) -> None:
+        if not self.closed:
+            self._file.close()
+        super().close()
+    
+    def _rollover(self) -> None:
+        memory = self._file
+        self._file = tempfile.NamedTemporaryFile(prefix="upload-")
+        self._file.write(memory.getbuffer())
+        self._file.seek(memory.tell())
+        self.name = self._file.name
+
+
+class _UploadParser:
+    """
+    Multipart parser keeping only the file in `field`, spooled into a
+    NamedSpooledFile. Other fields are skipped without being buffered.
+    """
+    
+    def __init__(self, request: Request, field: str, max_fields: int = 8):
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        boundary = params.get(b"boundary")
+        if content_type != b"multipart/form-data" or not boundary:
+            raise HTTPException(status_code=400, detail="Expected a multipart/form-data body")
+        
+        self.request = request
+        self.field = field
+        self.max_fields = max_fields
+        self.upload: Optional[UploadFile] = None
+        self._parts = 0
+        self._files = 0
+        self._headers: List[Tuple[bytes, bytes]] = []
+        self._header_field = b""
+        self._header_value = b""
+        self._receiving = False
+        self._pending: List[bytes] = []
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+        })
+    
+    def _on_part_begin(self) -> None:
+        self._parts += 1
+        # The fields plus the one file
+        if self._parts > self.max_fields + 1:
+            raise HTTPException(status_code=400, detail="Too many fields in the form")
+        self._headers = []
+        self._receiving = False
+    
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+    
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+    
+    def _on_header_end(self) -> None:
+        self._headers.append((self._header_field.lower(), self._header_value))
+        self._header_field = b""
+        self._header_value = b""
+    
+    def _on_headers_finished(self) -> None:
+        disposition = dict(self._headers).get(b"content-disposition", b"")
+        _, options = parse_options_header(disposition)
+        filename = options.get(b"filename")
+        if filename is None:
+            return
+        self._files += 1
+        if self._files > 1:
+            raise HTTPException(status_code=400, detail="Upload a single file")
+        if options.get(b"name", b"").decode("utf-8", "replace") != self.field:
+            return
+        self.upload = UploadFile(
+            file=NamedSpooledFile(max_size=settings.UPLOAD_SPOOL_MEMORY_BYTES),
+            size=0,
+            filename=filename.decode("utf-8", "replace"),
+            headers=Headers(raw=self._headers),
+        )
+        self._receiving = True
+    
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._receiving:
+            self._pending.append(data[start:end])
+    
+    async def parse(self) -> Optional[UploadFile]:
+        """Read the whole body; the caller closes the returned upload."""
+        try:
+            async for chunk in self.request.stream():
+                self._parser.write(chunk)
+                for data in self._pending:
+                    await self.upload.write(data)
+                self._pending.clear()
+            self._parser.finalize()
+        except MultipartParseError:
+            await self._close()
+            raise HTTPException(status_code=400, detail="Malformed multipart body")
+        except BaseException:
+            await self._close()
+            raise
+        return self.upload
+    
+    async def _close(self) -> None:
+        if self.upload is not None:
+            await self.upload.close()
+
+
+@asynccontextmanager
+async def receive_upload(
+    request: Request,
+    max_bytes: int,
+    field: str = "file",
+) -> AsyncIterator[UploadFile]:
+    """Stream the multipart body and yield its single file, closed on exit."""
+    file = await _UploadParser(_limited_request(request, max_bytes), field).parse()
+    if file is None or not file.filename:
+        if file is not None:
+            await file.close()
+        raise HTTPException(status_code=400, detail="No file provided")
+    try:
+        if file.size is not None and file.size > max_bytes:
+            raise UploadTooLarge(max_bytes)
+        yield file
+    finally:
+        await file.close()
+
+
+@asynccontextmanager
+async def upload_source(file: UploadFile) -> AsyncIterator[Tuple[Union[bytes, str], str]]:
+    """
+    The upload in a form a worker process can read, with its SHA-256: the
+    bytes themselves when small, otherwise the path of the spooled file.
+    Large uploads are hashed in chunks and never held in memory whole.
+    """
+    await file.seek(0)
+    path = getattr(file.file, "name", None)
+    if not isinstance(path, str):
+        data = await file.read()
+        yield data, hashlib.sha256(data).hexdigest()
+        return
+    
+    digest = hashlib.sha256()
+    while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+        digest.update(chunk)
+    yield path, digest.hexdigest()
@@ -1,14 +1,25 @@
 """
 FastAPI Application Entry Point
 """
+import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.routers import auth, resume, jobs, scoring, settings, metrics, profiles
 from app.models.database import init_db
+from app.core.auth import clerk_auth
 from app.core.config import settings as app_settings
+from app.core.security import key_store
+from app.core.responses import ORJSONResponse
 from app.services.scheduler import job_scheduler
+from app.core.compression import UnknownDictionary
+from app.services.compression_dictionaries import load_dictionaries, load_missing_dictionaries
+from app.services.search_queue import search_queue
+from app.services.resume_parser import resume_parser_pool
+
+
+logging.basicConfig(level=app_settings.LOG_LEVEL, format="%(levelname)s:     %(name)s - %(message)s")
 
 
 @asynccontextmanager
@@ -16,10 +27,17 @@ async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
     await init_db()
-    job_scheduler.start()
+    await load_dictionaries()
+    await search_queue.start()
+    await clerk_auth.prefetch()
+    await job_scheduler.start()
     yield
     # Shutdown
-    job_scheduler.shutdown()
+    await job_scheduler.shutdown()
+    await search_queue.stop()
+    await clerk_auth.close()
+    await key_store.close()
+    resume_parser_pool.shutdown()
 
 
 app = FastAPI(
@@ -27,6 +45,7 @@ app = FastAPI(
     description="AI-powered job search engine backend",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -48,6 +67,17 @@ app.include_router(metrics.router, prefix="/api/metrics", tags=["metrics"])
 app.include_router(profiles.router, prefix="/api/profiles", tags=["profiles"])
 
 
+@app.exception_handler(UnknownDictionary)
+async def unknown_dictionary_handler(request: Request, exc: UnknownDictionary):
+    """Fetch the missing dictionary without blocking the loop; a retry can then decode the row."""
+    await load_missing_dictionaries()
+    return ORJSONResponse(
+        status_code=503,
+        content={"detail": "Stored data is being refreshed. Try again."},
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
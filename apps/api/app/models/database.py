@@ -2,12 +2,24 @@
 SQLAlchemy database models and setup.
 """
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, ForeignKey, JSON
+from pathlib import Path
+from sqlalchemy import (
+    Column, String, Integer, BigInteger, Float, Boolean, DateTime, Text, LargeBinary,
+    ForeignKey, JSON, Index, event, inspect, text,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import relationship, DeclarativeBase
+from sqlalchemy.orm import relationship, deferred, DeclarativeBase
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from app.core.config import settings
+from app.core.compression import CompressedText, CompressedJSON
+
+
+# JSON on SQLite, JSONB on PostgreSQL
+JSONType = JSON().with_variant(JSONB(), "postgresql")
 
 
 class Base(DeclarativeBase):
@@ -22,6 +34,8 @@ class User(Base):
     id = Column(String, primary_key=True)  # Clerk user ID
     email = Column(String, unique=True, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Bumped with every commit that changes the user's data; keys ETags
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships
     profiles = relationship("Profile", back_populates="user", cascade="all, delete-orphan")
@@ -38,7 +52,7 @@ class Profile(Base):
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     name = Column(String, nullable=False)
     resume_data = Column(Text, nullable=True)  # Encrypted JSON
-    search_config = Column(JSON, nullable=True)  # {sources, terms, locations, salary, exclusions}
+    search_config = Column(JSONType, nullable=True)  # {sources, terms, locations, salary, exclusions}
     schedule_interval = Column(String, default="manual")  # manual|1h|3h|6h|12h|24h
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -50,28 +64,54 @@ class Profile(Base):
     search_runs = relationship("SearchRun", back_populates="profile")
 
 
-class Job(Base):
-    """Scraped job listing with scoring."""
-    __tablename__ = "jobs"
+class Posting(Base):
+    """Canonical job posting, stored once and shared by every user who scraped it."""
+    __tablename__ = "postings"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(String, ForeignKey("users.id"), nullable=False)
-    profile_id = Column(Integer, ForeignKey("profiles.id"), nullable=True)
+    dedup_key = Column(String, nullable=False, unique=True)  # source:external_id or sha256:content_hash
+    content_hash = Column(String(64), nullable=False, index=True)
     external_id = Column(String, nullable=True)  # Job board ID
     title = Column(String, nullable=False)
     company = Column(String, nullable=True)
     location = Column(String, nullable=True)
     salary_min = Column(Integer, nullable=True)
     salary_max = Column(Integer, nullable=True)
-    description = Column(Text, nullable=True)
+    description = deferred(Column(CompressedText, nullable=True), group="details")  # Loaded by detail views only
     url = Column(String, nullable=True)
     source = Column(String, nullable=True)  # indeed, linkedin, etc.
+    created_at = Column(DateTime, default=datetime.utcnow)  # First seen
+    last_seen_at = Column(DateTime, default=datetime.utcnow)  # Last scraped; orphans are purged after a grace period
+    minhash = deferred(Column(LargeBinary, nullable=True))  # MinHash signature for near-duplicate detection
+    
+    # Relationships
+    user_jobs = relationship("Job", back_populates="posting")
+
+
+class PostingBucket(Base):
+    """LSH band bucket of a posting's MinHash signature."""
+    __tablename__ = "posting_buckets"
+    
+    bucket = Column(String, primary_key=True)  # "<band>:<band hash>"
+    posting_id = Column(Integer, ForeignKey("postings.id"), primary_key=True, index=True)
+
+
+class Job(Base):
+    """A user's scored copy of a posting."""
+    __tablename__ = "user_jobs"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    profile_id = Column(Integer, ForeignKey("profiles.id"), nullable=True)
+    posting_id = Column(Integer, ForeignKey("postings.id"), nullable=False)
     
     # Scoring
     score = Column(Float, nullable=True)
     tier = Column(String, nullable=True)  # A, B, C, D
-    matched_skills = Column(JSON, nullable=True)  # ["Python", "React", ...]
-    scoring_breakdown = Column(JSON, nullable=True)  # Full breakdown
+    matched_skills = Column(JSONType, nullable=True)  # ["Python", "React", ...]
+    scoring_breakdown = deferred(
+        Column(CompressedJSON(fields=("explanation",)), nullable=True), group="details"
+    )  # Full breakdown
     
     # User interaction
     status = Column(String, default="new")  # new, applied, saved, hidden
@@ -81,6 +121,41 @@ class Job(Base):
     # Relationships
     user = relationship("User", back_populates="jobs")
     profile = relationship("Profile", back_populates="jobs")
+    posting = relationship("Posting", back_populates="user_jobs")
+    
+    # Posting fields, read through the (eagerly loaded) posting
+    external_id = association_proxy("posting", "external_id")
+    title = association_proxy("posting", "title")
+    company = association_proxy("posting", "company")
+    location = association_proxy("posting", "location")
+    salary_min = association_proxy("posting", "salary_min")
+    salary_max = association_proxy("posting", "salary_max")
+    description = association_proxy("posting", "description")
+    url = association_proxy("posting", "url")
+    source = association_proxy("posting", "source")
+    
+    __table_args__ = (
+        Index("ix_user_jobs_user_id_score", "user_id", "score"),
+        Index("ix_user_jobs_user_id_created_at", "user_id", "created_at"),
+        Index("ix_user_jobs_posting_id", "posting_id"),
+        Index("ix_user_jobs_matched_skills_gin", "matched_skills", postgresql_using="gin").ddl_if(dialect="postgresql"),
+        Index(
+            "ix_user_jobs_scoring_breakdown_gin", "scoring_breakdown",
+            postgresql_using="gin", postgresql_ops={"scoring_breakdown": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+# Job attributes that live on the shared posting row
+POSTING_FIELDS = (
+    "external_id", "title", "company", "location", "salary_min", "salary_max",
+    "description", "url", "source",
+)
+
+
+def job_column(name: str):
+    """Column for a job field, resolving posting fields to the postings table."""
+    return getattr(Posting if name in POSTING_FIELDS else Job, name)
 
 
 class SearchRun(Base):
@@ -92,7 +167,10 @@ class SearchRun(Base):
     profile_id = Column(Integer, ForeignKey("profiles.id"), nullable=True)
     started_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
-    status = Column(String, default="running")  # running, completed, failed
+    status = Column(String, default="running")  # queued, running, completed, failed, needs_key
+    stage = Column(String, nullable=True)  # queued, scraping, scoring, done
+    owner = Column(String, nullable=True)  # instance id of the API process running it
+    heartbeat_at = Column(DateTime, nullable=True)
     jobs_found = Column(Integer, default=0)
     jobs_scored = Column(Integer, default=0)
     error_message = Column(Text, nullable=True)
@@ -101,6 +179,33 @@ class SearchRun(Base):
     # Relationships
     user = relationship("User", back_populates="search_runs")
     profile = relationship("Profile", back_populates="search_runs")
+    
+    __table_args__ = (
+        Index("ix_search_runs_user_id_started_at", "user_id", "started_at"),
+    )
+
+
+class UserJobStat(Base):
+    """Per-user job counts by status x tier, maintained incrementally."""
+    __tablename__ = "user_job_stats"
+    
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    status = Column(String, primary_key=True)
+    tier = Column(String, primary_key=True)  # "" for unscored jobs
+    job_count = Column(Integer, nullable=False, default=0)
+    scored_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+
+
+class CompressionDictionary(Base):
+    """Trained zstd dictionary. The id is the zstd dictionary id."""
+    __tablename__ = "compression_dictionaries"
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=False)
+    data = Column(LargeBinary, nullable=False)
+    sample_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    active_after = Column(DateTime, nullable=False)  # Used for writes from this time on
 
 
 class Setting(Base):
@@ -118,14 +223,46 @@ class Setting(Base):
 
 
 # Database engine and session
+def _engine_options(url: str) -> dict:
+    """Pool tuning for server databases. SQLite keeps SQLAlchemy's defaults."""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_pre_ping": True,
+    }
+
+
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=False,
+    echo=settings.DB_ECHO,
+    **_engine_options(settings.DATABASE_URL),
 )
 
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        """WAL lets readers run during retention deletes; incremental vacuum
+        (effective on databases created with it) lets the sweeper reclaim pages."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
+def insert_for(session: AsyncSession):
+    """Dialect-specific insert() so callers can use ON CONFLICT upserts."""
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+
 async def get_db():
     """Dependency to get database session."""
     async with async_session() as session:
@@ -139,7 +276,36 @@ async def get_db():
             await session.close()
 
 
+# Alembic configuration shipped next to the app package
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# Revision that matches the schema previously created by create_all()
+BASELINE_REVISION = "0001"
+
+# Arbitrary key for serializing migrations across API replicas
+MIGRATION_LOCK_ID = 0x4A6F6253
+
+
+def _run_migrations(connection) -> None:
+    """Upgrade the schema to head on an open sync connection."""
+    from alembic import command
+    from alembic.config import Config
+    
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["connection"] = connection
+    
+    # Databases created by create_all() before migrations existed
+    tables = inspect(connection).get_table_names()
+    if "alembic_version" not in tables and "users" in tables:
+        command.stamp(config, BASELINE_REVISION)
+    
+    command.upgrade(config, "head")
+
+
 async def init_db():
-    """Initialize database tables."""
+    """Bring the database schema up to date by running migrations."""
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        if conn.dialect.name == "postgresql":
+            # Only one replica migrates at a time; the others wait and no-op
+            await conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        await conn.run_sync(_run_migrations)
@@ -169,10 +169,43 @@ class JobResponse(JobBase):
         from_attributes = True
 
 
+class JobListItem(BaseModel):
+    """Slim job row for list views (no description or scoring breakdown)."""
+    id: int
+    profile_id: Optional[int] = None
+    title: str
+    company: Optional[str] = None
+    location: Optional[str] = None
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    url: Optional[str] = None
+    source: Optional[str] = None
+    score: Optional[float] = None
+    tier: Optional[str] = None
+    matched_skills: Optional[List[str]] = None
+    status: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class JobStatusUpdate(BaseModel):
     status: str = Field(..., pattern="^(new|applied|saved|hidden)$")
 
 
+class JobBulkStatusUpdate(BaseModel):
+    """Target either explicit ids or every job matching the filters (combined with AND)."""
+    status: str = Field(..., pattern="^(new|applied|saved|hidden)$")
+    ids: Optional[List[int]] = Field(None, max_length=5000)
+    tier: Optional[str] = Field(None, pattern="^[ABCD]$")
+    source: Optional[str] = None
+    min_score: Optional[float] = None
+    max_score: Optional[float] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+
 class JobsQueryParams(BaseModel):
     page: int = 1
     page_size: int = 20
@@ -242,6 +275,7 @@ class SearchRunResponse(BaseModel):
     started_at: datetime
     completed_at: Optional[datetime]
     status: str
+    stage: Optional[str] = None
     jobs_found: int
     jobs_scored: int
     error_message: Optional[str]
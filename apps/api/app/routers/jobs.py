@@ -1,27 +1,57 @@
 """
 Jobs router - CRUD and search operations.
 """
-from math import ceil
-from fastapi import APIRouter, Depends, HTTPException, Query
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc, asc
-from typing import Optional
+from sqlalchemy import select, update, func, desc, asc
+from sqlalchemy.orm import joinedload, undefer_group
+from typing import List, Optional
 
-from app.models.database import get_db, Job, Profile
+from app.models.database import async_session, get_db, job_column, Job, Posting, Profile, SearchRun
 from app.models.schemas import (
-    JobResponse, JobStatusUpdate, ApiResponse, PaginatedResponse,
+    JobResponse, JobListItem, JobStatusUpdate, JobBulkStatusUpdate, SearchRunResponse,
+    ApiResponse, PaginatedResponse,
 )
 from app.core.auth import get_current_user_id
-from app.services.job_scraper import scrape_jobs
-from app.services.scorer import score_jobs
+from app.core.cache import cached_response, mark_user_changed
+from app.core.rate_limit import rate_limit
+from app.core.responses import api_response, dump_many, dump_one, paginated_response
+from app.services import job_stats
+from app.services.search_queue import ACTIVE_STATUSES, enqueue_search, run_progress
+from app.services.search_events import TERMINAL_EVENTS, search_events
 from app.core.security import key_store
+from app.core.config import settings
 
 
 router = APIRouter()
 
 
+# Columns a list row may carry. Heavy columns (description, scoring_breakdown)
+# are deferred on the models and only loaded by get_job.
+LIST_FIELDS = {name: job_column(name) for name in JobListItem.model_fields}
+
+
+def _parse_fields(fields: Optional[str]) -> List[str]:
+    """Parse a comma-separated sparse fieldset. The id is always included."""
+    if not fields:
+        return list(LIST_FIELDS)
+    
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in LIST_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(LIST_FIELDS)}",
+        )
+    
+    return ["id"] + [f for f in dict.fromkeys(requested) if f != "id"]
+
+
 @router.get("", response_model=PaginatedResponse)
 async def list_jobs(
+    request: Request,
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db),
     page: int = Query(1, ge=1),
@@ -30,68 +60,80 @@ async def list_jobs(
     source: Optional[str] = None,
     tier: Optional[str] = None,
     min_score: Optional[float] = None,
-    sort_by: str = Query("score", regex="^(score|created_at|salary_max)$"),
-    sort_order: str = Query("desc", regex="^(asc|desc)$"),
+    sort_by: str = Query("score", pattern="^(score|created_at|salary_max)$"),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$"),
     search: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return"),
 ):
-    """List jobs with pagination, filtering, and sorting."""
-    # Base query
-    query = select(Job).where(Job.user_id == user_id)
-    count_query = select(func.count()).select_from(Job).where(Job.user_id == user_id)
-    
-    # Apply filters
-    if status:
-        query = query.where(Job.status == status)
-        count_query = count_query.where(Job.status == status)
-    
-    if source:
-        query = query.where(Job.source == source)
-        count_query = count_query.where(Job.source == source)
-    
-    if tier:
-        query = query.where(Job.tier == tier)
-        count_query = count_query.where(Job.tier == tier)
-    
-    if min_score is not None:
-        query = query.where(Job.score >= min_score)
-        count_query = count_query.where(Job.score >= min_score)
-    
-    if search:
-        search_filter = f"%{search}%"
-        query = query.where(
-            (Job.title.ilike(search_filter)) | 
-            (Job.company.ilike(search_filter))
+    """
+    List jobs with pagination, filtering, and sorting. Served from the
+    response cache (or 304) until the user's data changes.
+    """
+    async def build():
+        selected = _parse_fields(fields)
+        
+        # Filters shared by the page and count queries
+        conditions = [Job.user_id == user_id]
+        
+        if status:
+            conditions.append(Job.status == status)
+        
+        if source:
+            conditions.append(Posting.source == source)
+        
+        if tier:
+            conditions.append(Job.tier == tier)
+        
+        if min_score is not None:
+            conditions.append(Job.score >= min_score)
+        
+        if search:
+            search_filter = f"%{search}%"
+            conditions.append(
+                (Posting.title.ilike(search_filter)) | 
+                (Posting.company.ilike(search_filter))
+            )
+        
+        # Get total count
+        count_query = (
+            select(func.count())
+            .select_from(Job)
+            .join(Posting, Job.posting_id == Posting.id)
+            .where(*conditions)
         )
-        count_query = count_query.where(
-            (Job.title.ilike(search_filter)) | 
-            (Job.company.ilike(search_filter))
+        total_result = await db.execute(count_query)
+        total = total_result.scalar() or 0
+        
+        # Column-level select of the requested fields only
+        query = (
+            select(*(LIST_FIELDS[name] for name in selected))
+            .select_from(Job)
+            .join(Posting, Job.posting_id == Posting.id)
+            .where(*conditions)
         )
+        
+        # Apply sorting
+        sort_column = job_column(sort_by)
+        order_func = desc if sort_order == "desc" else asc
+        query = query.order_by(order_func(sort_column))
+        
+        # Apply pagination
+        offset = (page - 1) * page_size
+        query = query.offset(offset).limit(page_size)
+        
+        # Execute query
+        result = await db.execute(query)
+        rows = result.mappings().all()
+        
+        # Full rows are validated in one batch; sparse rows come straight from typed columns
+        if len(selected) == len(LIST_FIELDS):
+            data = dump_many(JobListItem, rows)
+        else:
+            data = [dict(row) for row in rows]
+        
+        return paginated_response(data, total=total, page=page, page_size=page_size)
     
-    # Get total count
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-    
-    # Apply sorting
-    sort_column = getattr(Job, sort_by)
-    order_func = desc if sort_order == "desc" else asc
-    query = query.order_by(order_func(sort_column))
-    
-    # Apply pagination
-    offset = (page - 1) * page_size
-    query = query.offset(offset).limit(page_size)
-    
-    # Execute query
-    result = await db.execute(query)
-    jobs = result.scalars().all()
-    
-    return PaginatedResponse(
-        success=True,
-        data=[JobResponse.model_validate(job) for job in jobs],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=ceil(total / page_size) if total > 0 else 0,
-    )
+    return await cached_response(request, db, user_id, build)
 
 
 @router.get("/{job_id}", response_model=ApiResponse)
@@ -102,14 +144,19 @@ async def get_job(
 ):
     """Get a single job with full details."""
     result = await db.execute(
-        select(Job).where(Job.id == job_id, Job.user_id == user_id)
+        select(Job)
+        .options(
+            undefer_group("details"),
+            joinedload(Job.posting).undefer_group("details"),
+        )
+        .where(Job.id == job_id, Job.user_id == user_id)
     )
     job = result.scalar_one_or_none()
     
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    return ApiResponse(success=True, data=JobResponse.model_validate(job))
+    return api_response(dump_one(JobResponse, job))
 
 
 @router.put("/{job_id}/status", response_model=ApiResponse)
@@ -128,23 +175,70 @@ async def update_job_status(
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
+    old_status = job.status
     job.status = status_update.status
+    await job_stats.record_status_change(db, user_id, job, old_status)
+    mark_user_changed(db, user_id)
     
     return ApiResponse(success=True, data={"status": job.status})
 
 
-@router.post("/search", response_model=ApiResponse)
-async def trigger_search(
+@router.put("/status", response_model=ApiResponse)
+async def bulk_update_job_status(
+    bulk_update: JobBulkStatusUpdate,
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db),
+):
+    """Set the status of many jobs at once, by ids and/or filters, in one UPDATE."""
+    conditions = []
+    if bulk_update.ids is not None:
+        conditions.append(Job.id.in_(bulk_update.ids))
+    if bulk_update.tier:
+        conditions.append(Job.tier == bulk_update.tier)
+    if bulk_update.source:
+        conditions.append(Job.posting_id.in_(
+            select(Posting.id).where(Posting.source == bulk_update.source)
+        ))
+    if bulk_update.min_score is not None:
+        conditions.append(Job.score >= bulk_update.min_score)
+    if bulk_update.max_score is not None:
+        conditions.append(Job.score <= bulk_update.max_score)
+    if bulk_update.created_after:
+        conditions.append(Job.created_at >= bulk_update.created_after)
+    if bulk_update.created_before:
+        conditions.append(Job.created_at < bulk_update.created_before)
+    
+    if not conditions:
+        raise HTTPException(status_code=400, detail="Provide ids or at least one filter")
+    
+    # Jobs already in the target status are left alone and not counted
+    conditions.append(Job.status != bulk_update.status)
+    
+    await job_stats.record_bulk_status_change(db, user_id, bulk_update.status, *conditions)
+    result = await db.execute(
+        update(Job)
+        .where(Job.user_id == user_id, *conditions)
+        .values(status=bulk_update.status)
+        .execution_options(synchronize_session=False)
+    )
+    mark_user_changed(db, user_id)
+    
+    return ApiResponse(success=True, data={"status": bulk_update.status, "updated": result.rowcount})
+
+
+@router.post("/search", response_model=ApiResponse, status_code=202)
+async def trigger_search(
+    user_id: str = Depends(rate_limit("search")),
+    db: AsyncSession = Depends(get_db),
     profile_id: Optional[int] = None,
 ):
     """
-    Trigger a manual job search.
-    Requires an active OpenAI key in session.
+    Queue a manual job search and return its SearchRun immediately.
+    Requires an active OpenAI key in session. Poll GET /search/{run_id}
+    for progress. Rate limited, with a cap on searches in flight per user.
     """
     # Check for OpenAI key
-    if not key_store.has_key(user_id):
+    if not await key_store.has_key(user_id):
         raise HTTPException(
             status_code=400,
             detail="OpenAI key required. Please enter your key in settings.",
@@ -156,8 +250,12 @@ async def trigger_search(
             select(Profile).where(Profile.id == profile_id, Profile.user_id == user_id)
         )
     else:
+        # Several profiles may be active; search with the oldest of them
         result = await db.execute(
-            select(Profile).where(Profile.user_id == user_id, Profile.is_active.is_(True))
+            select(Profile)
+            .where(Profile.user_id == user_id, Profile.is_active.is_(True))
+            .order_by(Profile.id)
+            .limit(1)
         )
     
     profile = result.scalar_one_or_none()
@@ -168,21 +266,105 @@ async def trigger_search(
     if not profile.search_config:
         raise HTTPException(status_code=400, detail="Profile has no search configuration")
     
+    search_run = await enqueue_search(db, user_id, profile.id)
+    if search_run is None:
+        raise HTTPException(status_code=503, detail="Search queue is full. Try again shortly.")
+    
+    return ApiResponse(success=True, data=SearchRunResponse.model_validate(search_run))
+
+
+@router.get("/search/{run_id}", response_model=ApiResponse)
+async def get_search_run(
+    run_id: int,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get the status and progress of a search run."""
+    result = await db.execute(
+        select(SearchRun).where(SearchRun.id == run_id, SearchRun.user_id == user_id)
+    )
+    search_run = result.scalar_one_or_none()
+    
+    if not search_run:
+        raise HTTPException(status_code=404, detail="Search run not found")
+    
+    return ApiResponse(success=True, data=SearchRunResponse.model_validate(search_run))
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _run_gone(run_id: int) -> str:
+    return _sse("error", {"run_id": run_id, "detail": "Search run not found"})
+
+
+async def _search_event_stream(run_id: int):
+    """
+    Current progress, then live events until the run finishes. Subscribes
+    before reading the snapshot so nothing published in between is missed.
+    
+    Events are published in the process running the search, so with several
+    API workers a stream served by another worker only sees the run's final
+    state, picked up by the keep-alive poll.
+    """
+    subscription = search_events.subscribe(run_id)
     try:
-        # Scrape jobs
-        raw_jobs = await scrape_jobs(profile.search_config)
+        async with async_session() as db:
+            search_run = await db.get(SearchRun, run_id)
         
-        # Score jobs with OpenAI
-        openai_key = key_store.get(user_id)
-        scored_jobs = await score_jobs(raw_jobs, profile, openai_key, db, user_id)
+        # Deleted since the endpoint checked it (e.g. a purge)
+        if search_run is None:
+            yield _run_gone(run_id)
+            return
+        snapshot = run_progress(search_run)
+        if search_run.status not in ACTIVE_STATUSES:
+            yield _sse("done", snapshot)
+            return
+        yield _sse("progress", snapshot)
         
-        return ApiResponse(
-            success=True,
-            data={
-                "jobs_found": len(raw_jobs),
-                "jobs_scored": len(scored_jobs),
-            },
-        )
+        while True:
+            message = await subscription.get(timeout=settings.SEARCH_EVENT_KEEPALIVE_SECONDS)
+            if message is None:
+                # Quiet period: the run may have ended without an event (e.g. restart)
+                async with async_session() as db:
+                    search_run = await db.get(SearchRun, run_id)
+                if search_run is None:
+                    yield _run_gone(run_id)
+                    return
+                if search_run.status not in ACTIVE_STATUSES:
+                    yield _sse("done", run_progress(search_run))
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            
+            yield _sse(message["event"], message["data"])
+            if message["event"] in TERMINAL_EVENTS:
+                return
+    finally:
+        search_events.unsubscribe(subscription)
+
+
+@router.get("/search/{run_id}/events")
+async def stream_search_events(
+    run_id: int,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Server-Sent Events for a search run: `progress` on stage and count
+    changes, `job` for each scored job, then `done`. A client that cannot
+    keep up receives `dropped` and should reconnect; `error` means the run
+    was deleted.
+    """
+    result = await db.execute(
+        select(SearchRun.id).where(SearchRun.id == run_id, SearchRun.user_id == user_id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Search run not found")
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+    return StreamingResponse(
+        _search_event_stream(run_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -2,15 +2,22 @@
 Metrics and analytics router.
 """
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
-from app.models.database import get_db, Job, SearchRun, Profile
+from app.models.database import get_db, SearchRun, Profile
 from app.models.schemas import DashboardStats, SystemHealth, SearchRunResponse, ApiResponse
-from app.core.auth import get_current_user_id
-from app.core.security import key_store
+from app.core.auth import get_current_user_id, verified_tokens
+from app.core.cache import cached_response, response_cache
+from app.core.rate_limit import concurrency_limiter, rate_limiter
+from app.core.responses import api_response
+from app.core.security import key_store, resume_cache
+from app.services.resume_parser import parsed_resume_cache
 from app.services.scheduler import job_scheduler
+from app.services import job_stats
+from app.services.search_events import search_events
+from app.services.search_queue import search_queue
 
 
 router = APIRouter()
@@ -37,69 +44,51 @@ SCORING_FORMULA = {
 
 @router.get("/overview", response_model=ApiResponse)
 async def get_overview(
+    request: Request,
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get dashboard statistics overview."""
-    # Count jobs by status
-    status_counts = {}
-    for status in ["new", "applied", "saved", "hidden"]:
-        result = await db.execute(
-            select(func.count()).select_from(Job).where(
-                Job.user_id == user_id, Job.status == status
-            )
-        )
-        status_counts[status] = result.scalar() or 0
-    
-    total_jobs = sum(status_counts.values())
-    
-    # Calculate average score
-    result = await db.execute(
-        select(func.avg(Job.score)).where(
-            Job.user_id == user_id, Job.score.isnot(None)
+    """Get dashboard statistics overview from the per-user aggregate rows."""
+    async def build():
+        status_counts = {status: 0 for status in ["new", "applied", "saved", "hidden"]}
+        tier_distribution = {tier: 0 for tier in ["A", "B", "C", "D"]}
+        scored_count = 0
+        score_sum = 0.0
+        high_tier_applied = 0
+        
+        for row in await job_stats.get_user_stats(db, user_id):
+            if row.status in status_counts:
+                status_counts[row.status] += row.job_count
+            if row.tier in tier_distribution:
+                tier_distribution[row.tier] += row.job_count
+            if row.status == "applied" and row.tier in ("A", "B"):
+                high_tier_applied += row.job_count
+            scored_count += row.scored_count
+            score_sum += row.score_sum
+        
+        total_jobs = sum(status_counts.values())
+        avg_score = score_sum / scored_count if scored_count > 0 else 0.0
+        
+        # Interview likelihood (based on tier A+B applied ratio)
+        interview_likelihood = (
+            (high_tier_applied / status_counts["applied"] * 100)
+            if status_counts["applied"] > 0 else 0
         )
-    )
-    avg_score = result.scalar() or 0.0
-    
-    # Count tiers
-    tier_distribution = {}
-    for tier in ["A", "B", "C", "D"]:
-        result = await db.execute(
-            select(func.count()).select_from(Job).where(
-                Job.user_id == user_id, Job.tier == tier
-            )
+        
+        stats = DashboardStats(
+            total_jobs=total_jobs,
+            applied_count=status_counts["applied"],
+            saved_count=status_counts["saved"],
+            hidden_count=status_counts["hidden"],
+            new_count=status_counts["new"],
+            average_score=round(avg_score, 2),
+            interview_likelihood=round(interview_likelihood, 1),
+            tier_distribution=tier_distribution,
         )
-        tier_distribution[tier] = result.scalar() or 0
+        
+        return api_response(stats.model_dump())
     
-    # Interview likelihood (based on tier A+B applied ratio)
-    high_tier_applied = 0
-    if status_counts["applied"] > 0:
-        result = await db.execute(
-            select(func.count()).select_from(Job).where(
-                Job.user_id == user_id,
-                Job.status == "applied",
-                Job.tier.in_(["A", "B"])
-            )
-        )
-        high_tier_applied = result.scalar() or 0
-    
-    interview_likelihood = (
-        (high_tier_applied / status_counts["applied"] * 100)
-        if status_counts["applied"] > 0 else 0
-    )
-    
-    stats = DashboardStats(
-        total_jobs=total_jobs,
-        applied_count=status_counts["applied"],
-        saved_count=status_counts["saved"],
-        hidden_count=status_counts["hidden"],
-        new_count=status_counts["new"],
-        average_score=round(avg_score, 2),
-        interview_likelihood=round(interview_likelihood, 1),
-        tier_distribution=tier_distribution,
-    )
-    
-    return ApiResponse(success=True, data=stats)
+    return await cached_response(request, db, user_id, build)
 
 
 @router.get("/scoring", response_model=ApiResponse)
@@ -108,52 +97,91 @@ async def get_scoring_formula():
     return ApiResponse(success=True, data=SCORING_FORMULA)
 
 
+@router.get("/runtime", response_model=ApiResponse)
+async def get_runtime_metrics(
+    user_id: str = Depends(get_current_user_id),
+):
+    """Process-wide counters: rate limiting, caches, search queue and scheduler."""
+    return ApiResponse(
+        success=True,
+        data={
+            "rate_limits": rate_limiter.stats(),
+            "concurrency": concurrency_limiter.stats(),
+            "response_cache": response_cache.stats(),
+            "auth_token_cache": verified_tokens.stats(),
+            "resume_cache": resume_cache.stats(),
+            "parsed_resume_cache": parsed_resume_cache.stats(),
+            "search_queue": {
+                "pending": search_queue.pending,
+                "event_subscribers": search_events.subscriber_count(),
+                "dropped_subscribers": search_events.dropped_subscribers,
+            },
+            "scheduler": {
+                # Only the process holding the scheduler lock runs the sweep
+                "leader": job_scheduler.is_leader,
+                "last_retention_sweep": job_scheduler.last_retention_sweep,
+            },
+        },
+    )
+
+
 @router.get("/health", response_model=ApiResponse)
 async def get_system_health(
+    request: Request,
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get system health status."""
-    # Get last search run
-    result = await db.execute(
-        select(SearchRun)
-        .where(SearchRun.user_id == user_id)
-        .order_by(SearchRun.started_at.desc())
-        .limit(1)
-    )
-    last_run = result.scalar_one_or_none()
-    
-    # Calculate data freshness
-    if last_run and last_run.completed_at:
-        freshness = (datetime.utcnow() - last_run.completed_at).days
-    else:
-        freshness = -1  # No data
-    
-    # Estimate API usage (tokens used in last 24h)
-    yesterday = datetime.utcnow() - timedelta(hours=24)
-    result = await db.execute(
-        select(func.sum(SearchRun.api_tokens_used)).where(
-            SearchRun.user_id == user_id,
-            SearchRun.started_at >= yesterday
+    """
+    Get system health status. Cached per data version, key status and day
+    (for data freshness); the rolling token estimate is bounded by the cache TTL.
+    """
+    async def build():
+        # Get last search run
+        result = await db.execute(
+            select(SearchRun)
+            .where(SearchRun.user_id == user_id)
+            .order_by(SearchRun.started_at.desc())
+            .limit(1)
         )
-    )
-    api_usage = result.scalar() or 0
-    
-    # Get next scheduled run from active profile
-    result = await db.execute(
-        select(Profile).where(Profile.user_id == user_id, Profile.is_active.is_(True)).limit(1)
-    )
-    active_profile = result.scalar_one_or_none()
-    next_run = None
-    if active_profile:
-        next_run = job_scheduler.get_next_run(user_id, active_profile.id)
-    
-    health = SystemHealth(
-        last_search_run=SearchRunResponse.model_validate(last_run) if last_run else None,
-        next_scheduled_run=next_run,
-        api_key_active=key_store.has_key(user_id),
-        estimated_api_usage=api_usage,
-        data_freshness_days=freshness,
-    )
+        last_run = result.scalar_one_or_none()
+        
+        # Calculate data freshness
+        if last_run and last_run.completed_at:
+            freshness = (datetime.utcnow() - last_run.completed_at).days
+        else:
+            freshness = -1  # No data
+        
+        # Estimate API usage (tokens used in last 24h)
+        yesterday = datetime.utcnow() - timedelta(hours=24)
+        result = await db.execute(
+            select(func.sum(SearchRun.api_tokens_used)).where(
+                SearchRun.user_id == user_id,
+                SearchRun.started_at >= yesterday
+            )
+        )
+        api_usage = result.scalar() or 0
+        
+        # Get next scheduled run from active profile
+        result = await db.execute(
+            select(Profile)
+            .where(Profile.user_id == user_id, Profile.is_active.is_(True))
+            .order_by(Profile.id)
+            .limit(1)
+        )
+        active_profile = result.scalar_one_or_none()
+        next_run = None
+        if active_profile:
+            next_run = job_scheduler.get_next_run(user_id, active_profile.id)
+        
+        health = SystemHealth(
+            last_search_run=SearchRunResponse.model_validate(last_run) if last_run else None,
+            next_scheduled_run=next_run,
+            api_key_active=await key_store.has_key(user_id),
+            estimated_api_usage=api_usage,
+            data_freshness_days=freshness,
+        )
+        
+        return api_response(health.model_dump())
     
-    return ApiResponse(success=True, data=health)
+    vary = f"{await key_store.has_key(user_id)}:{datetime.utcnow().date()}"
+    return await cached_response(request, db, user_id, build, vary=vary)
@@ -12,7 +12,8 @@ from app.models.schemas import (
     ProfileCreate, ProfileUpdate, ApiResponse
 )
 from app.core.auth import get_current_user_id
-from app.core.security import encryptor
+from app.core.cache import mark_user_changed
+from app.core.security import encryptor, resume_cache
 
 
 router = APIRouter()
@@ -69,6 +70,7 @@ async def create_profile(
     )
     db.add(new_profile)
     await db.flush()
+    mark_user_changed(db, user_id)
     
     return ApiResponse(success=True, data={"id": new_profile.id, "name": new_profile.name})
 
@@ -92,7 +94,7 @@ async def get_profile(
     resume_data = None
     if profile.resume_data:
         try:
-            resume_data = encryptor.decrypt(profile.resume_data)
+            resume_data = resume_cache.decrypt(profile.id, profile.resume_data)
         except Exception:
             resume_data = None
     
@@ -130,6 +132,7 @@ async def update_profile(
     
     if updates.resume_data is not None:
         profile.resume_data = encryptor.encrypt(updates.resume_data.model_dump())
+        resume_cache.invalidate(profile.id)
     
     if updates.search_config is not None:
         profile.search_config = updates.search_config.model_dump()
@@ -142,6 +145,7 @@ async def update_profile(
     
     profile.updated_at = datetime.utcnow()
     await db.flush()
+    mark_user_changed(db, user_id)
     
     return ApiResponse(success=True, data={"id": profile.id, "name": profile.name})
 
@@ -163,6 +167,8 @@ async def delete_profile(
     
     await db.delete(profile)
     await db.flush()
+    resume_cache.invalidate(profile_id)
+    mark_user_changed(db, user_id)
     
     return ApiResponse(success=True, data={"deleted": True})
 
@@ -186,7 +192,7 @@ async def export_profile(
     resume_data = None
     if profile.resume_data:
         try:
-            resume_data = encryptor.decrypt(profile.resume_data)
+            resume_data = resume_cache.decrypt(profile.id, profile.resume_data)
         except Exception:
             resume_data = None
     
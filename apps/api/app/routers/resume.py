@@ -1,60 +1,105 @@
 """
 Resume upload and parsing router.
 """
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+import zipfile
+
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.models.database import get_db, Profile
 from app.models.schemas import ResumeVerifyRequest, ApiResponse
 from app.core.auth import get_current_user_id
-from app.services.resume_parser import parse_resume
-from app.core.security import encryptor
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.rate_limit import limit_concurrency, rate_limit
+from app.core.uploads import FILE_UPLOAD_BODY, receive_upload, upload_source
+from app.services.bulk_ingest import ingest, zip_sources
+from app.services.resume_parser import parse_resume, ResumeParseError
+from app.core.security import encryptor, resume_cache
 
 
 router = APIRouter()
 
 
-# Temporary storage for parsed resume during verification flow
-_parsed_resumes: dict[str, dict] = {}
+# Parsed resumes awaiting the verification step, per user
+_parsed_resumes = TTLCache(
+    maxsize=settings.PENDING_RESUME_CACHE_SIZE,
+    ttl=settings.PENDING_RESUME_TTL_SECONDS,
+)
 
 
-@router.post("/upload", response_model=ApiResponse)
+@router.post(
+    "/upload",
+    response_model=ApiResponse,
+    dependencies=[Depends(rate_limit("upload"))],
+    openapi_extra=FILE_UPLOAD_BODY,
+)
 async def upload_resume(
-    file: UploadFile = File(...),
-    user_id: str = Depends(get_current_user_id),
+    request: Request,
+    user_id: str = Depends(limit_concurrency("upload")),
 ):
     """
     Upload and parse a resume file (PDF, DOCX, or TXT).
-    Returns parsed fields for user verification.
+    Returns parsed fields for user verification. The multipart body is
+    streamed and rejected with 413 once it passes RESUME_UPLOAD_MAX_BYTES.
     """
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="No file provided")
-    
-    # Validate file type
-    allowed_extensions = {".pdf", ".docx", ".doc", ".txt"}
-    ext = "." + file.filename.split(".")[-1].lower() if "." in file.filename else ""
-    
-    if ext not in allowed_extensions:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid file type. Allowed: {', '.join(allowed_extensions)}",
-        )
-    
-    # Read file content
-    content = await file.read()
-    
-    try:
-        # Parse resume
-        parsed_data = await parse_resume(content, ext)
+    async with receive_upload(request, settings.RESUME_UPLOAD_MAX_BYTES) as file:
+        # Validate file type
+        allowed_extensions = {".pdf", ".docx", ".doc", ".txt"}
+        ext = "." + file.filename.split(".")[-1].lower() if "." in file.filename else ""
+        
+        if ext not in allowed_extensions:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid file type. Allowed: {', '.join(allowed_extensions)}",
+            )
+        
+        try:
+            # Parse resume from memory, or from a temporary file when large;
+            # a file parsed before is served from the content-hash cache
+            async with upload_source(file) as (source, content_hash):
+                parsed_data = await parse_resume(source, ext, content_hash)
+            
+            # Store temporarily for verification step
+            _parsed_resumes.set(user_id, parsed_data)
+            
+            return ApiResponse(success=True, data=parsed_data)
+        
+        except ResumeParseError as e:
+            raise HTTPException(status_code=422, detail=f"Failed to parse resume: {str(e)}")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to parse resume: {str(e)}")
+
+
+@router.post(
+    "/bulk",
+    response_model=ApiResponse,
+    dependencies=[Depends(rate_limit("upload"))],
+    openapi_extra=FILE_UPLOAD_BODY,
+)
+async def bulk_upload_resumes(
+    request: Request,
+    user_id: str = Depends(limit_concurrency("upload")),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Create one profile per resume in an uploaded zip archive, parsed
+    concurrently. Returns per-file timings and failures.
+    """
+    async with receive_upload(request, settings.BULK_INGEST_MAX_BYTES) as file:
+        if not file.filename.lower().endswith(".zip"):
+            raise HTTPException(status_code=400, detail="Upload a .zip archive of resumes")
         
-        # Store temporarily for verification step
-        _parsed_resumes[user_id] = parsed_data
+        try:
+            archive = zipfile.ZipFile(file.file)
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail="Not a valid zip archive")
         
-        return ApiResponse(success=True, data=parsed_data)
+        with archive:
+            report = await ingest(db, user_id, zip_sources(archive))
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to parse resume: {str(e)}")
+    return ApiResponse(success=True, data=report)
 
 
 @router.get("/parsed", response_model=ApiResponse)
@@ -62,10 +107,11 @@ async def get_parsed_resume(
     user_id: str = Depends(get_current_user_id),
 ):
     """Get the currently parsed resume data for verification."""
-    if user_id not in _parsed_resumes:
+    parsed_data = _parsed_resumes.get(user_id)
+    if parsed_data is None:
         raise HTTPException(status_code=404, detail="No parsed resume found. Please upload first.")
     
-    return ApiResponse(success=True, data=_parsed_resumes[user_id])
+    return ApiResponse(success=True, data=parsed_data)
 
 
 @router.put("/verify", response_model=ApiResponse)
@@ -91,6 +137,7 @@ async def verify_resume(
     if profile:
         # Update existing profile
         profile.resume_data = encrypted_data
+        resume_cache.invalidate(profile.id)
     else:
         # Create new profile
         profile = Profile(
@@ -103,6 +150,6 @@ async def verify_resume(
     await db.flush()
     
     # Clear temporary storage
-    _parsed_resumes.pop(user_id, None)
+    _parsed_resumes.pop(user_id)
     
     return ApiResponse(success=True, data={"profile_id": profile.id})
@@ -32,14 +32,6 @@ async def validate_key(
         
         # Make a minimal API call to validate
         await client.models.list()
-        
-        # Store key in session (memory only)
-        key_store.store(user_id, key)
-        
-        return ApiResponse(
-            success=True,
-            data=OpenAIKeyStatus(active=True, message="Key validated successfully"),
-        )
     
     except Exception as e:
         error_msg = str(e)
@@ -48,6 +40,14 @@ async def validate_key(
         if "rate_limit" in error_msg.lower():
             raise HTTPException(status_code=429, detail="Rate limit exceeded")
         raise HTTPException(status_code=400, detail=f"Key validation failed: {error_msg}")
+    
+    # Store key in session (memory only); 503 if the key sidecar is down
+    await key_store.store(user_id, key)
+    
+    return ApiResponse(
+        success=True,
+        data=OpenAIKeyStatus(active=True, message="Key validated successfully"),
+    )
 
 
 @router.delete("/clear", response_model=ApiResponse)
@@ -55,7 +55,7 @@ async def clear_key(
     user_id: str = Depends(get_current_user_id),
 ):
     """Clear the stored OpenAI key from session."""
-    key_store.clear(user_id)
+    await key_store.clear(user_id)
     return ApiResponse(success=True, data={"message": "Key cleared"})
 
 
@@ -64,7 +64,7 @@ async def get_key_status(
     user_id: str = Depends(get_current_user_id),
 ):
     """Check if an OpenAI key is active in the current session."""
-    is_active = key_store.has_key(user_id)
+    is_active = await key_store.has_key(user_id)
     
     return ApiResponse(
         success=True,
@@ -1,10 +1,6 @@
 """
 User settings router.
 """
-import json
-import csv
-from io import StringIO
-from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -13,6 +9,10 @@ from sqlalchemy import select, delete
 from app.models.database import get_db, Setting, Job, Profile, SearchRun
 from app.models.schemas import SettingsUpdate, SettingsResponse, ApiResponse
 from app.core.auth import get_current_user_id
+from app.core.cache import mark_user_changed
+from app.core.security import resume_cache
+from app.core.rate_limit import acquire_slot, concurrency_limiter, rate_limit
+from app.services import export, job_stats
 
 
 router = APIRouter()
@@ -80,88 +80,38 @@ async def purge_data(
     
     # Delete all user data (cascades are set up in models)
     await db.execute(delete(Job).where(Job.user_id == user_id))
+    await job_stats.clear_user_stats(db, user_id)
     await db.execute(delete(SearchRun).where(SearchRun.user_id == user_id))
+    result = await db.execute(select(Profile.id).where(Profile.user_id == user_id))
+    for profile_id in result.scalars().all():
+        resume_cache.invalidate(profile_id)
     await db.execute(delete(Profile).where(Profile.user_id == user_id))
+    mark_user_changed(db, user_id)
     
     return ApiResponse(success=True, data={"message": "All data purged successfully"})
 
 
-@router.get("/export")
+EXPORT_FORMATS = {
+    "json": (export.stream_json, "application/json", "json"),
+    "ndjson": (export.stream_ndjson, "application/x-ndjson", "ndjson"),
+    "csv": (export.stream_csv, "text/csv", "csv"),
+    "parquet": (export.stream_parquet, "application/vnd.apache.parquet", "parquet"),
+    "arrow": (export.stream_arrow, "application/vnd.apache.arrow.stream", "arrows"),
+}
+
+
+@router.get("/export", dependencies=[Depends(rate_limit("export"))])
 async def export_data(
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
     format: str = "json",
 ):
-    """Export all user data as JSON or CSV."""
-    # Get all jobs
-    result = await db.execute(select(Job).where(Job.user_id == user_id))
-    jobs = result.scalars().all()
-    
-    # Get profiles
-    result = await db.execute(select(Profile).where(Profile.user_id == user_id))
-    profiles = result.scalars().all()
+    """Export all user data as JSON, NDJSON, CSV, Parquet or Arrow, streamed in chunks."""
+    stream, media_type, extension = EXPORT_FORMATS.get(format, EXPORT_FORMATS["json"])
     
-    if format == "csv":
-        # Export jobs as CSV
-        output = StringIO()
-        writer = csv.writer(output)
-        
-        # Header
-        writer.writerow([
-            "ID", "Title", "Company", "Location", "Salary Min", "Salary Max",
-            "Score", "Tier", "Status", "Source", "URL", "Created At"
-        ])
-        
-        # Data rows
-        for job in jobs:
-            writer.writerow([
-                job.id, job.title, job.company, job.location,
-                job.salary_min, job.salary_max, job.score, job.tier,
-                job.status, job.source, job.url, job.created_at.isoformat()
-            ])
-        
-        output.seek(0)
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={"Content-Disposition": "attachment; filename=job_scout_export.csv"},
-        )
-    
-    else:
-        # Export as JSON
-        data = {
-            "exported_at": datetime.utcnow().isoformat(),
-            "profiles": [
-                {
-                    "id": p.id,
-                    "name": p.name,
-                    "schedule_interval": p.schedule_interval,
-                    "is_active": p.is_active,
-                }
-                for p in profiles
-            ],
-            "jobs": [
-                {
-                    "id": j.id,
-                    "title": j.title,
-                    "company": j.company,
-                    "location": j.location,
-                    "salary_min": j.salary_min,
-                    "salary_max": j.salary_max,
-                    "score": j.score,
-                    "tier": j.tier,
-                    "matched_skills": j.matched_skills,
-                    "status": j.status,
-                    "source": j.source,
-                    "url": j.url,
-                    "created_at": j.created_at.isoformat(),
-                }
-                for j in jobs
-            ],
-        }
-        
-        return StreamingResponse(
-            iter([json.dumps(data, indent=2)]),
-            media_type="application/json",
-            headers={"Content-Disposition": "attachment; filename=job_scout_export.json"},
-        )
+    # The slot is held until the body has been streamed
+    acquire_slot(user_id, "export")
+    return StreamingResponse(
+        concurrency_limiter.hold_stream(user_id, "export", stream(user_id)),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=job_scout_export.{extension}"},
+    )
@@ -0,0 +1,176 @@
+"""
+Bulk resume ingestion: parse a directory or zip archive of resumes in the
+parser process pool and create one Profile per resume, named after its file.
+The profiles are created inactive, so the user's active profile is unchanged.
+
+Usage:
+    python -m app.services.bulk_ingest PATH --user USER_ID
+"""
+import argparse
+import asyncio
+import os
+import time
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import mark_user_changed
+from app.core.config import settings
+from app.core.security import encryptor
+from app.models.database import async_session, Profile, User
+from app.models.schemas import ResumeData
+from app.services.resume_parser import ResumeParseError, resume_parser_pool
+
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".doc", ".txt")
+
+# (file name, loader returning the content or a path to it)
+Source = Tuple[str, Callable[[], Union[bytes, str]]]
+
+
+class FileRejected(Exception):
+    """A file in the batch that is skipped without parsing."""
+
+
+def directory_sources(root: Union[str, Path]) -> Iterator[Source]:
+    """Resume files under a directory, recursively, in name order."""
+    root = Path(root)
+    for path in sorted(p for p in root.rglob("*") if p.is_file()):
+        def load(path: Path = path) -> str:
+            if path.stat().st_size > settings.RESUME_UPLOAD_MAX_BYTES:
+                raise FileRejected("File too large")
+            return str(path)
+        
+        yield str(path.relative_to(root)), load
+
+
+def zip_sources(archive: zipfile.ZipFile) -> Iterator[Source]:
+    """Resume files in a zip archive, sizes checked against what is actually read."""
+    max_bytes = settings.RESUME_UPLOAD_MAX_BYTES
+    for info in sorted(archive.infolist(), key=lambda i: i.filename):
+        name = PurePosixPath(info.filename)
+        if info.is_dir() or name.parts[0] == "__MACOSX" or name.name.startswith("."):
+            continue
+        
+        def load(info: zipfile.ZipInfo = info) -> bytes:
+            if info.file_size > max_bytes:
+                raise FileRejected("File too large")
+            with archive.open(info) as member:
+                data = member.read(max_bytes + 1)
+            if len(data) > max_bytes:
+                raise FileRejected("File too large")
+            return data
+        
+        yield info.filename, load
+
+
+async def _parse_file(name: str, load: Callable[[], Union[bytes, str]]) -> Dict[str, Any]:
+    """Parse and validate one file, timing it; failures are reported, not raised."""
+    started = time.perf_counter()
+    entry: Dict[str, Any] = {"file": name, "status": "failed", "profile_id": None, "error": None}
+    try:
+        ext = os.path.splitext(name)[1].lower()
+        if ext not in SUPPORTED_EXTENSIONS:
+            raise FileRejected(f"Unsupported file type: {ext or 'none'}")
+        # Zip members are decompressed off the event loop
+        source = await asyncio.to_thread(load)
+        parsed = await resume_parser_pool.parse(source, ext)
+        entry["resume_data"] = ResumeData(**parsed).model_dump()
+        entry["status"] = "parsed"
+    except (FileRejected, ResumeParseError) as e:
+        entry["error"] = str(e)
+    except ValidationError as e:
+        fields = sorted({str(err["loc"][0]) for err in e.errors()})
+        entry["error"] = f"Missing or invalid fields: {', '.join(fields)}"
+    except Exception as e:
+        entry["error"] = f"Failed to parse resume: {e}"
+    entry["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return entry
+
+
+async def ingest(db: AsyncSession, user_id: str, sources: Iterator[Source]) -> Dict[str, Any]:
+    """
+    Parse every source concurrently and bulk-create a Profile for each one
+    that parses into valid resume data. Returns per-file timings and errors.
+    """
+    started = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    sources = iter(sources)
+    accepted = 0
+    skipped = 0
+    
+    async def worker():
+        nonlocal accepted, skipped
+        # Keep every pool worker busy while the next file is being read
+        for name, load in sources:
+            if accepted >= settings.BULK_INGEST_MAX_FILES:
+                skipped += 1
+                continue
+            accepted += 1
+            results.append(await _parse_file(name, load))
+    
+    await asyncio.gather(*(worker() for _ in range(resume_parser_pool.workers * 2)))
+    results.sort(key=lambda r: r["file"])
+    
+    profiles = []
+    for entry in results:
+        resume_data = entry.pop("resume_data", None)
+        if resume_data is not None:
+            profiles.append((entry, Profile(
+                user_id=user_id,
+                name=Path(entry["file"]).stem,
+                resume_data=encryptor.encrypt(resume_data),
+                is_active=False,
+            )))
+    db.add_all([profile for _, profile in profiles])
+    await db.flush()
+    for entry, profile in profiles:
+        entry["status"] = "created"
+        entry["profile_id"] = profile.id
+    if profiles:
+        mark_user_changed(db, user_id)
+    
+    return {
+        "files": len(results),
+        "created": len(profiles),
+        "failed": len(results) - len(profiles),
+        # Files beyond BULK_INGEST_MAX_FILES, not parsed
+        "skipped": skipped,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "results": results,
+    }
+
+
+async def _main(args: argparse.Namespace) -> None:
+    path = Path(args.path)
+    async with async_session() as db:
+        if await db.get(User, args.user) is None:
+            raise SystemExit(f"Unknown user: {args.user}")
+        
+        if path.is_dir():
+            report = await ingest(db, args.user, directory_sources(path))
+        elif zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                report = await ingest(db, args.user, zip_sources(archive))
+        else:
+            raise SystemExit(f"{path} is neither a directory nor a zip archive")
+        await db.commit()
+    resume_parser_pool.shutdown()
+    
+    for entry in report["results"]:
+        outcome = f"profile {entry['profile_id']}" if entry["status"] == "created" else entry["error"]
+        print(f"{entry['elapsed_ms']:>9.1f} ms  {entry['status']:<8} {entry['file']}: {outcome}")
+    print(
+        f"{report['created']} created, {report['failed']} failed, {report['skipped']} skipped "
+        f"of {report['files'] + report['skipped']} files in {report['elapsed_ms'] / 1000:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create profiles from a directory or zip of resumes")
+    parser.add_argument("path", help="Directory (searched recursively) or .zip archive")
+    parser.add_argument("--user", required=True, help="User ID that will own the profiles")
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,148 @@
+"""
+zstd dictionary lifecycle: train from stored postings, load into the codec,
+and optionally rewrite existing rows with the new dictionary.
+
+Usage:
+    python -m app.services.compression_dictionaries train [--recompress]
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, update, bindparam
+
+from app.core.compression import codec, train_dictionary
+from app.core.config import settings
+from app.models.database import async_session, CompressionDictionary, Posting
+
+
+logger = logging.getLogger(__name__)
+
+
+# Below this many samples a trained dictionary does more harm than good
+MIN_TRAINING_SAMPLES = 100
+
+
+async def load_dictionaries() -> int:
+    """Load all stored dictionaries; compress with the newest active one."""
+    async with async_session() as db:
+        result = await db.execute(
+            select(CompressionDictionary).order_by(CompressionDictionary.created_at)
+        )
+        dictionaries = result.scalars().all()
+    
+    now = datetime.utcnow()
+    active = [d for d in dictionaries if d.active_after <= now]
+    for d in dictionaries:
+        codec.add_dictionary(d.data)
+    if active:
+        codec.add_dictionary(active[-1].data, activate=True)
+    
+    return len(dictionaries)
+
+
+async def load_missing_dictionaries() -> int:
+    """Load the dictionaries decoding found missing, e.g. trained since the last refresh."""
+    missing = set(codec.missing)
+    if not missing:
+        return 0
+    async with async_session() as db:
+        result = await db.execute(
+            select(CompressionDictionary.data).where(CompressionDictionary.id.in_(missing))
+        )
+        found = result.scalars().all()
+    for data in found:
+        codec.add_dictionary(data)
+    return len(found)
+
+
+async def train_description_dictionary() -> Optional[int]:
+    """
+    Train a dictionary from the most recent job descriptions and store it.
+    Writes switch to it once every worker has had a refresh cycle to load it.
+    """
+    async with async_session() as db:
+        result = await db.execute(
+            select(Posting.description)
+            .where(Posting.description.isnot(None))
+            .order_by(Posting.id.desc())
+            .limit(settings.COMPRESSION_DICT_SAMPLE_SIZE)
+        )
+        samples = [d for d in result.scalars().all() if d]
+        
+        if len(samples) < MIN_TRAINING_SAMPLES:
+            logger.warning("Not enough descriptions to train a dictionary (%d)", len(samples))
+            return None
+        
+        dict_id, data = train_dictionary(samples)
+        if await db.get(CompressionDictionary, dict_id) is None:
+            db.add(CompressionDictionary(
+                id=dict_id,
+                data=data,
+                sample_count=len(samples),
+                active_after=datetime.utcnow() + timedelta(
+                    minutes=2 * settings.COMPRESSION_DICT_REFRESH_MINUTES
+                ),
+            ))
+            await db.commit()
+    
+    codec.add_dictionary(data)
+    return dict_id
+
+
+async def recompress_descriptions(batch_size: int = 500) -> int:
+    """Rewrite every stored posting description with the active dictionary."""
+    rewritten = 0
+    last_id = 0
+    
+    while True:
+        async with async_session() as db:
+            result = await db.execute(
+                select(Posting.id, Posting.description)
+                .where(Posting.id > last_id, Posting.description.isnot(None))
+                .order_by(Posting.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            
+            await db.execute(
+                update(Posting.__table__)
+                .where(Posting.__table__.c.id == bindparam("posting_id"))
+                .values(description=bindparam("text")),
+                [{"posting_id": row.id, "text": row.description} for row in rows],
+            )
+            await db.commit()
+        
+        rewritten += len(rows)
+        last_id = rows[-1].id
+    
+    return rewritten
+
+
+async def _main(args: argparse.Namespace) -> None:
+    await load_dictionaries()
+    dict_id = await train_description_dictionary()
+    if dict_id is None:
+        return
+    print(f"Stored dictionary {dict_id}")
+    
+    if args.recompress:
+        # Compress with the new dictionary right away in this process
+        async with async_session() as db:
+            dictionary = await db.get(CompressionDictionary, dict_id)
+        codec.add_dictionary(dictionary.data, activate=True)
+        print(f"Recompressed {await recompress_descriptions()} descriptions")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=settings.LOG_LEVEL)
+    parser = argparse.ArgumentParser(description="Manage zstd compression dictionaries")
+    parser.add_argument("command", choices=["train"])
+    parser.add_argument(
+        "--recompress", action="store_true",
+        help="Rewrite existing descriptions with the new dictionary (run when API workers are stopped)",
+    )
+    asyncio.run(_main(parser.parse_args()))
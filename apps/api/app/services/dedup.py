@@ -0,0 +1,221 @@
+"""
+Near-duplicate posting detection with MinHash signatures and LSH buckets.
+The same role cross-posted on several boards differs only slightly in text;
+collapsing those before scoring avoids paying for the same LLM call twice.
+"""
+import hashlib
+import random
+import re
+import struct
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.database import insert_for, Job, Posting, PostingBucket
+
+
+# Signature layout: NUM_PERM 32-bit minimums, banded as BANDS x ROWS.
+# With 16 bands of 4 rows, pairs above ~0.5 Jaccard share a bucket with high
+# probability; the configured threshold is then checked on the full signature.
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+MAX_DESCRIPTION_TOKENS = 400
+
+_MASK32 = 0xFFFFFFFF
+# Each permutation is a universal hash (a*h + b) mod p of a 64-bit shingle
+# hash. Fixed seed: signatures are persisted and must stay comparable.
+_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (rng.randrange(1, _PRIME), rng.randrange(_PRIME))
+    for rng in [random.Random(0x5EED)] for _ in range(NUM_PERM)
+]
+_SIGNATURE_FORMAT = f"<{NUM_PERM}I"
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Rows per IN (...) lookup
+LOOKUP_CHUNK_SIZE = 500
+
+
+def _tokens(value: Any) -> List[str]:
+    if not isinstance(value, str):
+        return []
+    return _TOKEN.findall(value.lower())
+
+
+def _location(job_data: Dict[str, Any]) -> str:
+    """Normalized location; postings only collapse within the same one."""
+    return " ".join(_tokens(job_data.get("location")))
+
+
+def _shingles(job_data: Dict[str, Any]) -> Set[str]:
+    """Title, company and location tokens plus word n-grams of the normalized description."""
+    shingles = {f"t:{t}" for t in _tokens(job_data.get("title"))}
+    shingles.update(f"c:{t}" for t in _tokens(job_data.get("company")))
+    shingles.update(f"l:{t}" for t in _tokens(job_data.get("location")))
+    
+    words = _tokens(job_data.get("description"))[:MAX_DESCRIPTION_TOKENS]
+    for i in range(max(len(words) - SHINGLE_SIZE + 1, 1 if words else 0)):
+        shingles.add(" ".join(words[i:i + SHINGLE_SIZE]))
+    return shingles
+
+
+def signature(job_data: Dict[str, Any]) -> bytes:
+    """MinHash signature (NUM_PERM packed uint32 values)."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+        for s in _shingles(job_data)
+    ] or [0]
+    return struct.pack(
+        _SIGNATURE_FORMAT,
+        *(min((a * h + b) % _PRIME for h in hashes) & _MASK32 for a, b in _PERMUTATIONS),
+    )
+
+
+def similarity(a: bytes, b: bytes) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    values_a = struct.unpack(_SIGNATURE_FORMAT, a)
+    values_b = struct.unpack(_SIGNATURE_FORMAT, b)
+    return sum(x == y for x, y in zip(values_a, values_b)) / NUM_PERM
+
+
+def band_keys(sig: bytes) -> List[str]:
+    """LSH bucket keys, one per band."""
+    band_bytes = ROWS * 4
+    return [
+        f"{band}:{hashlib.blake2b(sig[band * band_bytes:(band + 1) * band_bytes], digest_size=8).hexdigest()}"
+        for band in range(BANDS)
+    ]
+
+
+async def store_buckets(db: AsyncSession, signatures: Dict[int, bytes]) -> None:
+    """Index postings into their LSH buckets."""
+    rows = [
+        {"bucket": key, "posting_id": posting_id}
+        for posting_id, sig in signatures.items()
+        for key in band_keys(sig)
+    ]
+    for start in range(0, len(rows), LOOKUP_CHUNK_SIZE):
+        await db.execute(
+            insert_for(db)(PostingBucket)
+            .values(rows[start:start + LOOKUP_CHUNK_SIZE])
+            .on_conflict_do_nothing(index_elements=["bucket", "posting_id"])
+        )
+
+
+async def _candidate_postings(db: AsyncSession, keys: Iterable[str]) -> Dict[str, Set[int]]:
+    """Posting ids for each bucket key."""
+    keys = list(set(keys))
+    buckets: Dict[str, Set[int]] = defaultdict(set)
+    for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+        result = await db.execute(
+            select(PostingBucket.bucket, PostingBucket.posting_id)
+            .where(PostingBucket.bucket.in_(keys[start:start + LOOKUP_CHUNK_SIZE]))
+        )
+        for bucket, posting_id in result.all():
+            buckets[bucket].add(posting_id)
+    return buckets
+
+
+async def _signatures(db: AsyncSession, posting_ids: Iterable[int]) -> Dict[int, Tuple[bytes, str]]:
+    """Signature and normalized location of each posting."""
+    ids = list(posting_ids)
+    signatures: Dict[int, Tuple[bytes, str]] = {}
+    for start in range(0, len(ids), LOOKUP_CHUNK_SIZE):
+        result = await db.execute(
+            select(Posting.id, Posting.minhash, Posting.location)
+            .where(Posting.id.in_(ids[start:start + LOOKUP_CHUNK_SIZE]), Posting.minhash.isnot(None))
+        )
+        signatures.update({
+            posting_id: (bytes(sig), _location({"location": location}))
+            for posting_id, sig, location in result.all()
+        })
+    return signatures
+
+
+async def collapse_near_duplicates(
+    db: AsyncSession,
+    user_id: str,
+    profile_id: Optional[int],
+    jobs: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Drop scraped candidates that near-duplicate each other or a stored posting.
+
+    Each kept job gets a "minhash" signature. A job matching a stored posting
+    the profile has not scored yet is kept with "posting_id" set, so it
+    reuses that posting; a match the profile already has is dropped. A few
+    location tokens barely move the similarity of a long description, so
+    matches must also share the location: the same role in another city
+    stays separate.
+    """
+    threshold = settings.DEDUP_SIMILARITY_THRESHOLD
+    
+    # 1. Collapse within the batch, keeping the first occurrence
+    kept: List[Dict[str, Any]] = []
+    batch_buckets: Dict[str, List[int]] = defaultdict(list)
+    for job_data in jobs:
+        sig = signature(job_data)
+        keys = band_keys(sig)
+        location = _location(job_data)
+        candidates = {i for key in keys for i in batch_buckets.get(key, ())}
+        if any(
+            _location(kept[i]) == location and similarity(sig, kept[i]["minhash"]) >= threshold
+            for i in candidates
+        ):
+            continue
+        
+        for key in keys:
+            batch_buckets[key].append(len(kept))
+        kept.append({**job_data, "minhash": sig})
+    
+    # 2. Match against stored postings
+    job_keys = [band_keys(job_data["minhash"]) for job_data in kept]
+    buckets = await _candidate_postings(db, (key for keys in job_keys for key in keys))
+    stored = await _signatures(db, {pid for ids in buckets.values() for pid in ids})
+    
+    matches: Dict[int, int] = {}
+    for index, (job_data, keys) in enumerate(zip(kept, job_keys)):
+        best_id, best_score = None, threshold
+        location = _location(job_data)
+        for posting_id in {pid for key in keys for pid in buckets.get(key, ())}:
+            sig, stored_location = stored.get(posting_id, (None, None))
+            if sig is None or stored_location != location:
+                continue
+            score = similarity(job_data["minhash"], sig)
+            if score >= best_score:
+                best_id, best_score = posting_id, score
+        if best_id is not None:
+            matches[index] = best_id
+    
+    if not matches:
+        return kept
+    
+    result = await db.execute(
+        select(Job.posting_id).where(
+            Job.user_id == user_id,
+            Job.profile_id == profile_id,
+            Job.posting_id.in_(set(matches.values())),
+        )
+    )
+    already_scored = set(result.scalars().all())
+    
+    # Matched postings are in use again; keep the retention sweep off them
+    await db.execute(
+        update(Posting)
+        .where(Posting.id.in_(set(matches.values())))
+        .values(last_seen_at=datetime.utcnow())
+    )
+    
+    collapsed = []
+    for index, job_data in enumerate(kept):
+        posting_id = matches.get(index)
+        if posting_id is None:
+            collapsed.append(job_data)
+        elif posting_id not in already_scored:
+            collapsed.append({**job_data, "posting_id": posting_id})
+    return collapsed
@@ -0,0 +1,274 @@
+"""
+Streaming data export. Rows are read through a server-side cursor in
+EXPORT_CHUNK_SIZE batches and encoded incrementally, so memory stays flat
+regardless of how many jobs a user has.
+
+Parquet and Arrow IPC exports need pyarrow and are written in row groups of
+EXPORT_ROW_GROUP_SIZE rows, each flushed to the client as it is encoded.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from io import StringIO
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from sqlalchemy import select
+
+from app.models.database import async_session, Job, Posting, Profile
+from app.services.scorer import WEIGHTS
+
+
+# Rows fetched per round trip
+EXPORT_CHUNK_SIZE = 1000
+
+# Rows per Parquet row group / Arrow record batch
+EXPORT_ROW_GROUP_SIZE = 65536
+
+EXPORT_COLUMNS = (
+    Job.id, Posting.title, Posting.company, Posting.location,
+    Posting.salary_min, Posting.salary_max, Job.score, Job.tier,
+    Job.matched_skills, Job.status, Posting.source, Posting.url, Job.created_at,
+)
+
+CSV_HEADER = [
+    "ID", "Title", "Company", "Location", "Salary Min", "Salary Max",
+    "Score", "Tier", "Status", "Source", "URL", "Created At",
+]
+
+
+def _job_dict(row: Any) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "title": row.title,
+        "company": row.company,
+        "location": row.location,
+        "salary_min": row.salary_min,
+        "salary_max": row.salary_max,
+        "score": row.score,
+        "tier": row.tier,
+        "matched_skills": row.matched_skills,
+        "status": row.status,
+        "source": row.source,
+        "url": row.url,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+    }
+
+
+async def _job_batches(user_id: str, columns=EXPORT_COLUMNS) -> AsyncIterator[List[Any]]:
+    """
+    Yield the user's jobs in chunks. Opens its own session: request-scoped
+    dependencies are closed before a StreamingResponse starts iterating.
+    """
+    query = (
+        select(*columns)
+        .join(Posting, Job.posting_id == Posting.id)
+        .where(Job.user_id == user_id)
+        .order_by(Job.id)
+        .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+    async with async_session() as db:
+        result = await db.stream(query)
+        async for batch in result.partitions():
+            yield batch
+
+
+async def stream_csv(user_id: str) -> AsyncIterator[str]:
+    """Jobs as CSV, one chunk of lines per batch."""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    yield buffer.getvalue()
+    
+    async for batch in _job_batches(user_id):
+        buffer.seek(0)
+        buffer.truncate()
+        for row in batch:
+            writer.writerow([
+                row.id, row.title, row.company, row.location,
+                row.salary_min, row.salary_max, row.score, row.tier,
+                row.status, row.source, row.url,
+                row.created_at.isoformat() if row.created_at else "",
+            ])
+        yield buffer.getvalue()
+
+
+async def stream_ndjson(user_id: str) -> AsyncIterator[str]:
+    """Jobs as newline-delimited JSON, one object per line."""
+    async for batch in _job_batches(user_id):
+        yield "".join(json.dumps(_job_dict(row)) + "\n" for row in batch)
+
+
+async def stream_json(user_id: str) -> AsyncIterator[str]:
+    """Profiles and jobs as a single JSON document, emitted in fragments."""
+    async with async_session() as db:
+        result = await db.execute(select(Profile).where(Profile.user_id == user_id))
+        profiles = [
+            {
+                "id": p.id,
+                "name": p.name,
+                "schedule_interval": p.schedule_interval,
+                "is_active": p.is_active,
+            }
+            for p in result.scalars().all()
+        ]
+    
+    yield (
+        '{\n  "exported_at": ' + json.dumps(datetime.utcnow().isoformat())
+        + ',\n  "profiles": ' + json.dumps(profiles)
+        + ',\n  "jobs": ['
+    )
+    
+    separator = "\n    "
+    async for batch in _job_batches(user_id):
+        chunk = []
+        for row in batch:
+            chunk.append(separator + json.dumps(_job_dict(row)))
+            separator = ",\n    "
+        yield "".join(chunk)
+    
+    yield "\n  ]\n}\n"
+
+
+# Columnar exports: scoring_breakdown is flattened into typed columns
+BREAKDOWN_FACTORS = tuple(WEIGHTS)
+
+COLUMNAR_COLUMNS = (
+    Job.id, Job.profile_id, Posting.title, Posting.company, Posting.location,
+    Posting.salary_min, Posting.salary_max, Job.score, Job.tier, Job.status,
+    Posting.source, Posting.url, Job.created_at, Job.matched_skills,
+    Job.scoring_breakdown,
+)
+
+
+def _arrow_schema():
+    import pyarrow as pa
+    
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("profile_id", pa.int64()),
+            ("title", pa.string()),
+            ("company", pa.string()),
+            ("location", pa.string()),
+            ("salary_min", pa.int64()),
+            ("salary_max", pa.int64()),
+            ("score", pa.float64()),
+            ("tier", pa.string()),
+            ("status", pa.string()),
+            ("source", pa.string()),
+            ("url", pa.string()),
+            ("created_at", pa.timestamp("us")),
+            ("matched_skills", pa.list_(pa.string())),
+            ("missing_skills", pa.list_(pa.string())),
+        ]
+        + [(f"breakdown_{factor}", pa.float64()) for factor in BREAKDOWN_FACTORS]
+        + [("explanation", pa.string())]
+    )
+
+
+def _as_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_strings(value: Any) -> Optional[List[str]]:
+    if not isinstance(value, list):
+        return None
+    return [str(item) for item in value]
+
+
+def _record_batch(rows: List[Any], schema):
+    """Build one Arrow record batch from joined job rows."""
+    import pyarrow as pa
+    
+    columns: Dict[str, List[Any]] = {name: [] for name in schema.names}
+    for row in rows:
+        breakdown = row.scoring_breakdown if isinstance(row.scoring_breakdown, dict) else {}
+        for name in ("id", "profile_id", "title", "company", "location", "salary_min",
+                     "salary_max", "score", "tier", "status", "source", "url", "created_at"):
+            columns[name].append(getattr(row, name))
+        columns["matched_skills"].append(_as_strings(row.matched_skills))
+        columns["missing_skills"].append(_as_strings(breakdown.get("missing_skills")))
+        for factor in BREAKDOWN_FACTORS:
+            columns[f"breakdown_{factor}"].append(_as_float(breakdown.get(factor)))
+        explanation = breakdown.get("explanation")
+        columns["explanation"].append(str(explanation) if explanation is not None else None)
+    
+    return pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose buffered bytes are drained per row group."""
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _stream_columnar(user_id: str, open_writer: Callable) -> AsyncIterator[bytes]:
+    import pyarrow as pa
+    
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    writer = open_writer(sink, schema)
+    
+    pending = pa.Table.from_batches([], schema=schema)
+    
+    async for batch in _job_batches(user_id, COLUMNAR_COLUMNS):
+        pending = pa.concat_tables([pending, pa.Table.from_batches([_record_batch(batch, schema)])])
+        if pending.num_rows < EXPORT_ROW_GROUP_SIZE:
+            continue
+        
+        # Write full row groups only; the remainder waits for the next batch
+        while pending.num_rows >= EXPORT_ROW_GROUP_SIZE:
+            writer.write_table(pending.slice(0, EXPORT_ROW_GROUP_SIZE))
+            pending = pending.slice(EXPORT_ROW_GROUP_SIZE)
+        yield sink.drain()
+    
+    if pending.num_rows:
+        writer.write_table(pending)
+    writer.close()
+    yield sink.drain()
+
+
+def _open_parquet(sink, schema):
+    import pyarrow.parquet as pq
+    
+    return pq.ParquetWriter(sink, schema, compression="zstd")
+
+
+def _open_arrow(sink, schema):
+    import pyarrow as pa
+    
+    return pa.ipc.new_stream(sink, schema)
+
+
+async def stream_parquet(user_id: str) -> AsyncIterator[bytes]:
+    """Jobs as Parquet, one row group per EXPORT_ROW_GROUP_SIZE rows."""
+    async for chunk in _stream_columnar(user_id, _open_parquet):
+        yield chunk
+
+
+async def stream_arrow(user_id: str) -> AsyncIterator[bytes]:
+    """Jobs as an Arrow IPC stream (pyarrow.ipc.open_stream / pandas)."""
+    async for chunk in _stream_columnar(user_id, _open_arrow):
+        yield chunk
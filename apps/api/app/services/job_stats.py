@@ -0,0 +1,159 @@
+"""
+Incrementally maintained per-user job aggregates (user_job_stats).
+Every write path that inserts, re-statuses or deletes jobs applies its
+delta in the same transaction; rebuild_user_stats() reconciles drift.
+"""
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import async_session, insert_for, Job, User, UserJobStat
+
+
+logger = logging.getLogger(__name__)
+
+
+# (status, tier) -> [job_count, scored_count, score_sum]
+Deltas = Dict[Tuple[str, str], List[float]]
+
+
+def _cell(status: Optional[str], tier: Optional[str]) -> Tuple[str, str]:
+    return (status or "new", tier or "")
+
+
+def _new_deltas() -> Deltas:
+    return defaultdict(lambda: [0, 0, 0.0])
+
+
+async def apply_deltas(db: AsyncSession, user_id: str, deltas: Deltas) -> None:
+    """Add count/score deltas to the user's aggregate rows with one upsert."""
+    rows = [
+        {
+            "user_id": user_id,
+            "status": status,
+            "tier": tier,
+            "job_count": int(count),
+            "scored_count": int(scored),
+            "score_sum": float(score_sum),
+        }
+        for (status, tier), (count, scored, score_sum) in deltas.items()
+        if count or scored or score_sum
+    ]
+    if not rows:
+        return
+    
+    table = UserJobStat.__table__
+    stmt = insert_for(db)(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.status, table.c.tier],
+        set_={
+            "job_count": table.c.job_count + stmt.excluded.job_count,
+            "scored_count": table.c.scored_count + stmt.excluded.scored_count,
+            "score_sum": table.c.score_sum + stmt.excluded.score_sum,
+        },
+    )
+    await db.execute(stmt)
+
+
+async def record_jobs_added(db: AsyncSession, user_id: str, jobs: Iterable[Job]) -> None:
+    """Count newly inserted jobs."""
+    deltas = _new_deltas()
+    for job in jobs:
+        cell = deltas[_cell(job.status, job.tier)]
+        cell[0] += 1
+        if job.score is not None:
+            cell[1] += 1
+            cell[2] += job.score
+    await apply_deltas(db, user_id, deltas)
+
+
+async def record_status_change(db: AsyncSession, user_id: str, job: Job, old_status: str) -> None:
+    """Move one job from its old status cell to its current one."""
+    if old_status == job.status:
+        return
+    
+    deltas = _new_deltas()
+    scored = 1 if job.score is not None else 0
+    score = job.score or 0.0
+    for status, sign in ((old_status, -1), (job.status, 1)):
+        cell = deltas[_cell(status, job.tier)]
+        cell[0] += sign
+        cell[1] += sign * scored
+        cell[2] += sign * score
+    await apply_deltas(db, user_id, deltas)
+
+
+async def collect_deltas(db: AsyncSession, *conditions, sign: int = 1) -> Deltas:
+    """Aggregate the jobs matching `conditions` into deltas (negated with sign=-1)."""
+    result = await db.execute(
+        select(
+            Job.status, Job.tier,
+            func.count(), func.count(Job.score), func.coalesce(func.sum(Job.score), 0.0),
+        )
+        .where(*conditions)
+        .group_by(Job.status, Job.tier)
+    )
+    deltas = _new_deltas()
+    for status, tier, count, scored, score_sum in result.all():
+        cell = deltas[_cell(status, tier)]
+        cell[0] += sign * count
+        cell[1] += sign * scored
+        cell[2] += sign * score_sum
+    return deltas
+
+
+async def record_bulk_status_change(db: AsyncSession, user_id: str, status: str, *conditions) -> None:
+    """Move the jobs about to be re-statused to `status`. Call before the UPDATE."""
+    old = await collect_deltas(db, Job.user_id == user_id, *conditions)
+    deltas = _new_deltas()
+    for (old_status, tier), (count, scored, score_sum) in old.items():
+        for cell_status, sign in ((old_status, -1), (status, 1)):
+            cell = deltas[_cell(cell_status, tier)]
+            cell[0] += sign * count
+            cell[1] += sign * scored
+            cell[2] += sign * score_sum
+    await apply_deltas(db, user_id, deltas)
+
+
+async def record_jobs_deleted(db: AsyncSession, user_id: str, *conditions) -> None:
+    """Subtract the jobs about to be deleted. Call before the DELETE."""
+    deltas = await collect_deltas(db, Job.user_id == user_id, *conditions, sign=-1)
+    await apply_deltas(db, user_id, deltas)
+
+
+async def clear_user_stats(db: AsyncSession, user_id: str) -> None:
+    """Drop all aggregate rows for a user (all jobs deleted)."""
+    await db.execute(delete(UserJobStat).where(UserJobStat.user_id == user_id))
+
+
+async def get_user_stats(db: AsyncSession, user_id: str) -> List[UserJobStat]:
+    """Fetch a user's aggregate rows (primary-key prefix lookup)."""
+    result = await db.execute(select(UserJobStat).where(UserJobStat.user_id == user_id))
+    return list(result.scalars().all())
+
+
+async def rebuild_user_stats(db: AsyncSession, user_id: str) -> None:
+    """Recompute a user's aggregates from the jobs table."""
+    await clear_user_stats(db, user_id)
+    deltas = await collect_deltas(db, Job.user_id == user_id)
+    await apply_deltas(db, user_id, deltas)
+
+
+async def reconcile_job_stats() -> int:
+    """Rebuild aggregates for every user, one short transaction each."""
+    async with async_session() as db:
+        result = await db.execute(select(User.id))
+        user_ids = list(result.scalars().all())
+    
+    for user_id in user_ids:
+        async with async_session() as db:
+            try:
+                await rebuild_user_stats(db, user_id)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                logger.exception("Job stats reconciliation failed for %s", user_id)
+    
+    return len(user_ids)
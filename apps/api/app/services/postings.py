@@ -0,0 +1,111 @@
+"""
+Canonical postings: deduplicated by source + external_id, or by a hash of
+the posting content when the board gives no id.
+"""
+import hashlib
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import insert_for, Posting
+from app.services import dedup
+
+
+# Rows per multi-row INSERT (well under SQLite's bound-parameter limit)
+UPSERT_CHUNK_SIZE = 500
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(value: Any) -> str:
+    return _WHITESPACE.sub(" ", str(value or "")).strip().lower()
+
+
+def content_hash(job_data: Dict[str, Any]) -> str:
+    """Stable hash of the fields that identify a posting's content."""
+    parts = [
+        _normalize(job_data.get(field))
+        for field in ("title", "company", "location", "description")
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def dedup_key(job_data: Dict[str, Any], digest: Optional[str] = None) -> str:
+    """Unique key for a posting: board id when available, else content hash."""
+    external_id = job_data.get("external_id")
+    if external_id:
+        return f"{job_data.get('source') or ''}:{external_id}"
+    return f"sha256:{digest or content_hash(job_data)}"
+
+
+async def upsert_postings(db: AsyncSession, jobs: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Insert postings that are not stored yet and return {dedup_key: posting_id}
+    for every job in `jobs`. Existing postings only get last_seen_at bumped;
+    new ones are indexed for near-duplicate lookups.
+    """
+    now = datetime.utcnow()
+    rows: Dict[str, Dict[str, Any]] = {}
+    for job_data in jobs:
+        digest = content_hash(job_data)
+        key = dedup_key(job_data, digest)
+        if key in rows:
+            continue
+        rows[key] = {
+            "dedup_key": key,
+            "content_hash": digest,
+            "external_id": job_data.get("external_id"),
+            "title": job_data.get("title") or "Unknown Position",
+            "company": job_data.get("company"),
+            "location": job_data.get("location"),
+            "salary_min": job_data.get("salary_min"),
+            "salary_max": job_data.get("salary_max"),
+            "description": job_data.get("description"),
+            "url": job_data.get("url"),
+            "source": job_data.get("source"),
+            "minhash": job_data.get("minhash") or dedup.signature(job_data),
+            "created_at": now,
+            "last_seen_at": now,
+        }
+    
+    keys = list(rows)
+    posting_ids: Dict[str, int] = {}
+    
+    for start in range(0, len(keys), UPSERT_CHUNK_SIZE):
+        chunk = keys[start:start + UPSERT_CHUNK_SIZE]
+        
+        # Skip keys that already exist so their descriptions aren't re-sent
+        result = await db.execute(
+            select(Posting.dedup_key, Posting.id).where(Posting.dedup_key.in_(chunk))
+        )
+        existing = dict(result.all())
+        posting_ids.update(existing)
+        if existing:
+            # Keeps the retention sweep from collecting postings in use
+            await db.execute(
+                update(Posting)
+                .where(Posting.id.in_(list(existing.values())))
+                .values(last_seen_at=now)
+            )
+        
+        missing = [rows[key] for key in chunk if key not in posting_ids]
+        if missing:
+            await db.execute(
+                insert_for(db)(Posting)
+                .values(missing)
+                .on_conflict_do_nothing(index_elements=["dedup_key"])
+            )
+            result = await db.execute(
+                select(Posting.dedup_key, Posting.id)
+                .where(Posting.dedup_key.in_([row["dedup_key"] for row in missing]))
+            )
+            inserted = dict(result.all())
+            posting_ids.update(inserted)
+            await dedup.store_buckets(db, {
+                inserted[row["dedup_key"]]: row["minhash"]
+                for row in missing if row["dedup_key"] in inserted
+            })
+    
+    return posting_ids
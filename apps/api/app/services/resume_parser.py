@@ -1,211 +1,539 @@
 """
 Resume parsing service with experience and education extraction.
 Parses PDF, DOCX, TXT to JSON Resume schema.
+
+Parsing is CPU-bound and runs in a dedicated process pool so the event loop
+stays responsive. Each task is capped in wall time (SIGALRM in the worker)
+and address space (RLIMIT_AS); a worker that ignores its alarm is killed,
+and the tasks running beside it are resubmitted to a fresh pool.
+PDF pages are extracted in ranges across the pool and parsed as they
+arrive, stopping early once every section has been read.
 """
+import asyncio
+import hashlib
 import io
+import multiprocessing
 import re
-from typing import Dict, Any, List
+import signal
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, AsyncIterator, Callable, Iterator, List, Optional, Tuple, Union, BinaryIO
 import pypdf
 from docx import Document
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+try:
+    import resource
+except ImportError:  # Windows: no RLIMIT_AS, only the pool-level timeout
+    resource = None
+
+
+# Bump whenever parsing output changes so cached results are not reused
+PARSER_VERSION = "2"
+
+# Parent-side allowance on top of the timeout for worker start-up and the
+# in-worker alarm firing
+WORKER_GRACE_SECONDS = 5.0
+
+
+class ResumeParseError(Exception):
+    """The resume could not be parsed within the configured limits."""
+
+
+class _ParseTimeout(Exception):
+    pass
+
+
+def _init_worker(max_memory_bytes: int) -> None:
+    """Pool initializer: cap the worker's address space."""
+    if resource is not None and max_memory_bytes > 0:
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory_bytes, max_memory_bytes))
+
+
+def _on_alarm(signum, frame):
+    raise _ParseTimeout()
 
-async def parse_resume(content: bytes, file_extension: str) -> Dict[str, Any]:
+
+def _call_in_worker(fn: Callable, args: tuple, timeout: float) -> Any:
+    """Runs in a pool worker: call fn under a wall-clock alarm."""
+    use_alarm = hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(*args)
+    except _ParseTimeout:
+        raise ResumeParseError(f"Parsing took longer than {timeout:g}s")
+    except MemoryError:
+        raise ResumeParseError("Parsing exceeded the memory limit")
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class ResumeParserPool:
+    """
+    Process pool for resume parsing. Submissions are gated to one per worker
+    so the parent-side timeout measures parse time, not time spent queued.
+    """
+    
+    def __init__(self, workers: int, timeout: float, max_memory_mb: int, max_tasks_per_child: int):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024
+        self.max_tasks_per_child = max_tasks_per_child
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.killed = 0
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: never fork a process that is running an event loop and threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.max_memory_bytes,),
+                max_tasks_per_child=self.max_tasks_per_child,
+            )
+        return self._executor
+    
+    def _kill(self, executor: ProcessPoolExecutor) -> None:
+        """
+        Kill a pool's workers (one is stuck in C code) and start over on next
+        use. A pool can't lose a single worker without breaking, so calls
+        running in the other workers fail with BrokenProcessPool and retry.
+        """
+        if self._executor is not executor:
+            return  # Already replaced on behalf of another call
+        self._executor = None
+        self.killed += 1
+        for process in list((executor._processes or {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _release(self, future: asyncio.Future) -> None:
+        self._slots.release()
+        if not future.cancelled():
+            future.exception()  # retrieved here when the caller gave up
+    
+    async def run(self, fn: Callable, *args) -> Any:
+        """
+        Call a module-level function in a worker process under the limits.
+        A call whose pool breaks under it is resubmitted once to a fresh
+        pool, so only a call that breaks the pool twice fails for it.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            await self._slots.acquire()
+            executor = self._get_executor()
+            future = loop.run_in_executor(executor, _call_in_worker, fn, args, self.timeout)
+            # The slot stays taken until the worker is free, even if the caller
+            # is cancelled (e.g. PDF extraction stopping early)
+            future.add_done_callback(self._release)
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), self.timeout + WORKER_GRACE_SECONDS)
+            except asyncio.TimeoutError:
+                self._kill(executor)
+                raise ResumeParseError(f"Parsing took longer than {self.timeout:g}s")
+            except (BrokenProcessPool, asyncio.CancelledError):
+                # The future is cancelled when a killed pool drops its queue;
+                # cancellation of this call itself still propagates
+                if asyncio.current_task().cancelling():
+                    raise
+                self._kill(executor)
+        raise ResumeParseError("Parser worker exited unexpectedly")
+    
+    async def parse(self, source: Union[bytes, str], file_extension: str) -> Dict[str, Any]:
+        """Parse a whole file in one worker process."""
+        return await self.run(parse_resume_sync, source, file_extension)
+    
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+resume_parser_pool = ResumeParserPool(
+    workers=settings.RESUME_PARSE_WORKERS,
+    timeout=settings.RESUME_PARSE_TIMEOUT_SECONDS,
+    max_memory_mb=settings.RESUME_PARSE_MAX_MEMORY_MB,
+    max_tasks_per_child=settings.RESUME_PARSE_MAX_TASKS_PER_CHILD,
+)
+
+
+# Parse results by (content SHA-256, extension, parser version). Values are
+# shared between callers and must not be mutated.
+parsed_resume_cache = TTLCache(
+    maxsize=settings.PARSED_RESUME_CACHE_SIZE,
+    ttl=settings.PARSED_RESUME_CACHE_TTL_SECONDS,
+)
+
+
+async def parse_resume(
+    source: Union[bytes, str],
+    file_extension: str,
+    content_hash: Optional[str] = None,
+) -> Dict[str, Any]:
     """
     Parse resume content from various file formats.
+    `source` is the file content or the path of a file holding it; pass
+    `content_hash` (SHA-256 hex) for paths to make the result cacheable.
     Returns structured JSON Resume data.
     """
-    text = ""
+    if file_extension not in (".pdf", ".docx", ".doc", ".txt"):
+        raise ValueError(f"Unsupported file type: {file_extension}")
+    
+    if content_hash is None and isinstance(source, bytes):
+        content_hash = hashlib.sha256(source).hexdigest()
+    key = (content_hash, file_extension, PARSER_VERSION)
+    if content_hash is not None:
+        cached = parsed_resume_cache.get(key)
+        if cached is not None:
+            return cached
     
     if file_extension == ".pdf":
-        text = _extract_pdf_text(content)
-    elif file_extension in [".docx", ".doc"]:
-        text = _extract_docx_text(content)
-    elif file_extension == ".txt":
-        text = content.decode("utf-8", errors="ignore")
+        parsed = await _parse_pdf(source)
     else:
-        raise ValueError(f"Unsupported file type: {file_extension}")
+        parsed = await resume_parser_pool.parse(source, file_extension)
+    if content_hash is not None:
+        parsed_resume_cache.set(key, parsed)
+    return parsed
+
+
+def _open_source(source: Union[bytes, str]) -> BinaryIO:
+    """File object over in-memory content or a file on disk."""
+    if isinstance(source, str):
+        return open(source, "rb")
+    return io.BytesIO(source)
+
+
+async def _pdf_pages(source: Union[bytes, str]) -> AsyncIterator[str]:
+    """
+    Page texts in order, up to RESUME_PDF_MAX_PAGES. The first task also
+    reports the page count; the remaining ranges are extracted in parallel,
+    one task per free worker, and yielded as soon as the next one in order
+    is ready. Closing the iterator cancels ranges not yet extracted.
+    """
+    step = settings.RESUME_PDF_PAGES_PER_TASK
+    page_count, texts = await resume_parser_pool.run(_extract_pdf_pages, source, 0, step)
+    for text in texts:
+        yield text
+    
+    ranges = iter(range(step, min(page_count, settings.RESUME_PDF_MAX_PAGES), step))
+    pending: deque = deque()
+    
+    def schedule() -> None:
+        start = next(ranges, None)
+        if start is not None:
+            pending.append(asyncio.ensure_future(
+                resume_parser_pool.run(_extract_pdf_pages, source, start, start + step)
+            ))
+    
+    try:
+        for _ in range(resume_parser_pool.workers):
+            schedule()
+        while pending:
+            _, texts = await pending.popleft()
+            schedule()
+            for text in texts:
+                yield text
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _parse_pdf(source: Union[bytes, str]) -> Dict[str, Any]:
+    """Parse PDF pages as they are extracted, stopping once complete."""
+    parser = ResumeTextParser()
+    pages = _pdf_pages(source)
+    try:
+        async for text in pages:
+            parser.feed(text)
+            if parser.complete:
+                break
+    finally:
+        await pages.aclose()
+    return parser.result()
+
+
+def parse_resume_sync(source: Union[bytes, str], file_extension: str) -> Dict[str, Any]:
+    """Blocking parse of a resume file; use parse_resume from async code."""
+    text = ""
+    
+    with _open_source(source) as stream:
+        if file_extension == ".pdf":
+            parser = ResumeTextParser()
+            for page_text in _iter_pdf_pages(pypdf.PdfReader(stream), 0, settings.RESUME_PDF_MAX_PAGES):
+                parser.feed(page_text)
+                if parser.complete:
+                    break
+            return parser.result()
+        elif file_extension in [".docx", ".doc"]:
+            text = _extract_docx_text(stream)
+        elif file_extension == ".txt":
+            text = stream.read().decode("utf-8", errors="ignore")
+        else:
+            raise ValueError(f"Unsupported file type: {file_extension}")
     
     # Parse the extracted text
     return _parse_resume_text(text)
 
 
-def _extract_pdf_text(content: bytes) -> str:
-    """Extract text from PDF."""
-    reader = pypdf.PdfReader(io.BytesIO(content))
-    text_parts = []
-    for page in reader.pages:
-        text_parts.append(page.extract_text() or "")
-    return "\n".join(text_parts)
+def _iter_pdf_pages(reader: pypdf.PdfReader, start: int, stop: int) -> Iterator[str]:
+    """Lazily extract the text of pages [start, stop)."""
+    for index in range(start, min(stop, len(reader.pages))):
+        yield reader.pages[index].extract_text() or ""
+
+
+def _extract_pdf_pages(source: Union[bytes, str], start: int, stop: int) -> Tuple[int, List[str]]:
+    """Runs in a pool worker: page count and the text of pages [start, stop)."""
+    with _open_source(source) as stream:
+        reader = pypdf.PdfReader(stream)
+        return len(reader.pages), list(_iter_pdf_pages(reader, start, stop))
 
 
-def _extract_docx_text(content: bytes) -> str:
+def _extract_docx_text(stream: BinaryIO) -> str:
     """Extract text from DOCX."""
-    doc = Document(io.BytesIO(content))
+    doc = Document(stream)
     text_parts = []
     for para in doc.paragraphs:
         text_parts.append(para.text)
     return "\n".join(text_parts)
 
 
-def _parse_resume_text(text: str) -> Dict[str, Any]:
+# Section headers in priority order: a header line naming two sections
+# belongs to the first one listed
+SECTION_KEYWORDS = {
+    "skills": ["skills", "technologies", "technical skills", "proficiencies", "competencies", "expertise"],
+    "experience": ["experience", "work experience", "employment", "work history", "professional experience"],
+    "education": ["education", "academic", "degrees", "qualifications"],
+    "summary": ["summary", "objective", "profile", "about"],
+}
+SECTION_PRIORITY = {section: i for i, section in enumerate(SECTION_KEYWORDS)}
+# Header lines are short; longer lines are never checked for keywords
+SECTION_HEADER_MAX_LENGTH = 40
+
+DEGREE_KEYWORDS = ["bachelor", "master", "phd", "doctorate", "associate", "mba", "bs", "ba", "ms", "ma", "b.s.", "b.a.", "m.s.", "m.a."]
+INSTITUTION_KEYWORDS = ("university", "college", "institute")
+
+# One automaton for every section keyword. The lookahead reports a match at
+# each position, overlapping ones included, and the named group says which
+# section it belongs to (earlier sections win at the same position).
+SECTION_RE = re.compile(
+    "(?=" + "|".join(
+        f"(?P<{section}>{'|'.join(map(re.escape, keywords))})"
+        for section, keywords in SECTION_KEYWORDS.items()
+    ) + ")"
+)
+DEGREE_RE = re.compile("|".join(map(re.escape, DEGREE_KEYWORDS)))
+EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+PHONE_RE = re.compile(r'[\+]?[(]?[0-9]{1,3}[)]?[-\s\.]?[(]?[0-9]{1,4}[)]?[-\s\.]?[0-9]{1,4}[-\s\.]?[0-9]{1,9}')
+PHONE_STRIP_RE = re.compile(r'[^\d\+\-\(\)\s]')
+EXPERIENCE_DATE_RE = re.compile(
+    r'((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*[\s\.,]*\d{4}|\d{1,2}/\d{4}|\d{4})',
+    re.IGNORECASE,
+)
+YEAR_RE = re.compile(r'(\d{4})')
+DASH_RE = re.compile(r'[\-–—]')
+WHITESPACE_RE = re.compile(r'\s+')
+TITLE_SPLIT_RE = re.compile(r'\s*[\-–—,@]\s*')
+EDUCATION_SPLIT_RE = re.compile(r'\s*[\-–—,]\s*')
+BULLET_RE = re.compile(r'^[\-\*\•\·]\s*')
+SKILL_SEPARATORS = [",", "|", "•", "·", "–", ";"]
+
+MAX_SKILLS = 30
+MAX_EXPERIENCE = 10
+MAX_EDUCATION = 5
+MAX_SUMMARY_LINES = 3
+MAX_DESCRIPTION_LENGTH = 500
+
+
+def _section_header(lower_line: str) -> Optional[str]:
+    """Section named by a header line, or None for ordinary lines."""
+    if len(lower_line) >= SECTION_HEADER_MAX_LENGTH:
+        return None
+    found = None
+    for match in SECTION_RE.finditer(lower_line):
+        section = match.lastgroup
+        if found is None or SECTION_PRIORITY[section] < SECTION_PRIORITY[found]:
+            found = section
+            if SECTION_PRIORITY[found] == 0:
+                break
+    return found
+
+
+class ResumeTextParser:
     """
-    Parse resume text into JSON Resume schema.
-    Extracts: contact info, skills, experience, education.
+    Incremental resume text parser: feed text as it is extracted (e.g. one
+    PDF page at a time), then take result(). `complete` turns true once
+    every section has been read and the one still open is full, so later
+    text could not change the result (short of a section header repeating).
     """
-    lines = [line.strip() for line in text.split("\n") if line.strip()]
-    
-    result = {
-        "full_name": "",
-        "email": "",
-        "phone": None,
-        "location": None,
-        "summary": None,
-        "skills": [],
-        "experience": [],
-        "education": [],
-    }
     
-    # Extract email
-    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    emails = re.findall(email_pattern, text)
-    if emails:
-        result["email"] = emails[0]
+    def __init__(self):
+        self.full_name = ""
+        self.email = ""
+        self.phone: Optional[str] = None
+        self._phone_checked = False
+        self._first_line_seen = False
+        self.current_section: Optional[str] = None
+        self.sections: Dict[str, List[str]] = {k: [] for k in SECTION_KEYWORDS}
+        self._seen_sections = set()
     
-    # Extract phone
-    phone_pattern = r'[\+]?[(]?[0-9]{1,3}[)]?[-\s\.]?[(]?[0-9]{1,4}[)]?[-\s\.]?[0-9]{1,4}[-\s\.]?[0-9]{1,9}'
-    phones = re.findall(phone_pattern, text)
-    if phones:
-        # Clean up phone number
-        phone = re.sub(r'[^\d\+\-\(\)\s]', '', phones[0]).strip()
-        if len(phone) >= 10:
-            result["phone"] = phone
-    
-    # First non-empty line is often the name
-    if lines:
-        potential_name = lines[0]
-        if len(potential_name) < 50 and "@" not in potential_name and not any(c.isdigit() for c in potential_name[:5]):
-            result["full_name"] = potential_name
-    
-    # Identify sections
-    section_keywords = {
-        "skills": ["skills", "technologies", "technical skills", "proficiencies", "competencies", "expertise"],
-        "experience": ["experience", "work experience", "employment", "work history", "professional experience"],
-        "education": ["education", "academic", "degrees", "qualifications"],
-        "summary": ["summary", "objective", "profile", "about"],
-    }
-    
-    current_section = None
-    section_content: Dict[str, List[str]] = {k: [] for k in section_keywords}
-    
-    for line in lines:
-        lower_line = line.lower()
+    def feed(self, text: str) -> None:
+        """Consume the next piece of text; pieces are separated by a line break."""
+        # Extract email
+        if not self.email:
+            email = EMAIL_RE.search(text)
+            if email:
+                self.email = email.group()
         
-        # Check if this line is a section header
-        found_section = None
-        for section, keywords in section_keywords.items():
-            if any(kw in lower_line and len(lower_line) < 40 for kw in keywords):
-                found_section = section
-                break
+        # Extract phone (only the first number-like match counts)
+        if not self._phone_checked:
+            phone_match = PHONE_RE.search(text)
+            if phone_match:
+                self._phone_checked = True
+                # Clean up phone number
+                phone = PHONE_STRIP_RE.sub('', phone_match.group()).strip()
+                if len(phone) >= 10:
+                    self.phone = phone
         
-        if found_section:
-            current_section = found_section
-            continue
-        
-        if current_section:
-            section_content[current_section].append(line)
-    
-    # Parse skills
-    result["skills"] = _parse_skills(section_content["skills"])
-    
-    # Parse experience
-    result["experience"] = _parse_experience(section_content["experience"])
-    
-    # Parse education
-    result["education"] = _parse_education(section_content["education"])
+        for line in map(str.strip, text.split("\n")):
+            if not line:
+                continue
+            
+            # First non-empty line is often the name
+            if not self._first_line_seen:
+                self._first_line_seen = True
+                if len(line) < 50 and "@" not in line and not any(c.isdigit() for c in line[:5]):
+                    self.full_name = line
+            
+            found_section = _section_header(line.lower())
+            if found_section:
+                self.current_section = found_section
+                self._seen_sections.add(found_section)
+                continue
+            
+            if self.current_section:
+                self.sections[self.current_section].append(line)
     
-    # Parse summary
-    if section_content["summary"]:
-        result["summary"] = " ".join(section_content["summary"][:3])
+    @property
+    def complete(self) -> bool:
+        if len(self._seen_sections) < len(SECTION_KEYWORDS):
+            return False
+        lines = self.sections[self.current_section]
+        if self.current_section == "skills":
+            return len(_parse_skills(lines)) >= MAX_SKILLS
+        if self.current_section == "experience":
+            return len(_parse_experience(lines)) >= MAX_EXPERIENCE
+        if self.current_section == "education":
+            return len(_parse_education(lines)) >= MAX_EDUCATION
+        return len(lines) >= MAX_SUMMARY_LINES
     
-    return result
+    def result(self) -> Dict[str, Any]:
+        """Parsed resume in the JSON Resume schema."""
+        summary = self.sections["summary"]
+        return {
+            "full_name": self.full_name,
+            "email": self.email,
+            "phone": self.phone,
+            "location": None,
+            "summary": " ".join(summary[:MAX_SUMMARY_LINES]) if summary else None,
+            "skills": _parse_skills(self.sections["skills"]),
+            "experience": _parse_experience(self.sections["experience"]),
+            "education": _parse_education(self.sections["education"]),
+        }
+
+
+def _parse_resume_text(text: str) -> Dict[str, Any]:
+    """
+    Parse resume text into JSON Resume schema.
+    Extracts: contact info, skills, experience, education.
+    """
+    parser = ResumeTextParser()
+    parser.feed(text)
+    return parser.result()
 
 
 def _parse_skills(lines: List[str]) -> List[str]:
     """Extract skills from skills section."""
-    skills = []
-    skill_separators = [",", "|", "•", "·", "–", ";"]
+    cleaned = []
+    seen = set()
     
     for line in lines:
         # Try splitting by separators
-        for sep in skill_separators:
+        for sep in SKILL_SEPARATORS:
             if sep in line:
                 parts = [s.strip() for s in line.split(sep) if s.strip()]
-                skills.extend(parts)
                 break
         else:
             # Single skill or phrase
-            if len(line) < 50 and line:
-                skills.append(line)
-    
-    # Clean up: remove duplicates, filter short/invalid
-    cleaned = []
-    seen = set()
-    for skill in skills:
-        # Remove bullets and clean
-        skill = re.sub(r'^[\-\*\•\·]\s*', '', skill).strip()
-        skill_lower = skill.lower()
-        if skill and len(skill) > 1 and skill_lower not in seen:
-            seen.add(skill_lower)
-            cleaned.append(skill)
+            parts = [line] if len(line) < 50 else []
+        
+        # Clean up: remove bullets, duplicates and short/invalid entries
+        for skill in parts:
+            skill = BULLET_RE.sub('', skill).strip()
+            skill_lower = skill.lower()
+            if skill and len(skill) > 1 and skill_lower not in seen:
+                seen.add(skill_lower)
+                cleaned.append(skill)
+                if len(cleaned) == MAX_SKILLS:
+                    return cleaned
     
-    return cleaned[:30]
+    return cleaned
 
 
 def _parse_experience(lines: List[str]) -> List[Dict[str, Any]]:
     """Extract work experience entries."""
     experiences = []
     current_exp: Dict[str, Any] = {}
+    description: List[str] = []
     
-    # Date patterns
-    date_pattern = r'((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*[\s\.,]*\d{4}|\d{1,2}/\d{4}|\d{4})'
+    def finish(exp: Dict[str, Any]) -> None:
+        text = " ".join(description)
+        if len(text) > MAX_DESCRIPTION_LENGTH:
+            text = text[:MAX_DESCRIPTION_LENGTH] + "..."
+        exp["description"] = text
+        experiences.append(exp)
     
     for line in lines:
         # Check if this looks like a job title/company line
-        dates = re.findall(date_pattern, line, re.IGNORECASE)
+        dates = EXPERIENCE_DATE_RE.findall(line)
         
-        if dates and len(dates) >= 1:
+        if dates:
             # This might be a new job entry header
             if current_exp.get("title"):
-                experiences.append(current_exp)
+                finish(current_exp)
+                if len(experiences) == MAX_EXPERIENCE:
+                    return experiences
             
-            # Parse the line for title and company
             # Remove dates from line to get title/company
-            clean_line = re.sub(date_pattern, '', line, flags=re.IGNORECASE).strip()
-            clean_line = re.sub(r'[\-–—]', ' - ', clean_line)
-            clean_line = re.sub(r'\s+', ' ', clean_line)
-            
-            parts = [p.strip() for p in re.split(r'\s*[\-–—,@]\s*', clean_line) if p.strip()]
+            clean_line = EXPERIENCE_DATE_RE.sub('', line).strip()
+            clean_line = WHITESPACE_RE.sub(' ', DASH_RE.sub(' - ', clean_line))
+            parts = [p.strip() for p in TITLE_SPLIT_RE.split(clean_line) if p.strip()]
             
             current_exp = {
                 "title": parts[0] if parts else "",
                 "company": parts[1] if len(parts) > 1 else "",
-                "start_date": dates[0] if dates else None,
+                "start_date": dates[0],
                 "end_date": dates[1] if len(dates) > 1 else "Present",
                 "description": "",
             }
+            description = []
         elif current_exp:
             # Add to description
-            current_exp["description"] = (current_exp.get("description", "") + " " + line).strip()
+            description.append(line)
     
     if current_exp.get("title"):
-        experiences.append(current_exp)
+        finish(current_exp)
     
-    # Truncate descriptions
-    for exp in experiences:
-        if exp.get("description") and len(exp["description"]) > 500:
-            exp["description"] = exp["description"][:500] + "..."
-    
-    return experiences[:10]
+    return experiences
 
 
 def _parse_education(lines: List[str]) -> List[Dict[str, Any]]:
@@ -213,22 +541,19 @@ def _parse_education(lines: List[str]) -> List[Dict[str, Any]]:
     education = []
     current_edu: Dict[str, Any] = {}
     
-    degree_keywords = ["bachelor", "master", "phd", "doctorate", "associate", "mba", "bs", "ba", "ms", "ma", "b.s.", "b.a.", "m.s.", "m.a."]
-    date_pattern = r'(\d{4})'
-    
     for line in lines:
-        lower_line = line.lower()
-        
         # Check for degree keywords
-        has_degree = any(kw in lower_line for kw in degree_keywords)
-        dates = re.findall(date_pattern, line)
+        has_degree = DEGREE_RE.search(line.lower()) is not None
+        dates = YEAR_RE.findall(line)
         
         if has_degree or dates:
             if current_edu.get("institution"):
                 education.append(current_edu)
+                if len(education) == MAX_EDUCATION:
+                    return education
             
             # Try to parse degree and institution
-            parts = [p.strip() for p in re.split(r'\s*[\-–—,]\s*', line) if p.strip()]
+            parts = [p.strip() for p in EDUCATION_SPLIT_RE.split(line) if p.strip()]
             
             # Determine which part is degree vs institution
             degree = ""
@@ -237,9 +562,9 @@ def _parse_education(lines: List[str]) -> List[Dict[str, Any]]:
             
             for part in parts:
                 part_lower = part.lower()
-                if any(kw in part_lower for kw in degree_keywords):
+                if DEGREE_RE.search(part_lower):
                     degree = part
-                elif "university" in part_lower or "college" in part_lower or "institute" in part_lower:
+                elif any(kw in part_lower for kw in INSTITUTION_KEYWORDS):
                     institution = part
                 elif not field and len(part) > 3:
                     field = part
@@ -262,4 +587,4 @@ def _parse_education(lines: List[str]) -> List[Dict[str, Any]]:
     if current_edu.get("institution"):
         education.append(current_edu)
     
-    return education[:5]
+    return education
@@ -1,19 +1,45 @@
 """
 Background job scheduler using APScheduler.
-Handles automatic job searches at configured intervals.
+Handles automatic job searches at configured intervals and the
+retention sweep that enforces Setting.auto_purge_days.
+
+With several API processes, only the one holding the scheduler lock runs
+the database-wide maintenance jobs; every process still refreshes its own
+in-memory state (compression dictionaries, session keys).
 """
+import asyncio
+import logging
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.jobstores.memory import MemoryJobStore
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, exists, text
 
-from app.models.database import async_session, Profile, Job, SearchRun
-from app.services.job_scraper import scrape_jobs
-from app.services.scorer import score_jobs
+from app.models.database import (
+    async_session, engine, Profile, Job, Posting, PostingBucket, Setting,
+)
+from app.services import job_stats
+from app.services.compression_dictionaries import load_dictionaries
+from app.services.search_queue import enqueue_search
+from app.core.cache import mark_user_changed
 from app.core.security import key_store
+from app.core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: no file locks, every process runs the jobs
+    fcntl = None
+
 
+# Aggregate reconciliation interval in seconds
+STATS_RECONCILE_INTERVAL = 86400
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key for electing the process that runs maintenance jobs
+SCHEDULER_LOCK_ID = 0x4A6F6254
 
 # Interval mapping in seconds
 INTERVALS = {
@@ -35,18 +61,90 @@ class JobScheduler:
             timezone="UTC",
         )
         self._started = False
+        self._lock = None
+        self.is_leader = False
+        self.last_retention_sweep: Optional[dict] = None
+    
+    async def _acquire_lock(self) -> bool:
+        """
+        Try to take the scheduler lock without waiting; it is held until
+        shutdown. PostgreSQL uses a session advisory lock, so it spans hosts;
+        SQLite (one host) uses a file lock next to the database.
+        """
+        if engine.dialect.name == "postgresql":
+            conn = await engine.connect()
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            if await conn.scalar(text("SELECT pg_try_advisory_lock(:id)"), {"id": SCHEDULER_LOCK_ID}):
+                self._lock = conn
+                return True
+            await conn.close()
+            return False
+        
+        database = engine.url.database
+        if fcntl is None or not database or database == ":memory:":
+            return True
+        handle = open(f"{database}.scheduler.lock", "w")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            handle.close()
+            return False
+        self._lock = handle
+        return True
+    
+    async def _release_lock(self):
+        lock, self._lock = self._lock, None
+        if lock is None:
+            return
+        if engine.dialect.name == "postgresql":
+            # Returning the connection to the pool would not release the lock
+            await lock.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": SCHEDULER_LOCK_ID})
+            await lock.close()
+        else:
+            lock.close()
     
-    def start(self):
-        """Start the scheduler."""
+    async def start(self):
+        """Start the scheduler, with maintenance jobs only if this process holds the lock."""
         if not self._started:
+            self.is_leader = await self._acquire_lock()
+            if self.is_leader:
+                self.scheduler.add_job(
+                    job_stats.reconcile_job_stats,
+                    IntervalTrigger(seconds=STATS_RECONCILE_INTERVAL),
+                    id="reconcile_job_stats",
+                    replace_existing=True,
+                )
+                self.scheduler.add_job(
+                    self.run_retention_sweep,
+                    IntervalTrigger(hours=settings.RETENTION_SWEEP_INTERVAL_HOURS),
+                    id="retention_sweep",
+                    replace_existing=True,
+                    max_instances=1,
+                    coalesce=True,
+                )
+            self.scheduler.add_job(
+                load_dictionaries,
+                IntervalTrigger(minutes=settings.COMPRESSION_DICT_REFRESH_MINUTES),
+                id="refresh_compression_dictionaries",
+                replace_existing=True,
+            )
+            self.scheduler.add_job(
+                key_store.sweep,
+                IntervalTrigger(seconds=settings.KEY_STORE_SWEEP_SECONDS),
+                id="sweep_session_keys",
+                replace_existing=True,
+                coalesce=True,
+            )
             self.scheduler.start()
             self._started = True
     
-    def shutdown(self):
-        """Shutdown the scheduler."""
+    async def shutdown(self):
+        """Shutdown the scheduler and hand the lock to another process."""
         if self._started:
             self.scheduler.shutdown(wait=False)
             self._started = False
+        await self._release_lock()
+        self.is_leader = False
     
     def schedule_profile(self, user_id: str, profile_id: int, interval: str):
         """Schedule or update a profile's search interval."""
@@ -84,10 +182,58 @@ class JobScheduler:
         if job:
             return job.next_run_time
         return None
+    
+    async def run_retention_sweep(self) -> dict:
+        """
+        Purge jobs older than each user's auto_purge_days.
+        Users are read in batches; deletes run in small chunks so the write
+        lock is only ever held briefly.
+        """
+        started = time.monotonic()
+        users_swept = 0
+        jobs_purged = 0
+        last_user_id = ""
+        
+        while True:
+            async with async_session() as db:
+                result = await db.execute(
+                    select(Setting.user_id, Setting.auto_purge_days)
+                    .where(Setting.auto_purge_days > 0, Setting.user_id > last_user_id)
+                    .order_by(Setting.user_id)
+                    .limit(settings.RETENTION_USER_BATCH_SIZE)
+                )
+                batch = result.all()
+            
+            if not batch:
+                break
+            
+            for user_id, days in batch:
+                try:
+                    jobs_purged += await purge_old_jobs(user_id, days)
+                    users_swept += 1
+                except Exception as e:
+                    logger.warning("Retention sweep failed for %s: %s", user_id, e)
+            
+            last_user_id = batch[-1][0]
+        
+        postings_purged = await purge_orphan_postings()
+        
+        if jobs_purged or postings_purged:
+            await _vacuum_jobs()
+        
+        self.last_retention_sweep = {
+            "finished_at": datetime.utcnow().isoformat(),
+            "users_swept": users_swept,
+            "jobs_purged": jobs_purged,
+            "postings_purged": postings_purged,
+            "duration_seconds": round(time.monotonic() - started, 2),
+        }
+        logger.info("Retention sweep: %s", self.last_retention_sweep)
+        return self.last_retention_sweep
 
 
 async def run_scheduled_search(user_id: str, profile_id: int):
-    """Execute a scheduled search for a profile."""
+    """Queue a scheduled search for a profile on the background search queue."""
     async with async_session() as db:
         try:
             # Get profile
@@ -99,61 +245,99 @@ async def run_scheduled_search(user_id: str, profile_id: int):
             if not profile or not profile.search_config:
                 return
             
-            # Check for OpenAI key
-            openai_key = key_store.get(user_id)
-            
-            # Create search run record
-            search_run = SearchRun(
-                user_id=user_id,
-                profile_id=profile_id,
-                status="running",
-            )
-            db.add(search_run)
-            await db.flush()
-            
-            try:
-                # Scrape jobs
-                raw_jobs = await scrape_jobs(profile.search_config)
-                search_run.jobs_found = len(raw_jobs)
-                
-                if not openai_key:
-                    # No key - mark as needs_key, skip scoring
-                    search_run.status = "needs_key"
-                    search_run.error_message = "OpenAI key not available - scoring skipped"
-                    search_run.completed_at = datetime.utcnow()
-                else:
-                    # Score jobs
-                    scored_jobs = await score_jobs(raw_jobs, profile, openai_key, db, user_id)
-                    search_run.jobs_scored = len(scored_jobs)
-                    search_run.status = "completed"
-                    search_run.completed_at = datetime.utcnow()
-                
-                await db.commit()
-                
-            except Exception as e:
-                search_run.status = "failed"
-                search_run.error_message = str(e)[:500]
-                search_run.completed_at = datetime.utcnow()
-                await db.commit()
+            if await enqueue_search(db, user_id, profile_id) is None:
+                logger.warning("Search queue full, skipped scheduled search for %s/%s", user_id, profile_id)
                 
         except Exception as e:
-            print(f"Scheduled search failed for {user_id}/{profile_id}: {e}")
+            logger.warning("Scheduled search failed for %s/%s: %s", user_id, profile_id, e)
 
 
-async def purge_old_jobs(user_id: str, days: int = 30):
-    """Delete jobs older than the specified number of days."""
+async def purge_old_jobs(user_id: str, days: int = 30) -> int:
+    """
+    Delete jobs older than the specified number of days.
+    Works in chunks of RETENTION_DELETE_CHUNK_SIZE, committing after each.
+    """
     cutoff = datetime.utcnow() - timedelta(days=days)
+    chunk_size = settings.RETENTION_DELETE_CHUNK_SIZE
+    purged = 0
     
     async with async_session() as db:
-        result = await db.execute(
-            delete(Job).where(
-                Job.user_id == user_id,
-                Job.created_at < cutoff
-            ).returning(Job.id)
-        )
-        deleted_ids = result.scalars().all()
-        await db.commit()
-        return len(deleted_ids)
+        while True:
+            result = await db.execute(
+                select(Job.id)
+                .where(Job.user_id == user_id, Job.created_at < cutoff)
+                .limit(chunk_size)
+            )
+            ids = result.scalars().all()
+            if not ids:
+                break
+            
+            await job_stats.record_jobs_deleted(db, user_id, Job.id.in_(ids))
+            mark_user_changed(db, user_id)
+            await db.execute(delete(Job).where(Job.id.in_(ids)))
+            await db.commit()
+            purged += len(ids)
+            
+            if len(ids) < chunk_size:
+                break
+            # Let queued requests take the write lock between chunks
+            await asyncio.sleep(0)
+    
+    return purged
+
+
+async def purge_orphan_postings() -> int:
+    """
+    Delete shared postings no user job references any more, in chunks.
+    Postings seen by a scrape within the grace period are kept, since a
+    search run may be about to attach user jobs to them.
+    """
+    chunk_size = settings.RETENTION_DELETE_CHUNK_SIZE
+    cutoff = datetime.utcnow() - timedelta(hours=settings.RETENTION_POSTING_GRACE_HOURS)
+    purged = 0
+    
+    async with async_session() as db:
+        while True:
+            orphaned = (
+                Posting.last_seen_at < cutoff,
+                ~exists().where(Job.posting_id == Posting.id),
+            )
+            result = await db.execute(select(Posting.id).where(*orphaned).limit(chunk_size))
+            ids = result.scalars().all()
+            if not ids:
+                break
+            
+            # Re-check the conditions in case a scrape picked a posting up meanwhile
+            await db.execute(
+                delete(PostingBucket).where(
+                    PostingBucket.posting_id.in_(
+                        select(Posting.id).where(Posting.id.in_(ids), *orphaned)
+                    )
+                )
+            )
+            await db.execute(delete(Posting).where(Posting.id.in_(ids), *orphaned))
+            await db.commit()
+            purged += len(ids)
+            
+            if len(ids) < chunk_size:
+                break
+            await asyncio.sleep(0)
+    
+    return purged
+
+
+async def _vacuum_jobs():
+    """Reclaim space after a sweep (incremental on SQLite, plain VACUUM on PostgreSQL)."""
+    try:
+        async with engine.connect() as conn:
+            if conn.dialect.name == "sqlite":
+                await conn.execute(text(f"PRAGMA incremental_vacuum({int(settings.RETENTION_VACUUM_PAGES)})"))
+                await conn.commit()
+            elif conn.dialect.name == "postgresql":
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                await conn.execute(text("VACUUM (ANALYZE) user_jobs, postings"))
+    except Exception as e:
+        logger.warning("Vacuum after retention sweep failed: %s", e)
 
 
 # Global scheduler instance
@@ -2,13 +2,21 @@
 OpenAI-based job scoring service.
 """
 import json
-from typing import Dict, Any, List, Optional
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from datetime import datetime
 from openai import AsyncOpenAI
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.database import Job, Profile, SearchRun
-from app.core.security import encryptor
+from app.core.config import settings
+from app.core.security import resume_cache
+from app.services import job_stats
+from app.services.dedup import collapse_near_duplicates
+from app.services.postings import upsert_postings, dedup_key
+
+
+logger = logging.getLogger(__name__)
 
 
 # Scoring weights
@@ -39,34 +47,52 @@ async def score_jobs(
     openai_key: str,
     db: AsyncSession,
     user_id: str,
+    search_run: Optional[SearchRun] = None,
+    on_progress: Optional[Callable[[SearchRun, Optional[Job]], Awaitable[None]]] = None,
 ) -> List[Job]:
     """
     Score a list of jobs against a user profile using OpenAI.
     Returns list of scored Job objects.
+    
+    Progress is recorded on `search_run` (created if not given); `on_progress`
+    is awaited when scoring starts and after each job is added, and may commit.
     """
-    if not jobs:
-        return []
+    if search_run is None:
+        if not jobs:
+            return []
+        
+        # Create search run record
+        search_run = SearchRun(user_id=user_id, profile_id=profile.id)
+        db.add(search_run)
     
-    # Create search run record
-    search_run = SearchRun(
-        user_id=user_id,
-        profile_id=profile.id,
-        status="running",
-        jobs_found=len(jobs),
-    )
-    db.add(search_run)
+    search_run.status = "running"
+    search_run.stage = "scoring"
+    search_run.jobs_found = len(jobs)
     await db.flush()
+    if on_progress is not None:
+        await on_progress(search_run, None)
     
     # Decrypt resume data
     resume_data = {}
     if profile.resume_data:
         try:
-            resume_data = encryptor.decrypt(profile.resume_data)
+            resume_data = resume_cache.decrypt(profile.id, profile.resume_data)
         except Exception:
             pass
     
+    # Skip cross-posted near-duplicates before paying to score them
+    if settings.DEDUP_ENABLED:
+        scraped = len(jobs)
+        jobs = await collapse_near_duplicates(db, user_id, profile.id, jobs)
+        if len(jobs) < scraped:
+            logger.info("Collapsed %d near-duplicate postings for user %s", scraped - len(jobs), user_id)
+    
+    # Store each distinct posting once, shared across users
+    posting_ids = await upsert_postings(db, [j for j in jobs if "posting_id" not in j])
+    
     client = AsyncOpenAI(api_key=openai_key)
     scored_jobs = []
+    unrecorded = []
     total_tokens = 0
     
     for job_data in jobs:
@@ -74,19 +100,11 @@ async def score_jobs(
             score_result = await _score_single_job(client, job_data, resume_data, profile.search_config)
             total_tokens += score_result.get("tokens_used", 0)
             
-            # Create Job record
+            # Create the user's scored job for the shared posting
             job = Job(
                 user_id=user_id,
                 profile_id=profile.id,
-                external_id=job_data.get("external_id"),
-                title=job_data.get("title"),
-                company=job_data.get("company"),
-                location=job_data.get("location"),
-                salary_min=job_data.get("salary_min"),
-                salary_max=job_data.get("salary_max"),
-                description=job_data.get("description"),
-                url=job_data.get("url"),
-                source=job_data.get("source"),
+                posting_id=job_data.get("posting_id") or posting_ids[dedup_key(job_data)],
                 score=score_result.get("total_score"),
                 tier=score_result.get("tier"),
                 matched_skills=score_result.get("matched_skills", []),
@@ -95,13 +113,26 @@ async def score_jobs(
             )
             db.add(job)
             scored_jobs.append(job)
+            unrecorded.append(job)
             
-        except Exception as e:
-            print(f"Error scoring job {job_data.get('title')}: {e}")
+        except Exception:
+            logger.exception("Error scoring job %s", job_data.get("title"))
             continue
+        
+        if on_progress is not None:
+            # The callback may commit, so keep the aggregates in step
+            await job_stats.record_jobs_added(db, user_id, unrecorded)
+            unrecorded = []
+            search_run.jobs_scored = len(scored_jobs)
+            search_run.api_tokens_used = total_tokens
+            await db.flush()
+            await on_progress(search_run, job)
+    
+    await job_stats.record_jobs_added(db, user_id, unrecorded)
     
     # Update search run
     search_run.status = "completed"
+    search_run.stage = "done"
     search_run.completed_at = datetime.utcnow()
     search_run.jobs_scored = len(scored_jobs)
     search_run.api_tokens_used = total_tokens
@@ -0,0 +1,80 @@
+"""
+In-process pub/sub for search run progress, consumed by the SSE endpoint.
+Each subscriber has a bounded buffer; a subscriber that falls behind is
+dropped rather than allowed to grow memory or stall the publisher.
+
+Only subscribers in the process running a search receive its events; with
+several API workers, streams on the others fall back to polling the run.
+"""
+import asyncio
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+
+from app.core.config import settings
+
+
+# Events after which a subscriber's stream ends
+TERMINAL_EVENTS = ("done", "dropped")
+
+
+class Subscription:
+    """One listener's bounded event buffer."""
+    
+    def __init__(self, run_id: int, buffer_size: int):
+        self.run_id = run_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.dropped = False
+    
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next event, or None if nothing arrived within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class SearchEventBroker:
+    """Fan-out of search run events to per-run subscribers."""
+    
+    def __init__(self, buffer_size: int):
+        self.buffer_size = buffer_size
+        self._subscribers: Dict[int, Set[Subscription]] = defaultdict(set)
+        self.dropped_subscribers = 0
+    
+    def subscribe(self, run_id: int) -> Subscription:
+        subscription = Subscription(run_id, self.buffer_size)
+        self._subscribers[run_id].add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.run_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.run_id]
+    
+    def publish(self, run_id: int, event: str, data: Dict[str, Any]) -> None:
+        """Deliver an event without blocking; full subscribers are dropped."""
+        for subscription in list(self._subscribers.get(run_id, ())):
+            try:
+                subscription.queue.put_nowait({"event": event, "data": data})
+            except asyncio.QueueFull:
+                self._drop(subscription)
+    
+    def _drop(self, subscription: Subscription) -> None:
+        # Replace the backlog with a single marker so the reader stops promptly
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait({"event": "dropped", "data": {}})
+        subscription.dropped = True
+        self.dropped_subscribers += 1
+        self.unsubscribe(subscription)
+    
+    def subscriber_count(self, run_id: Optional[int] = None) -> int:
+        if run_id is not None:
+            return len(self._subscribers.get(run_id, ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+search_events = SearchEventBroker(buffer_size=settings.SEARCH_EVENT_BUFFER_SIZE)
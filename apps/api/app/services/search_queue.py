@@ -0,0 +1,267 @@
+"""
+In-process queue for background job searches.
+POST /api/jobs/search and the scheduler enqueue a SearchRun id; a bounded
+pool of worker tasks runs the scrape-and-score pipeline and records
+progress (stage, jobs_found, jobs_scored) on the SearchRun as it goes.
+
+Runs are owned by the process that queued them (SearchRun.owner) and kept
+alive by its heartbeat, so several API processes can share one database:
+only runs whose owner stopped heartbeating are failed as interrupted.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import async_session, Job, Posting, Profile, SearchRun
+from app.services.job_scraper import scrape_jobs
+from app.services.scorer import score_jobs
+from app.services.search_events import search_events
+from app.core.security import key_store
+from app.core.cache import mark_user_changed
+from app.core.rate_limit import acquire_slot, concurrency_limiter
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+# Runs that have not finished yet
+ACTIVE_STATUSES = ("queued", "running")
+
+# Identifies this process as the owner of the runs it queues
+instance_id = uuid.uuid4().hex
+
+
+def run_progress(search_run: SearchRun) -> Dict[str, Any]:
+    """Progress fields published with every search event."""
+    return {
+        "id": search_run.id,
+        "status": search_run.status,
+        "stage": search_run.stage,
+        "jobs_found": search_run.jobs_found or 0,
+        "jobs_scored": search_run.jobs_scored or 0,
+        "error_message": search_run.error_message,
+    }
+
+
+async def run_search(search_run_id: int) -> None:
+    """Scrape and score for a queued SearchRun, committing progress as it advances."""
+    async with async_session() as db:
+        search_run = await db.get(SearchRun, search_run_id)
+        if search_run is None:
+            return
+        # Every progress commit changes what the dashboard shows
+        mark_user_changed(db, search_run.user_id)
+        
+        async def commit_progress(run: SearchRun, job: Optional[Job]) -> None:
+            # Publish only what is committed, so subscribers can fetch it
+            await db.commit()
+            if job is None:
+                search_events.publish(run.id, "progress", run_progress(run))
+                return
+            
+            posting = await db.get(Posting, job.posting_id)
+            search_events.publish(run.id, "job", {
+                "id": job.id,
+                "title": posting.title if posting else None,
+                "score": job.score,
+                "tier": job.tier,
+            })
+            search_events.publish(run.id, "progress", run_progress(run))
+        
+        try:
+            profile = await db.get(Profile, search_run.profile_id) if search_run.profile_id else None
+            if not profile or profile.user_id != search_run.user_id or not profile.search_config:
+                raise ValueError("Profile has no search configuration")
+            
+            search_run.status = "running"
+            search_run.stage = "scraping"
+            await commit_progress(search_run, None)
+            
+            raw_jobs = await scrape_jobs(profile.search_config)
+            search_run.jobs_found = len(raw_jobs)
+            
+            # Checked after scraping: scheduled runs still record what was found
+            openai_key = await key_store.get(search_run.user_id)
+            if not openai_key:
+                search_run.status = "needs_key"
+                search_run.stage = "done"
+                search_run.error_message = "OpenAI key not available - scoring skipped"
+                search_run.completed_at = datetime.utcnow()
+            else:
+                await score_jobs(
+                    raw_jobs, profile, openai_key, db, search_run.user_id,
+                    search_run=search_run, on_progress=commit_progress,
+                )
+            
+            await db.commit()
+            search_events.publish(search_run_id, "done", run_progress(search_run))
+        
+        except Exception as e:
+            logger.exception("Search run %s failed", search_run_id)
+            await db.rollback()
+            search_run = await db.get(SearchRun, search_run_id)
+            if search_run is not None:
+                search_run.status = "failed"
+                search_run.stage = "done"
+                search_run.error_message = str(e)[:500]
+                search_run.completed_at = datetime.utcnow()
+                await db.commit()
+                search_events.publish(search_run_id, "done", run_progress(search_run))
+
+
+async def _fail_runs(*conditions) -> None:
+    async with async_session() as db:
+        await db.execute(
+            update(SearchRun)
+            .where(SearchRun.status.in_(ACTIVE_STATUSES), *conditions)
+            .values(
+                status="failed",
+                stage="done",
+                error_message="Interrupted by server restart",
+                completed_at=datetime.utcnow(),
+            )
+        )
+        await db.commit()
+
+
+async def fail_stale_runs() -> None:
+    """Fail active runs owned by other processes that stopped heartbeating."""
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.SEARCH_RUN_STALE_SECONDS)
+    await _fail_runs(
+        SearchRun.owner.is_distinct_from(instance_id),
+        func.coalesce(SearchRun.heartbeat_at, SearchRun.started_at) < cutoff,
+    )
+
+
+class SearchQueue:
+    """Bounded asyncio queue drained by a fixed number of worker tasks."""
+    
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+    
+    async def start(self):
+        """Fail runs orphaned by dead processes, then start the workers and heartbeat."""
+        await fail_stale_runs()
+        
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+    
+    async def stop(self):
+        """Cancel workers and fail the runs this process still owned."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await _fail_runs(SearchRun.owner == instance_id)
+    
+    def submit(self, search_run_id: int, user_id: str) -> bool:
+        """Queue a run. Returns False when the queue is full or not started."""
+        if self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait((search_run_id, user_id))
+        except asyncio.QueueFull:
+            return False
+        return True
+    
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+    
+    async def _heartbeat(self):
+        """Keep this process's runs alive and reap runs of processes that died."""
+        while True:
+            await asyncio.sleep(settings.SEARCH_RUN_HEARTBEAT_SECONDS)
+            try:
+                async with async_session() as db:
+                    await db.execute(
+                        update(SearchRun)
+                        .where(
+                            SearchRun.owner == instance_id,
+                            SearchRun.status.in_(ACTIVE_STATUSES),
+                        )
+                        .values(heartbeat_at=datetime.utcnow())
+                    )
+                    await db.commit()
+                await fail_stale_runs()
+            except Exception:
+                logger.exception("Search run heartbeat failed")
+    
+    async def _worker(self):
+        while True:
+            search_run_id, user_id = await self._queue.get()
+            try:
+                await run_search(search_run_id)
+            except Exception:
+                logger.exception("Search worker error for run %s", search_run_id)
+            finally:
+                concurrency_limiter.release(user_id, "search")
+                self._queue.task_done()
+
+
+async def enqueue_search(db: AsyncSession, user_id: str, profile_id: int) -> Optional[SearchRun]:
+    """
+    Queue a search for a profile and return its SearchRun. A profile's
+    unfinished run is returned instead of starting a second one. Returns
+    None when the queue is full; raises RateLimitExceeded when the user
+    already has the maximum number of searches in flight.
+    """
+    result = await db.execute(
+        select(SearchRun)
+        .where(
+            SearchRun.user_id == user_id,
+            SearchRun.profile_id == profile_id,
+            SearchRun.status.in_(ACTIVE_STATUSES),
+        )
+        .order_by(SearchRun.started_at.desc())
+        .limit(1)
+    )
+    search_run = result.scalar_one_or_none()
+    if search_run is not None:
+        return search_run
+    
+    acquire_slot(user_id, "search")
+    
+    # Committed before submitting so a worker can load it straight away
+    search_run = SearchRun(
+        user_id=user_id,
+        profile_id=profile_id,
+        status="queued",
+        stage="queued",
+        owner=instance_id,
+        heartbeat_at=datetime.utcnow(),
+    )
+    db.add(search_run)
+    mark_user_changed(db, user_id)
+    try:
+        await db.commit()
+    except BaseException:
+        # The run was never queued, so nothing else will release the slot
+        concurrency_limiter.release(user_id, "search")
+        raise
+    
+    if not search_queue.submit(search_run.id, user_id):
+        concurrency_limiter.release(user_id, "search")
+        search_run.status = "failed"
+        search_run.stage = "done"
+        search_run.error_message = "Search queue is full"
+        search_run.completed_at = datetime.utcnow()
+        await db.commit()
+        return None
+    
+    return search_run
+
+
+search_queue = SearchQueue(
+    workers=settings.SEARCH_WORKERS,
+    max_pending=settings.SEARCH_QUEUE_SIZE,
+)
@@ -0,0 +1,39 @@
+"""Per-user query indexes and PostgreSQL GIN indexes on JSONB columns
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_jobs_user_id_score", "jobs", ["user_id", "score"])
+    op.create_index("ix_jobs_user_id_created_at", "jobs", ["user_id", "created_at"])
+    op.create_index("ix_search_runs_user_id_started_at", "search_runs", ["user_id", "started_at"])
+    
+    if op.get_bind().dialect.name == "postgresql":
+        op.create_index(
+            "ix_jobs_matched_skills_gin", "jobs", ["matched_skills"],
+            postgresql_using="gin",
+        )
+        op.create_index(
+            "ix_jobs_scoring_breakdown_gin", "jobs", ["scoring_breakdown"],
+            postgresql_using="gin", postgresql_ops={"scoring_breakdown": "jsonb_path_ops"},
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_jobs_scoring_breakdown_gin", table_name="jobs")
+        op.drop_index("ix_jobs_matched_skills_gin", table_name="jobs")
+    
+    op.drop_index("ix_search_runs_user_id_started_at", table_name="search_runs")
+    op.drop_index("ix_jobs_user_id_created_at", table_name="jobs")
+    op.drop_index("ix_jobs_user_id_score", table_name="jobs")
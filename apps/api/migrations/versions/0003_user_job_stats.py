@@ -0,0 +1,39 @@
+"""Per-user job aggregate table, backfilled from jobs
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_job_stats",
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("status", sa.String(), primary_key=True),
+        sa.Column("tier", sa.String(), primary_key=True),
+        sa.Column("job_count", sa.Integer(), nullable=False),
+        sa.Column("scored_count", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.Float(), nullable=False),
+    )
+    op.execute(
+        """
+        INSERT INTO user_job_stats (user_id, status, tier, job_count, scored_count, score_sum)
+        SELECT user_id, COALESCE(status, 'new'), COALESCE(tier, ''),
+               COUNT(*), COUNT(score), COALESCE(SUM(score), 0)
+        FROM jobs
+        GROUP BY user_id, COALESCE(status, 'new'), COALESCE(tier, '')
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_job_stats")
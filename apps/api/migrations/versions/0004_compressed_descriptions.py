@@ -0,0 +1,43 @@
+"""zstd dictionaries table; job descriptions stored as compressed bytes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "compression_dictionaries",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("sample_count", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("active_after", sa.DateTime(), nullable=False),
+    )
+    
+    # SQLite keeps existing TEXT values as-is (CompressedText reads both);
+    # PostgreSQL needs an explicit column type change.
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "ALTER TABLE jobs ALTER COLUMN description TYPE bytea "
+            "USING convert_to(description, 'UTF8')"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # Compressed rows must be decompressed by the application first
+        op.execute(
+            "ALTER TABLE jobs ALTER COLUMN description TYPE text "
+            "USING convert_from(description, 'UTF8')"
+        )
+    op.drop_table("compression_dictionaries")
@@ -0,0 +1,281 @@
+"""Split jobs into shared postings and per-user user_jobs
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+The keying and decompression code is a frozen copy of the application's as
+of this revision, so later changes there don't change what this migration
+writes.
+"""
+import hashlib
+import re
+from datetime import datetime
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import zstandard as zstd
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+json_type = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+BATCH_SIZE = 1000
+
+USER_JOB_COLUMNS = (
+    "id, user_id, profile_id, posting_id, score, tier, "
+    "matched_skills, scoring_breakdown, status, created_at"
+)
+
+_WHITESPACE = re.compile(r"\s+")
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _normalize(value):
+    return _WHITESPACE.sub(" ", str(value or "")).strip().lower()
+
+
+def _content_hash(job_data):
+    parts = [
+        _normalize(job_data.get(field))
+        for field in ("title", "company", "location", "description")
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _dedup_key(job_data, digest):
+    external_id = job_data.get("external_id")
+    if external_id:
+        return f"{job_data.get('source') or ''}:{external_id}"
+    return f"sha256:{digest}"
+
+
+def _create_user_job_indexes(is_postgres: bool) -> None:
+    op.create_index("ix_user_jobs_user_id_score", "user_jobs", ["user_id", "score"])
+    op.create_index("ix_user_jobs_user_id_created_at", "user_jobs", ["user_id", "created_at"])
+    op.create_index("ix_user_jobs_posting_id", "user_jobs", ["posting_id"])
+    if is_postgres:
+        op.create_index(
+            "ix_user_jobs_matched_skills_gin", "user_jobs", ["matched_skills"],
+            postgresql_using="gin",
+        )
+        op.create_index(
+            "ix_user_jobs_scoring_breakdown_gin", "user_jobs", ["scoring_breakdown"],
+            postgresql_using="gin", postgresql_ops={"scoring_breakdown": "jsonb_path_ops"},
+        )
+
+
+def _load_decompressors(bind):
+    """Decompressors for every stored dictionary, by dictionary id."""
+    decompressors = {0: zstd.ZstdDecompressor()}
+    for (data,) in bind.execute(sa.text("SELECT data FROM compression_dictionaries")):
+        dictionary = zstd.ZstdCompressionDict(bytes(data))
+        decompressors[dictionary.dict_id()] = zstd.ZstdDecompressor(dict_data=dictionary)
+    return decompressors
+
+
+def _decompress(decompressors, raw):
+    if raw is None:
+        return None
+    if isinstance(raw, str):
+        return raw
+    raw = bytes(raw)
+    if not raw.startswith(ZSTD_MAGIC):
+        return raw.decode("utf-8")
+    dict_id = zstd.get_frame_parameters(raw).dict_id
+    return decompressors[dict_id].decompress(raw).decode("utf-8")
+
+
+def _move_postings(bind) -> None:
+    """Create one posting per distinct job and point each job row at it."""
+    decompressors = _load_decompressors(bind)
+    jobs = sa.table(
+        "jobs",
+        sa.column("id", sa.Integer), sa.column("posting_id", sa.Integer),
+        sa.column("external_id", sa.String), sa.column("title", sa.String),
+        sa.column("company", sa.String), sa.column("location", sa.String),
+        sa.column("salary_min", sa.Integer), sa.column("salary_max", sa.Integer),
+        sa.column("description"),  # Untyped: TEXT or compressed bytes, read raw
+        sa.column("url", sa.String), sa.column("source", sa.String),
+        sa.column("created_at", sa.DateTime),
+    )
+    postings = sa.table(
+        "postings",
+        sa.column("id", sa.Integer), sa.column("dedup_key", sa.String),
+        sa.column("content_hash", sa.String), sa.column("external_id", sa.String),
+        sa.column("title", sa.String), sa.column("company", sa.String),
+        sa.column("location", sa.String), sa.column("salary_min", sa.Integer),
+        sa.column("salary_max", sa.Integer), sa.column("description", sa.LargeBinary),
+        sa.column("url", sa.String), sa.column("source", sa.String),
+        sa.column("created_at", sa.DateTime), sa.column("last_seen_at", sa.DateTime),
+    )
+    
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(jobs).where(jobs.c.id > last_id).order_by(jobs.c.id).limit(BATCH_SIZE)
+        ).mappings().all()
+        if not rows:
+            break
+        
+        keyed = []
+        new_postings = {}
+        for row in rows:
+            raw = row["description"]
+            if isinstance(raw, str):
+                raw = raw.encode("utf-8")
+            job_data = dict(row)
+            job_data["description"] = _decompress(decompressors, raw)
+            
+            digest = _content_hash(job_data)
+            key = _dedup_key(job_data, digest)
+            keyed.append((row["id"], key))
+            new_postings.setdefault(key, {
+                "dedup_key": key,
+                "content_hash": digest,
+                "external_id": row["external_id"],
+                "title": row["title"],
+                "company": row["company"],
+                "location": row["location"],
+                "salary_min": row["salary_min"],
+                "salary_max": row["salary_max"],
+                "description": bytes(raw) if raw is not None else None,
+                "url": row["url"],
+                "source": row["source"],
+                "created_at": row["created_at"],
+                "last_seen_at": datetime.utcnow(),
+            })
+        
+        existing = dict(bind.execute(
+            sa.select(postings.c.dedup_key, postings.c.id)
+            .where(postings.c.dedup_key.in_(list(new_postings)))
+        ).all())
+        missing = [p for key, p in new_postings.items() if key not in existing]
+        if missing:
+            bind.execute(postings.insert(), missing)
+            existing.update(bind.execute(
+                sa.select(postings.c.dedup_key, postings.c.id)
+                .where(postings.c.dedup_key.in_([p["dedup_key"] for p in missing]))
+            ).all())
+        
+        bind.execute(
+            jobs.update().where(jobs.c.id == sa.bindparam("job_id")).values(posting_id=sa.bindparam("pid")),
+            [{"job_id": job_id, "pid": existing[key]} for job_id, key in keyed],
+        )
+        last_id = rows[-1]["id"]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    is_postgres = bind.dialect.name == "postgresql"
+    
+    op.create_table(
+        "postings",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("dedup_key", sa.String(), nullable=False, unique=True),
+        sa.Column("content_hash", sa.String(64), nullable=False),
+        sa.Column("external_id", sa.String(), nullable=True),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("company", sa.String(), nullable=True),
+        sa.Column("location", sa.String(), nullable=True),
+        sa.Column("salary_min", sa.Integer(), nullable=True),
+        sa.Column("salary_max", sa.Integer(), nullable=True),
+        sa.Column("description", sa.LargeBinary(), nullable=True),
+        sa.Column("url", sa.String(), nullable=True),
+        sa.Column("source", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("last_seen_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_postings_content_hash", "postings", ["content_hash"])
+    
+    op.create_table(
+        "user_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("profile_id", sa.Integer(), sa.ForeignKey("profiles.id"), nullable=True),
+        sa.Column("posting_id", sa.Integer(), sa.ForeignKey("postings.id"), nullable=False),
+        sa.Column("score", sa.Float(), nullable=True),
+        sa.Column("tier", sa.String(), nullable=True),
+        sa.Column("matched_skills", json_type, nullable=True),
+        sa.Column("scoring_breakdown", json_type, nullable=True),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    
+    # Data migration: keep job ids so existing links stay valid
+    op.add_column("jobs", sa.Column("posting_id", sa.Integer(), nullable=True))
+    # Rows are re-keyed in Python, so `--sql` scripts (for empty databases) skip it
+    if not context.is_offline_mode():
+        _move_postings(bind)
+    op.execute(f"INSERT INTO user_jobs ({USER_JOB_COLUMNS}) SELECT {USER_JOB_COLUMNS} FROM jobs")
+    if is_postgres:
+        op.execute(
+            "SELECT setval(pg_get_serial_sequence('user_jobs', 'id'), "
+            "COALESCE((SELECT MAX(id) FROM user_jobs), 0) + 1, false)"
+        )
+    
+    op.drop_table("jobs")
+    _create_user_job_indexes(is_postgres)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    is_postgres = bind.dialect.name == "postgresql"
+    
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("profile_id", sa.Integer(), sa.ForeignKey("profiles.id"), nullable=True),
+        sa.Column("external_id", sa.String(), nullable=True),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("company", sa.String(), nullable=True),
+        sa.Column("location", sa.String(), nullable=True),
+        sa.Column("salary_min", sa.Integer(), nullable=True),
+        sa.Column("salary_max", sa.Integer(), nullable=True),
+        sa.Column("description", sa.LargeBinary() if is_postgres else sa.Text(), nullable=True),
+        sa.Column("url", sa.String(), nullable=True),
+        sa.Column("source", sa.String(), nullable=True),
+        sa.Column("score", sa.Float(), nullable=True),
+        sa.Column("tier", sa.String(), nullable=True),
+        sa.Column("matched_skills", json_type, nullable=True),
+        sa.Column("scoring_breakdown", json_type, nullable=True),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.execute(
+        """
+        INSERT INTO jobs (id, user_id, profile_id, external_id, title, company, location,
+                          salary_min, salary_max, description, url, source, score, tier,
+                          matched_skills, scoring_breakdown, status, created_at)
+        SELECT uj.id, uj.user_id, uj.profile_id, p.external_id, p.title, p.company, p.location,
+               p.salary_min, p.salary_max, p.description, p.url, p.source, uj.score, uj.tier,
+               uj.matched_skills, uj.scoring_breakdown, uj.status, uj.created_at
+        FROM user_jobs uj JOIN postings p ON p.id = uj.posting_id
+        """
+    )
+    if is_postgres:
+        op.execute(
+            "SELECT setval(pg_get_serial_sequence('jobs', 'id'), "
+            "COALESCE((SELECT MAX(id) FROM jobs), 0) + 1, false)"
+        )
+    
+    op.drop_table("user_jobs")
+    op.drop_table("postings")
+    
+    op.create_index("ix_jobs_user_id_score", "jobs", ["user_id", "score"])
+    op.create_index("ix_jobs_user_id_created_at", "jobs", ["user_id", "created_at"])
+    if is_postgres:
+        op.create_index(
+            "ix_jobs_matched_skills_gin", "jobs", ["matched_skills"],
+            postgresql_using="gin",
+        )
+        op.create_index(
+            "ix_jobs_scoring_breakdown_gin", "jobs", ["scoring_breakdown"],
+            postgresql_using="gin", postgresql_ops={"scoring_breakdown": "jsonb_path_ops"},
+        )
@@ -0,0 +1,23 @@
+"""search_runs.stage for background search progress
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("search_runs", sa.Column("stage", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("search_runs") as batch_op:
+        batch_op.drop_column("stage")
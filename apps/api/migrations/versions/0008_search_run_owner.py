@@ -0,0 +1,25 @@
+"""search_runs.owner and heartbeat_at so restarts only fail dead processes' runs
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("search_runs", sa.Column("owner", sa.String(), nullable=True))
+    op.add_column("search_runs", sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("search_runs") as batch_op:
+        batch_op.drop_column("heartbeat_at")
+        batch_op.drop_column("owner")
@@ -0,0 +1,152 @@
+"""Recompute posting MinHash signatures: location shingles, universal hashing
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+
+The signature code is a frozen copy of app.services.dedup as of this
+revision, so later changes there don't change what this migration writes.
+"""
+import hashlib
+import random
+import re
+import struct
+
+from alembic import context, op
+import sqlalchemy as sa
+import zstandard as zstd
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+MAX_DESCRIPTION_TOKENS = 400
+_MASK32 = 0xFFFFFFFF
+_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (rng.randrange(1, _PRIME), rng.randrange(_PRIME))
+    for rng in [random.Random(0x5EED)] for _ in range(NUM_PERM)
+]
+_SIGNATURE_FORMAT = f"<{NUM_PERM}I"
+_TOKEN = re.compile(r"[a-z0-9]+")
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _tokens(value):
+    if not isinstance(value, str):
+        return []
+    return _TOKEN.findall(value.lower())
+
+
+def _shingles(job_data):
+    shingles = {f"t:{t}" for t in _tokens(job_data.get("title"))}
+    shingles.update(f"c:{t}" for t in _tokens(job_data.get("company")))
+    shingles.update(f"l:{t}" for t in _tokens(job_data.get("location")))
+    
+    words = _tokens(job_data.get("description"))[:MAX_DESCRIPTION_TOKENS]
+    for i in range(max(len(words) - SHINGLE_SIZE + 1, 1 if words else 0)):
+        shingles.add(" ".join(words[i:i + SHINGLE_SIZE]))
+    return shingles
+
+
+def _signature(job_data):
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+        for s in _shingles(job_data)
+    ] or [0]
+    return struct.pack(
+        _SIGNATURE_FORMAT,
+        *(min((a * h + b) % _PRIME for h in hashes) & _MASK32 for a, b in _PERMUTATIONS),
+    )
+
+
+def _band_keys(sig):
+    band_bytes = ROWS * 4
+    return [
+        f"{band}:{hashlib.blake2b(sig[band * band_bytes:(band + 1) * band_bytes], digest_size=8).hexdigest()}"
+        for band in range(BANDS)
+    ]
+
+
+def _load_decompressors(bind):
+    """Decompressors for every stored dictionary, by dictionary id."""
+    decompressors = {0: zstd.ZstdDecompressor()}
+    for (data,) in bind.execute(sa.text("SELECT data FROM compression_dictionaries")):
+        dictionary = zstd.ZstdCompressionDict(bytes(data))
+        decompressors[dictionary.dict_id()] = zstd.ZstdDecompressor(dict_data=dictionary)
+    return decompressors
+
+
+def _decompress(decompressors, raw):
+    if raw is None:
+        return None
+    if isinstance(raw, str):
+        return raw
+    raw = bytes(raw)
+    if not raw.startswith(ZSTD_MAGIC):
+        return raw.decode("utf-8")
+    dict_id = zstd.get_frame_parameters(raw).dict_id
+    return decompressors[dict_id].decompress(raw).decode("utf-8")
+
+
+def _recompute_signatures(bind) -> None:
+    decompressors = _load_decompressors(bind)
+    postings = sa.table(
+        "postings",
+        sa.column("id", sa.Integer), sa.column("title", sa.String),
+        sa.column("company", sa.String), sa.column("location", sa.String),
+        sa.column("description"),  # Untyped: TEXT or compressed bytes, read raw
+        sa.column("minhash", sa.LargeBinary),
+    )
+    buckets = sa.table(
+        "posting_buckets",
+        sa.column("bucket", sa.String), sa.column("posting_id", sa.Integer),
+    )
+    
+    bind.execute(buckets.delete())
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(
+                postings.c.id, postings.c.title, postings.c.company,
+                postings.c.location, postings.c.description,
+            )
+            .where(postings.c.id > last_id).order_by(postings.c.id).limit(BATCH_SIZE)
+        ).mappings().all()
+        if not rows:
+            break
+        
+        signatures = []
+        for row in rows:
+            job_data = dict(row)
+            job_data["description"] = _decompress(decompressors, row["description"])
+            signatures.append((row["id"], _signature(job_data)))
+        
+        bind.execute(
+            postings.update().where(postings.c.id == sa.bindparam("pid")).values(minhash=sa.bindparam("sig")),
+            [{"pid": pid, "sig": sig} for pid, sig in signatures],
+        )
+        bind.execute(
+            buckets.insert(),
+            [{"bucket": key, "posting_id": pid} for pid, sig in signatures for key in _band_keys(sig)],
+        )
+        last_id = rows[-1]["id"]
+
+
+def upgrade() -> None:
+    # Signatures are computed in Python; `--sql` scripts (for empty databases) have none to redo
+    if not context.is_offline_mode():
+        _recompute_signatures(op.get_bind())
+
+
+def downgrade() -> None:
+    # Signatures in a newer layout only make near-duplicate matching miss
+    pass
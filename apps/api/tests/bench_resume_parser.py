@@ -0,0 +1,105 @@
+"""
+Benchmark the resume text parser on generated resumes of growing length.
+
+    python -m tests.bench_resume_parser
+    python -m tests.bench_resume_parser --against /tmp/old_resume_parser.py
+
+--against loads another version of app/services/resume_parser.py (e.g. from
+`git show <rev>:apps/api/app/services/resume_parser.py`), checks that both
+give the same output on every generated resume, and reports the speedup.
+
+Single-pass section detection (previous: the parser at d5b73ad^), on one
+CPU with Python 3.11, best of 5 in milliseconds per resume. Runs vary by
+about 20%; outputs were identical:
+
+     lines   previous    current   speedup
+       200       2.65       0.86      3.1x
+      2000      28.12       5.12      5.5x
+     20000     285.81      35.60      8.0x
+"""
+import argparse
+import importlib.util
+import random
+import timeit
+from types import ModuleType
+from typing import Callable, Dict, List
+
+from app.services import resume_parser
+
+
+SIZES = (200, 2000, 20000)
+SAMPLES = 20
+
+HEADERS = ["SUMMARY", "Technical Skills", "WORK EXPERIENCE", "Education", "Projects", "Interests"]
+SKILLS = ["Python", "Go", "SQL", "Kubernetes", "React", "Terraform", "Figma", "Spark", "Kafka"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries"]
+MONTHS = ["Jan", "Mar", "June", "Sept", "Nov"]
+FILLER = (
+    "Led a team shipping features to customers across several regions and improved "
+    "reliability of the platform while mentoring engineers"
+).split()
+
+
+def generate_resume(lines: int, rng: random.Random) -> str:
+    """Resume text of about `lines` lines mixing every kind of section."""
+    out = [
+        "Alex Example",
+        f"alex{rng.randrange(1000)}@example.com | +1 (555) {rng.randrange(100, 999)}-0100",
+    ]
+    while len(out) < lines:
+        header = rng.choice(HEADERS)
+        out.append(header)
+        for _ in range(rng.randrange(3, 12)):
+            if "Skills" in header:
+                out.append(", ".join(rng.sample(SKILLS, 4)))
+            elif "EXPERIENCE" in header and rng.random() < 0.3:
+                start = rng.randrange(2005, 2020)
+                out.append(
+                    f"Engineer - {rng.choice(COMPANIES)}   "
+                    f"{rng.choice(MONTHS)} {start} - {rng.choice(MONTHS)} {start + rng.randrange(1, 4)}"
+                )
+            elif header == "Education" and rng.random() < 0.5:
+                out.append(f"B.S. Computer Science, State University, {rng.randrange(2000, 2020)}")
+            else:
+                out.append(" ".join(rng.choices(FILLER, k=rng.randrange(6, 16))))
+        out.append("")
+    return "\n".join(out[:lines])
+
+
+def _load(path: str) -> ModuleType:
+    spec = importlib.util.spec_from_file_location("resume_parser_baseline", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _best_ms(parse: Callable[[str], Dict], resumes: List[str]) -> float:
+    timer = timeit.Timer(lambda: [parse(text) for text in resumes])
+    return min(timer.repeat(repeat=5, number=1)) / len(resumes) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--against", help="path of another resume_parser.py to compare with")
+    args = parser.parse_args()
+    
+    baseline = _load(args.against) if args.against else None
+    rng = random.Random(48)
+    
+    print(f"{'lines':>10} {'previous':>10} {'current':>10} {'speedup':>9}")
+    for size in SIZES:
+        resumes = [generate_resume(size, rng) for _ in range(max(1, SAMPLES * 200 // size))]
+        current = _best_ms(resume_parser._parse_resume_text, resumes)
+        if baseline is None:
+            print(f"{size:>10} {'':>10} {current:>10.2f}")
+            continue
+        
+        for text in resumes:
+            if baseline._parse_resume_text(text) != resume_parser._parse_resume_text(text):
+                raise SystemExit(f"Outputs differ on a generated {size}-line resume")
+        previous = _best_ms(baseline._parse_resume_text, resumes)
+        print(f"{size:>10} {previous:>10.2f} {current:>10.2f} {previous / current:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
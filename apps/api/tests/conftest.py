@@ -0,0 +1,65 @@
+"""
+Shared fixtures: a throwaway SQLite database migrated by the app's own
+lifespan, and a TestClient authenticated as TEST_USER.
+"""
+import os
+import tempfile
+
+from cryptography.fernet import Fernet
+
+# Configure before the app (and its settings) are imported
+_data_dir = tempfile.mkdtemp(prefix="jobscout-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_data_dir}/test.db"
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+os.environ.setdefault("RESUME_PARSE_WORKERS", "2")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.auth import get_current_user_id
+from app.core.rate_limit import concurrency_limiter, rate_limiter
+from app.models.database import async_session, User
+
+
+TEST_USER = "user_test"
+
+
+async def _create_user() -> None:
+    async with async_session() as db:
+        if await db.get(User, TEST_USER) is None:
+            db.add(User(id=TEST_USER, email="test@example.com"))
+            await db.commit()
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip postgres-marked tests unless TEST_POSTGRES_URL names a database."""
+    if os.environ.get("TEST_POSTGRES_URL"):
+        return
+    skip = pytest.mark.skip(reason="TEST_POSTGRES_URL is not set")
+    for item in items:
+        if "postgres" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """App client for the whole session; the lifespan runs the migrations."""
+    app.dependency_overrides[get_current_user_id] = lambda: TEST_USER
+    with TestClient(app) as test_client:
+        test_client.portal.call(_create_user)
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def run(client):
+    """Run an async function on the app's event loop."""
+    return lambda fn, *args: client.portal.call(fn, *args)
+
+
+@pytest.fixture(autouse=True)
+def reset_limits():
+    """Every test starts with full rate-limit buckets and no slots held."""
+    rate_limiter._buckets.clear()
+    concurrency_limiter._active.clear()
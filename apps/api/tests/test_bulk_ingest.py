@@ -0,0 +1,74 @@
+import io
+import zipfile
+
+from sqlalchemy import select
+
+from app.core.security import key_store
+from app.models.database import async_session, Profile
+from app.services import search_queue
+from tests.conftest import TEST_USER
+
+
+RESUME = """{name}
+{email} | (555) 123-4567
+
+SKILLS
+Python, SQL, Docker
+
+EXPERIENCE
+Software Engineer at Acme Corp
+2019 - Present
+"""
+
+
+def _zip(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, text in files.items():
+            archive.writestr(name, text)
+    return buffer.getvalue()
+
+
+def test_search_after_bulk_ingest_uses_existing_profile(client, run, monkeypatch):
+    async def no_op(search_run_id):
+        pass
+    
+    monkeypatch.setattr(search_queue, "run_search", no_op)
+    
+    async def setup():
+        await key_store.store(TEST_USER, "sk-test")
+        async with async_session() as db:
+            profile = Profile(
+                user_id=TEST_USER,
+                name="Main",
+                search_config={"search_terms": ["python"]},
+            )
+            db.add(profile)
+            await db.commit()
+            return profile.id
+    
+    profile_id = run(setup)
+    
+    archive = _zip({
+        "ada.txt": RESUME.format(name="Ada Lovelace", email="ada@example.com"),
+        "alan.txt": RESUME.format(name="Alan Turing", email="alan@example.com"),
+    })
+    response = client.post("/api/resume/bulk", files={"file": ("resumes.zip", archive, "application/zip")})
+    assert response.status_code == 200
+    report = response.json()["data"]
+    assert report["created"] == 2
+    
+    async def bulk_profiles_active():
+        async with async_session() as db:
+            result = await db.execute(
+                select(Profile.is_active).where(
+                    Profile.id.in_([r["profile_id"] for r in report["results"]])
+                )
+            )
+            return result.scalars().all()
+    
+    assert run(bulk_profiles_active) == [False, False]
+    
+    response = client.post("/api/jobs/search")
+    assert response.status_code == 202
+    assert response.json()["data"]["profile_id"] == profile_id
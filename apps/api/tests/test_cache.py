@@ -0,0 +1,57 @@
+from sqlalchemy import update
+
+from app.core import cache
+from app.core.cache import mark_user_changed, response_cache
+from app.models.database import async_session, User
+from tests.conftest import TEST_USER
+
+
+def _revalidate(client, etag):
+    return client.get("/api/metrics/overview", headers={"If-None-Match": etag})
+
+
+def test_etag_follows_database_version(client, run):
+    etag = client.get("/api/metrics/overview").headers["ETag"]
+    assert _revalidate(client, etag).status_code == 304
+    
+    # Another API process bumping the version (and so not touching this
+    # process's memory) still invalidates the tag
+    async def bump_elsewhere():
+        async with async_session() as db:
+            await db.execute(
+                update(User).where(User.id == TEST_USER).values(data_version=User.data_version + 1)
+            )
+            await db.commit()
+    
+    run(bump_elsewhere)
+    response = _revalidate(client, etag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_commit_bumps_version(client, run):
+    async def version():
+        async with async_session() as db:
+            return (await db.get(User, TEST_USER)).data_version
+    
+    async def change():
+        async with async_session() as db:
+            mark_user_changed(db, TEST_USER)
+            await db.commit()
+            # Every later commit of the session bumps again
+            await db.commit()
+    
+    before = run(version)
+    run(change)
+    assert run(version) == before + 2
+
+
+def test_etag_expires_with_cache_ttl(client, monkeypatch):
+    etag = client.get("/api/metrics/overview").headers["ETag"]
+    
+    now = cache.time.time()
+    monkeypatch.setattr(cache.time, "time", lambda: now + cache.settings.RESPONSE_CACHE_TTL_SECONDS)
+    response_cache.clear()
+    response = _revalidate(client, etag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import pytest
+
+from sqlalchemy import column, table, update
+
+from app.core.compression import CompressionCodec, UnknownDictionary, codec, train_dictionary
+from app.models.database import async_session, CompressionDictionary, Job, Posting
+from app.services.compression_dictionaries import load_missing_dictionaries
+from tests.conftest import TEST_USER
+
+
+# Raw handle on the column, to store frames as another process wrote them
+postings = table("postings", column("id"), column("description"))
+
+
+SAMPLES = [
+    f"Senior Software Engineer {i} at Company {i % 13}. We are looking for an engineer "
+    f"with {i % 9} years of Python, SQL and cloud experience to build data pipelines. "
+    f"Benefits include health insurance, remote work and {i % 30} days of paid leave."
+    for i in range(400)
+]
+
+
+def _store_dictionary(run, dict_id, data):
+    """Store a dictionary the way another process's training would."""
+    async def store():
+        async with async_session() as db:
+            db.add(CompressionDictionary(id=dict_id, data=data, active_after=datetime.utcnow()))
+            await db.commit()
+    
+    run(store)
+
+
+def test_unknown_dictionary_is_loaded_asynchronously(client, run):
+    dict_id, data = train_dictionary(SAMPLES, dict_size=2048)
+    writer = CompressionCodec()
+    writer.add_dictionary(data, activate=True)
+    frame = writer.compress(SAMPLES[0])
+    _store_dictionary(run, dict_id, data)
+    
+    # Decoding only looks up; it records the id instead of querying
+    with pytest.raises(UnknownDictionary):
+        codec.decompress(frame)
+    assert dict_id in codec.missing
+    
+    assert run(load_missing_dictionaries) == 1
+    assert dict_id not in codec.missing
+    assert codec.decompress(frame) == SAMPLES[0]
+
+
+def test_request_hitting_unknown_dictionary_can_be_retried(client, run):
+    dict_id, data = train_dictionary(SAMPLES, dict_size=4096)
+    writer = CompressionCodec()
+    writer.add_dictionary(data, activate=True)
+    _store_dictionary(run, dict_id, data)
+    
+    async def create_job():
+        async with async_session() as db:
+            posting = Posting(dedup_key=f"test:{dict_id}", content_hash="0" * 64, title="Engineer")
+            db.add(posting)
+            await db.flush()
+            # Written by a process that already uses the new dictionary
+            await db.execute(
+                update(postings)
+                .where(postings.c.id == posting.id)
+                .values(description=writer.compress(SAMPLES[2]))
+            )
+            job = Job(user_id=TEST_USER, posting_id=posting.id)
+            db.add(job)
+            await db.commit()
+            return job.id
+    
+    job_id = run(create_job)
+    
+    response = client.get(f"/api/jobs/{job_id}")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    
+    response = client.get(f"/api/jobs/{job_id}")
+    assert response.status_code == 200
+    assert response.json()["data"]["description"] == SAMPLES[2]
+
+
+def test_missing_dictionary_still_fails(client, run):
+    other = CompressionCodec()
+    other.add_dictionary(train_dictionary(SAMPLES[::-1], dict_size=1024)[1], activate=True)
+    with pytest.raises(UnknownDictionary):
+        codec.decompress(other.compress(SAMPLES[1]))
+    assert run(load_missing_dictionaries) == 0
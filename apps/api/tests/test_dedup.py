@@ -0,0 +1,85 @@
+from app.models.database import async_session, Job, Profile
+from app.services.dedup import collapse_near_duplicates
+from app.services.postings import upsert_postings
+from tests.conftest import TEST_USER
+
+
+DESCRIPTION = (
+    "We are hiring a backend engineer to design and operate the services behind our "
+    "logistics platform. You will build APIs in Python, model data in PostgreSQL, run "
+    "workloads on Kubernetes, review code with a small team and own features from design "
+    "to production. Experience with message queues, observability and on-call is a plus. "
+    "We offer flexible hours, a learning budget and twenty five days of paid leave."
+)
+
+
+def _posting(**overrides):
+    job_data = {
+        "title": "Backend Engineer",
+        "company": "Freightly",
+        "location": "Berlin, Germany",
+        "description": DESCRIPTION,
+        "source": "indeed",
+        "external_id": "fr-1",
+    }
+    job_data.update(overrides)
+    return job_data
+
+
+def test_cross_posted_duplicates_collapse_within_a_batch(run):
+    async def scenario():
+        async with async_session() as db:
+            return await collapse_near_duplicates(db, TEST_USER, None, [
+                _posting(),
+                # The same posting on another board, lightly edited
+                _posting(
+                    source="linkedin",
+                    external_id="li-9",
+                    description=DESCRIPTION.replace("twenty five", "25") + " Apply today.",
+                ),
+            ])
+    
+    kept = run(scenario)
+    assert [job["source"] for job in kept] == ["indeed"]
+
+
+def test_same_role_in_other_locations_is_kept(run):
+    async def scenario():
+        async with async_session() as db:
+            return await collapse_near_duplicates(db, TEST_USER, None, [
+                _posting(),
+                _posting(external_id="fr-2", location="Munich, Germany"),
+                _posting(external_id="fr-3", location="Remote"),
+            ])
+    
+    kept = run(scenario)
+    assert [job["location"] for job in kept] == ["Berlin, Germany", "Munich, Germany", "Remote"]
+
+
+def test_match_scored_by_another_profile_is_reused(run):
+    stored = _posting(title="Platform Engineer", company="Cargoline", external_id="cl-1")
+    repost = _posting(
+        title="Platform Engineer",
+        company="Cargoline",
+        source="linkedin",
+        external_id="cl-7",
+        description=DESCRIPTION + " Apply today.",
+    )
+    
+    async def scenario():
+        async with async_session() as db:
+            first = Profile(user_id=TEST_USER, name="Backend")
+            second = Profile(user_id=TEST_USER, name="Platform")
+            db.add_all([first, second])
+            await db.flush()
+            [posting_id] = (await upsert_postings(db, [stored])).values()
+            db.add(Job(user_id=TEST_USER, profile_id=first.id, posting_id=posting_id))
+            await db.commit()
+            
+            same_profile = await collapse_near_duplicates(db, TEST_USER, first.id, [dict(repost)])
+            other_profile = await collapse_near_duplicates(db, TEST_USER, second.id, [dict(repost)])
+            return posting_id, same_profile, other_profile
+    
+    posting_id, same_profile, other_profile = run(scenario)
+    assert same_profile == []
+    assert [job["posting_id"] for job in other_profile] == [posting_id]
@@ -0,0 +1,70 @@
+from sqlalchemy import delete, update
+
+from app.models.database import async_session, Job, User
+from app.services import job_stats
+from app.services.postings import upsert_postings
+
+
+STATS_USER = "user_stats"
+
+
+async def _snapshot(db):
+    return {
+        (row.status, row.tier): (row.job_count, row.scored_count, round(row.score_sum, 6))
+        for row in await job_stats.get_user_stats(db, STATS_USER)
+        # Cells emptied by deltas stay as zero rows; a rebuild doesn't create them
+        if row.job_count or row.scored_count or row.score_sum
+    }
+
+
+def test_deltas_match_a_rebuild(run):
+    async def scenario():
+        async with async_session() as db:
+            db.add(User(id=STATS_USER, email="stats@example.com"))
+            posting_ids = list((await upsert_postings(db, [
+                {"title": f"Role {i}", "company": "Acme", "source": "indeed", "external_id": f"stats-{i}"}
+                for i in range(6)
+            ])).values())
+            jobs = [
+                Job(user_id=STATS_USER, posting_id=posting_ids[0], score=91.5, tier="A", status="new"),
+                Job(user_id=STATS_USER, posting_id=posting_ids[1], score=74.0, tier="B", status="new"),
+                Job(user_id=STATS_USER, posting_id=posting_ids[2], score=71.25, tier="B", status="new"),
+                Job(user_id=STATS_USER, posting_id=posting_ids[3], score=40.0, tier="D", status="new"),
+                Job(user_id=STATS_USER, posting_id=posting_ids[4], tier=None, status="new"),
+                Job(user_id=STATS_USER, posting_id=posting_ids[5], score=55.5, tier="C", status="saved"),
+            ]
+            db.add_all(jobs)
+            await db.flush()
+            await job_stats.record_jobs_added(db, STATS_USER, jobs)
+            
+            # Single status change, as PUT /api/jobs/{id}/status applies it
+            jobs[0].status, old_status = "applied", jobs[0].status
+            await job_stats.record_status_change(db, STATS_USER, jobs[0], old_status)
+            await db.flush()
+            
+            # Bulk status change, as PUT /api/jobs/status applies it
+            conditions = [Job.id.in_([jobs[1].id, jobs[2].id, jobs[5].id])]
+            await job_stats.record_bulk_status_change(db, STATS_USER, "hidden", *conditions)
+            await db.execute(
+                update(Job).where(Job.user_id == STATS_USER, *conditions)
+                .values(status="hidden").execution_options(synchronize_session=False)
+            )
+            
+            # Purge, as the retention sweep applies it
+            purged = [Job.id.in_([jobs[3].id, jobs[4].id])]
+            await job_stats.record_jobs_deleted(db, STATS_USER, *purged)
+            await db.execute(delete(Job).where(Job.user_id == STATS_USER, *purged))
+            await db.commit()
+            
+            incremental = await _snapshot(db)
+            await job_stats.rebuild_user_stats(db, STATS_USER)
+            await db.commit()
+            return incremental, await _snapshot(db)
+    
+    incremental, rebuilt = run(scenario)
+    assert incremental == rebuilt
+    assert rebuilt == {
+        ("applied", "A"): (1, 1, 91.5),
+        ("hidden", "B"): (2, 2, 145.25),
+        ("hidden", "C"): (1, 1, 55.5),
+    }
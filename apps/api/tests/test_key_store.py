@@ -0,0 +1,26 @@
+from cryptography.fernet import Fernet
+
+from app.core.security import SocketKeyBackend, key_store
+from app.routers import scoring
+
+
+class FakeOpenAI:
+    def __init__(self, api_key):
+        self.models = self
+    
+    async def list(self):
+        return []
+
+
+def test_key_endpoints_return_503_when_sidecar_is_down(client, monkeypatch, tmp_path):
+    backend = SocketKeyBackend(str(tmp_path / "missing.sock"), Fernet.generate_key().decode(), timeout=0.5)
+    monkeypatch.setattr(key_store, "backend", backend)
+    monkeypatch.setattr(scoring, "AsyncOpenAI", FakeOpenAI)
+    
+    response = client.post("/api/openai/validate", json={"key": "sk-test"})
+    assert response.status_code == 503
+    assert response.json()["detail"] == "Key storage is temporarily unavailable. Try again shortly."
+    
+    assert client.delete("/api/openai/clear").status_code == 503
+    # Reads degrade to "no key" instead of failing
+    assert client.get("/api/openai/status").status_code == 200
@@ -0,0 +1,77 @@
+"""
+Parser output for the resumes in fixtures/resumes, checked against the
+expected JSON next to each one. After an intended change to the parsing
+rules, bump PARSER_VERSION and regenerate the JSON files with:
+
+    python -m tests.test_resume_fixtures
+
+Timings for the parser live in tests/bench_resume_parser.py.
+"""
+import json
+from pathlib import Path
+
+import pytest
+from docx import Document
+
+from app.core.config import settings
+from app.services.resume_parser import ResumeTextParser, parse_resume, parse_resume_sync
+
+
+FIXTURES = Path(__file__).parent / "fixtures" / "resumes"
+RESUMES = sorted(FIXTURES.glob("*.txt"))
+# Real documents, for the PDF and DOCX extraction paths
+DOCUMENTS = sorted(FIXTURES.glob("*.pdf")) + sorted(FIXTURES.glob("*.docx"))
+
+
+def _expected(resume: Path) -> dict:
+    return json.loads(resume.with_suffix(".json").read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("resume", RESUMES, ids=lambda p: p.stem)
+def test_text_resume(resume):
+    assert parse_resume_sync(str(resume), ".txt") == _expected(resume)
+
+
+@pytest.mark.parametrize("resume", RESUMES, ids=lambda p: p.stem)
+def test_docx_resume_matches_text(resume, tmp_path):
+    document = Document()
+    for line in resume.read_text(encoding="utf-8").splitlines():
+        document.add_paragraph(line)
+    path = tmp_path / f"{resume.stem}.docx"
+    document.save(path)
+    
+    assert parse_resume_sync(str(path), ".docx") == _expected(resume)
+
+
+@pytest.mark.parametrize("resume", RESUMES, ids=lambda p: p.stem)
+def test_resume_fed_page_by_page(resume):
+    """PDFs are parsed one page at a time; a page break must not change the result."""
+    lines = resume.read_text(encoding="utf-8").splitlines()
+    middle = len(lines) // 2
+    parser = ResumeTextParser()
+    parser.feed("\n".join(lines[:middle]))
+    parser.feed("\n".join(lines[middle:]))
+    
+    assert parser.result() == _expected(resume)
+
+
+@pytest.mark.parametrize("resume", DOCUMENTS, ids=lambda p: p.name)
+def test_document_resume(resume):
+    assert parse_resume_sync(str(resume), resume.suffix) == _expected(resume)
+
+
+@pytest.mark.parametrize("resume", DOCUMENTS, ids=lambda p: p.name)
+def test_document_resume_through_the_pool(resume, run, monkeypatch):
+    """Same result from the worker pool, where PDF pages are extracted in ranges."""
+    monkeypatch.setattr(settings, "RESUME_PDF_PAGES_PER_TASK", 1)
+    parsed = run(parse_resume, resume.read_bytes(), resume.suffix)
+    assert parsed == _expected(resume)
+
+
+if __name__ == "__main__":
+    for resume in RESUMES + DOCUMENTS:
+        parsed = parse_resume_sync(str(resume), resume.suffix)
+        resume.with_suffix(".json").write_text(
+            json.dumps(parsed, indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
+        )
+        print(f"Wrote {resume.with_suffix('.json').name}")
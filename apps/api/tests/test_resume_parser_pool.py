@@ -0,0 +1,38 @@
+import asyncio
+import signal
+import time
+
+import pytest
+
+from app.services import resume_parser
+from app.services.resume_parser import ResumeParseError, ResumeParserPool
+
+
+def stuck(seconds: float) -> str:
+    """Like a parse stuck in C code: the worker's alarm can't interrupt it."""
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+    time.sleep(seconds)
+    return "finished"
+
+
+def test_timeout_only_fails_the_stuck_call(monkeypatch):
+    monkeypatch.setattr(resume_parser, "WORKER_GRACE_SECONDS", 2)
+    pool = ResumeParserPool(workers=2, timeout=1, max_memory_mb=0, max_tasks_per_child=None)
+    
+    async def scenario():
+        # Start both workers first so spawning doesn't eat into the timeouts
+        await asyncio.gather(pool.run(stuck, 0.2), pool.run(stuck, 0.2))
+        hung = asyncio.ensure_future(pool.run(stuck, 60))
+        await asyncio.sleep(2)
+        # Still running when the hung call's pool is killed at 3s, and done
+        # within its own limit once resubmitted
+        innocent = asyncio.ensure_future(pool.run(stuck, 1.5))
+        with pytest.raises(ResumeParseError):
+            await hung
+        return await innocent
+    
+    try:
+        assert asyncio.run(scenario()) == "finished"
+        assert pool.killed == 1
+    finally:
+        pool.shutdown()
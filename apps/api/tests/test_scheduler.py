@@ -0,0 +1,30 @@
+import logging
+
+from app.services.scheduler import JobScheduler, job_scheduler
+
+
+def test_only_one_process_runs_maintenance_jobs(client, run):
+    assert job_scheduler.is_leader
+    
+    async def start_second():
+        other = JobScheduler()
+        await other.start()
+        try:
+            return other.is_leader, {job.id for job in other.scheduler.get_jobs()}
+        finally:
+            await other.shutdown()
+    
+    is_leader, jobs = run(start_second)
+    assert not is_leader
+    assert "retention_sweep" not in jobs
+    assert "refresh_compression_dictionaries" in jobs
+
+
+def test_retention_sweep_report_is_logged_and_exposed(client, run, caplog):
+    with caplog.at_level(logging.INFO, logger="app.services.scheduler"):
+        report = run(job_scheduler.run_retention_sweep)
+    assert any("Retention sweep" in r.getMessage() for r in caplog.records)
+    
+    scheduler = client.get("/api/metrics/runtime").json()["data"]["scheduler"]
+    assert scheduler["leader"] is True
+    assert scheduler["last_retention_sweep"] == report
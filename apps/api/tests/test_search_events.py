@@ -0,0 +1,29 @@
+from sqlalchemy import delete
+
+from app.core.config import settings
+from app.models.database import async_session, SearchRun
+from app.routers.jobs import _search_event_stream
+from tests.conftest import TEST_USER
+
+
+def test_stream_ends_with_error_when_run_is_deleted(run, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_EVENT_KEEPALIVE_SECONDS", 0.05)
+    
+    async def scenario():
+        async with async_session() as db:
+            search_run = SearchRun(user_id=TEST_USER, status="running")
+            db.add(search_run)
+            await db.commit()
+        
+        stream = _search_event_stream(search_run.id)
+        events = [await anext(stream)]
+        async with async_session() as db:
+            await db.execute(delete(SearchRun).where(SearchRun.id == search_run.id))
+            await db.commit()
+        events += [event async for event in stream]
+        
+        # Already gone when the stream starts
+        events += [event async for event in _search_event_stream(search_run.id)]
+        return [event.split("\n", 1)[0] for event in events]
+    
+    assert run(scenario) == ["event: progress", "event: error", "event: error"]
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.rate_limit import concurrency_limiter
+from app.core.security import key_store
+from app.models.database import async_session, Profile, SearchRun
+from app.services import scorer, search_queue
+from app.services.search_queue import enqueue_search, fail_stale_runs, instance_id
+from tests.conftest import TEST_USER
+
+
+def test_fail_stale_runs_spares_live_and_own_runs(run):
+    async def scenario():
+        now = datetime.utcnow()
+        long_ago = now - timedelta(hours=1)
+        runs = [
+            SearchRun(user_id=TEST_USER, status="running", owner="dead-process", heartbeat_at=long_ago),
+            SearchRun(user_id=TEST_USER, status="running", owner="other-process", heartbeat_at=now),
+            SearchRun(user_id=TEST_USER, status="queued", owner=instance_id, heartbeat_at=long_ago),
+            SearchRun(user_id=TEST_USER, status="running", started_at=long_ago),
+        ]
+        async with async_session() as db:
+            db.add_all(runs)
+            await db.commit()
+        
+        await fail_stale_runs()
+        
+        async with async_session() as db:
+            return [(await db.get(SearchRun, r.id)).status for r in runs]
+    
+    assert run(scenario) == ["failed", "running", "queued", "failed"]
+
+
+def test_enqueue_releases_slot_when_commit_fails(run):
+    async def scenario():
+        async with async_session() as db:
+            async def failing_commit():
+                raise RuntimeError("database is locked")
+            
+            db.commit = failing_commit
+            with pytest.raises(RuntimeError):
+                await enqueue_search(db, TEST_USER, 12345)
+    
+    run(scenario)
+    assert concurrency_limiter._active[(TEST_USER, "search")] == 0
+
+
+def test_job_list_follows_a_running_search(client, run, monkeypatch):
+    mid_run = threading.Event()
+    resume = threading.Event()
+    calls = 0
+    
+    async def scrape(search_config):
+        return [
+            {"title": title, "company": company, "description": f"{title} role at {company}", "source": "test"}
+            for title, company in [("Baker", "Bread Co"), ("Pilot", "Sky Air"), ("Welder", "Steel Works")]
+        ]
+    
+    async def score(client, job_data, resume_data, search_config):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            # The first job is committed; let the test read the list
+            mid_run.set()
+            await asyncio.to_thread(resume.wait, 10)
+        return {"total_score": 0.9, "tier": "A", "matched_skills": [], "breakdown": {}}
+    
+    monkeypatch.setattr(search_queue, "scrape_jobs", scrape)
+    monkeypatch.setattr(scorer, "_score_single_job", score)
+    
+    async def setup():
+        await key_store.store(TEST_USER, "sk-test")
+        async with async_session() as db:
+            profile = Profile(user_id=TEST_USER, name="Trades", search_config={"search_terms": ["trades"]})
+            db.add(profile)
+            await db.flush()
+            search_run = SearchRun(user_id=TEST_USER, profile_id=profile.id, status="queued")
+            db.add(search_run)
+            await db.commit()
+            return search_run.id
+    
+    def total():
+        return client.get("/api/jobs").json()["total"]
+    
+    run_id = run(setup)
+    before = total()
+    finished = client.portal.start_task_soon(search_queue.run_search, run_id)
+    assert mid_run.wait(10)
+    assert total() == before + 1
+    resume.set()
+    finished.result(timeout=10)
+    assert total() == before + 3
@@ -0,0 +1,69 @@
+import os
+import tempfile
+
+from app.core.config import settings
+from app.routers import resume
+
+
+RESUME = b"Ada Lovelace\nada@example.com\n\nSKILLS\nPython, SQL\n"
+
+
+def test_large_upload_is_parsed_from_the_spooled_file(client, monkeypatch):
+    seen = []
+    
+    async def parse_resume(source, ext, content_hash=None):
+        seen.append((source, os.path.exists(source)))
+        return {"basics": {}}
+    
+    monkeypatch.setattr(resume, "parse_resume", parse_resume)
+    tmp_before = set(os.listdir(tempfile.gettempdir()))
+    content = RESUME + b" " * settings.UPLOAD_SPOOL_MEMORY_BYTES
+    
+    response = client.post("/api/resume/upload", files={"file": ("big.txt", content, "text/plain")})
+    
+    assert response.status_code == 200
+    [(path, existed)] = seen
+    assert isinstance(path, str) and existed
+    # The spooled file is the only copy, and it is gone once the request ends
+    assert not os.path.exists(path)
+    assert set(os.listdir(tempfile.gettempdir())) == tmp_before
+
+
+def test_small_upload_is_parsed_from_memory(client, monkeypatch):
+    seen = []
+    
+    async def parse_resume(source, ext, content_hash=None):
+        seen.append(source)
+        return {"basics": {}}
+    
+    monkeypatch.setattr(resume, "parse_resume", parse_resume)
+    response = client.post("/api/resume/upload", files={"file": ("cv.txt", RESUME, "text/plain")})
+    
+    assert response.status_code == 200
+    assert seen == [RESUME]
+
+
+
+def test_upload_needs_one_file_in_the_file_field(client):
+    response = client.post("/api/resume/upload", files={"resume": ("cv.txt", RESUME, "text/plain")})
+    assert response.status_code == 400
+    
+    response = client.post(
+        "/api/resume/upload",
+        files=[("file", ("a.txt", RESUME, "text/plain")), ("file", ("b.txt", RESUME, "text/plain"))],
+    )
+    assert response.status_code == 400
+    
+    response = client.post("/api/resume/upload", content=RESUME, headers={"Content-Type": "text/plain"})
+    assert response.status_code == 400
+
+
+def test_oversized_upload_is_refused(client, monkeypatch):
+    monkeypatch.setattr(settings, "RESUME_UPLOAD_MAX_BYTES", 64 * 1024)
+    tmp_before = set(os.listdir(tempfile.gettempdir()))
+    content = RESUME + b" " * settings.UPLOAD_SPOOL_MEMORY_BYTES
+    
+    response = client.post("/api/resume/upload", files={"file": ("big.txt", content, "text/plain")})
+    
+    assert response.status_code == 413
+    assert set(os.listdir(tempfile.gettempdir())) == tmp_before
@@ -49,7 +49,14 @@ export default function ApiKeyPage() {
 
     try {
       // jobsApi.search() throws on error, returns { data } on success
-      const response = await jobsApi.search();
+      const response = await jobsApi.search((event) => {
+        if (event.type === 'progress') {
+          setSearchProgress({
+            status: event.run.stage === 'scoring' ? 'Scoring matches...' : 'Scraping jobs from sources...',
+            found: event.run.jobs_found,
+          });
+        }
+      });
       
       setSearchProgress({ 
         status: 'Complete!', 
@@ -62,12 +62,24 @@ export default function JobFeed({ filters, onStatsUpdate }: JobFeedProps) {
     }
   };
 
+  // List rows omit description and scoring breakdown; load them on open
+  const handleSelect = async (job: any) => {
+    setSelectedJob(job);
+    try {
+      const response = await jobsApi.get(job.id);
+      setSelectedJob((current: any) => (current?.id === job.id ? response.data : current));
+    } catch (err) {
+      console.error('Failed to load job details:', err);
+    }
+  };
+
   const handleStatusChange = async (jobId: number, status: string) => {
     try {
       await jobsApi.updateStatus(jobId, status);
       setJobs((prev) =>
         prev.map((job) => (job.id === jobId ? { ...job, status } : job))
       );
+      setSelectedJob((current: any) => (current?.id === jobId ? { ...current, status } : current));
       onStatsUpdate();
     } catch (err) {
       console.error('Failed to update status:', err);
@@ -101,7 +113,7 @@ export default function JobFeed({ filters, onStatsUpdate }: JobFeedProps) {
           <JobCard
             key={job.id}
             job={job}
-            onSelect={() => setSelectedJob(job)}
+            onSelect={() => handleSelect(job)}
             onStatusChange={handleStatusChange}
           />
         ))}
@@ -80,9 +80,86 @@ export const jobsApi = {
   get: (id: number) => request<{ data: unknown }>(`/api/jobs/${id}`),
   updateStatus: (id: number, status: string) =>
     request<void>(`/api/jobs/${id}/status`, { method: 'PUT', body: { status } }),
-  search: () => request<{ data: unknown }>('/api/jobs/search', { method: 'POST' }),
+  bulkUpdateStatus: (status: string, target: { ids?: number[] } & Record<string, unknown>) =>
+    request<{ data: { status: string; updated: number } }>('/api/jobs/status', {
+      method: 'PUT',
+      body: { status, ...target },
+    }),
+  // Queues a search and resolves with the finished run (jobs_found, jobs_scored)
+  search: async (onEvent?: (event: SearchEvent) => void) => {
+    const { data } = await request<{ data: SearchRun }>('/api/jobs/search', { method: 'POST' });
+    return waitForSearch(data.id, onEvent);
+  },
+  searchStatus: (runId: number) => request<{ data: SearchRun }>(`/api/jobs/search/${runId}`),
 };
 
+export interface SearchRun {
+  id: number;
+  status: string;
+  stage: string | null;
+  jobs_found: number;
+  jobs_scored: number;
+  error_message: string | null;
+}
+
+export type SearchEvent =
+  | { type: 'progress'; run: SearchRun }
+  | { type: 'job'; job: { id: number; title: string | null; score: number | null; tier: string | null } };
+
+const SEARCH_POLL_INTERVAL_MS = 2000;
+
+function finishedRun(run: SearchRun): { data: SearchRun } {
+  if (run.status === 'failed') {
+    throw new Error(run.error_message || 'Search failed');
+  }
+  return { data: run };
+}
+
+async function pollSearch(runId: number, onEvent?: (event: SearchEvent) => void): Promise<{ data: SearchRun }> {
+  for (;;) {
+    const { data } = await jobsApi.searchStatus(runId);
+    if (data.status !== 'queued' && data.status !== 'running') {
+      return finishedRun(data);
+    }
+    onEvent?.({ type: 'progress', run: data });
+    await new Promise((resolve) => setTimeout(resolve, SEARCH_POLL_INTERVAL_MS));
+  }
+}
+
+// Follows the run over Server-Sent Events; falls back to polling if the stream drops
+function waitForSearch(runId: number, onEvent?: (event: SearchEvent) => void): Promise<{ data: SearchRun }> {
+  if (typeof EventSource === 'undefined') {
+    return pollSearch(runId, onEvent);
+  }
+
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`${API_BASE_URL}/api/jobs/search/${runId}/events`, {
+      withCredentials: true,
+    });
+    const fallback = () => {
+      source.close();
+      pollSearch(runId, onEvent).then(resolve, reject);
+    };
+
+    source.addEventListener('progress', (e) => {
+      onEvent?.({ type: 'progress', run: JSON.parse((e as MessageEvent).data) });
+    });
+    source.addEventListener('job', (e) => {
+      onEvent?.({ type: 'job', job: JSON.parse((e as MessageEvent).data) });
+    });
+    source.addEventListener('done', (e) => {
+      source.close();
+      try {
+        resolve(finishedRun(JSON.parse((e as MessageEvent).data)));
+      } catch (err) {
+        reject(err);
+      }
+    });
+    source.addEventListener('dropped', fallback);
+    source.onerror = fallback;
+  });
+}
+
 // OpenAI Key (Session Only)
 export const openaiApi = {
   validate: (key: string) =>
@@ -103,7 +180,7 @@ export const settingsApi = {
   get: () => request<{ data: unknown }>('/api/settings'),
   update: (data: unknown) => request<{ data: unknown }>('/api/settings', { method: 'PUT', body: data }),
   purge: () => request<void>('/api/settings/purge', { method: 'POST' }),
-  export: (format: 'json' | 'csv') =>
+  export: (format: 'json' | 'ndjson' | 'csv' | 'parquet' | 'arrow') =>
     fetch(`${API_BASE_URL}/api/settings/export?format=${format}`, {
       credentials: 'include',
     }),